@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI接口列表与熔断
+按 ai_providers 配置的顺序使用多个接口，每个接口各自统计连续失败次数和最近的耗时（p95），
+失败过多或过慢时熔断一段时间，期间直接跳过该接口；熔断到期后放行一个探测请求，成功则恢复
+
+接口状态在进程内共享（以名称、类型、地址和模型区分），Web界面和机器人看到的是同一份
+"""
+
+import math
+import time
+import threading
+from collections import deque
+from typing import List, Optional
+
+# 各接口类型未配置模型时使用的默认模型（Claude和自定义接口在调用时决定）
+DEFAULT_MODELS = {'openai': 'gpt-3.5-turbo', 'claude': '', 'custom': ''}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+STATE_LABELS = {CLOSED: '正常', OPEN: '熔断', HALF_OPEN: '探测中'}
+
+
+def percentile(values, pct: float) -> Optional[float]:
+    """按最近邻取百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+
+class ProviderHealth:
+    """单个接口的熔断器和耗时统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.configure({})
+
+        self.state = CLOSED
+        self.reason = ''
+        self.opened_until = 0.0
+        self.probing = False
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=self.window)
+        self.last_error_at = None
+        self.last_success_at = None
+        self.totals = {'requests': 0, 'failures': 0, 'opened': 0, 'skipped': 0}
+
+    def configure(self, settings: dict):
+        """更新熔断参数（配置项 ai_failover）"""
+        self.failure_threshold = max(1, int(settings.get('failure_threshold', 3)))
+        self.slow_p95 = float(settings.get('slow_p95_seconds', 8))
+        self.min_samples = max(1, int(settings.get('min_samples', 5)))
+        self.open_seconds = float(settings.get('open_seconds', 60))
+        self.window = max(self.min_samples, int(settings.get('window', 20)))
+        latencies = getattr(self, 'latencies', None)
+        if latencies is not None and latencies.maxlen != self.window:
+            self.latencies = deque(latencies, maxlen=self.window)
+
+    def allow(self) -> bool:
+        """是否可以向该接口发送请求（熔断到期后只放行一个探测请求）"""
+        with self.lock:
+            if self.state == OPEN:
+                if time.time() < self.opened_until:
+                    self.totals['skipped'] += 1
+                    return False
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN:
+                if self.probing:
+                    self.totals['skipped'] += 1
+                    return False
+                self.probing = True
+            return True
+
+    def record(self, success: bool, latency: float) -> Optional[str]:
+        """记录一次请求的结果，返回熔断原因（本次没有触发熔断时为None）"""
+        with self.lock:
+            self.totals['requests'] += 1
+            self.latencies.append(latency)
+            if success:
+                self.consecutive_failures = 0
+                self.last_success_at = time.time()
+            else:
+                self.consecutive_failures += 1
+                self.totals['failures'] += 1
+                self.last_error_at = time.time()
+
+            if self.state == HALF_OPEN:
+                self.probing = False
+                if success:
+                    self.state = CLOSED
+                    self.reason = ''
+                    return None
+                return self._open('探测失败')
+            if self.state != CLOSED:
+                return None
+            if self.consecutive_failures >= self.failure_threshold:
+                return self._open(f'连续失败 {self.consecutive_failures} 次')
+            p95 = self._p95()
+            if self.slow_p95 > 0 and p95 is not None and p95 > self.slow_p95:
+                return self._open(f'p95耗时 {p95:.1f}s')
+            return None
+
+    def _open(self, reason: str) -> str:
+        self.state = OPEN
+        self.reason = reason
+        self.opened_until = time.time() + self.open_seconds
+        self.totals['opened'] += 1
+        # 恢复后重新统计耗时，避免熔断前的慢请求让接口立即再次熔断
+        self.latencies.clear()
+        return reason
+
+    def _p95(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+        return percentile(self.latencies, 95)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            latencies = list(self.latencies)
+            state = self.state
+            if state == OPEN and time.time() >= self.opened_until:
+                state = HALF_OPEN
+            return {
+                'name': self.name,
+                'state': state,
+                'state_label': STATE_LABELS[state],
+                'reason': self.reason if state != CLOSED else '',
+                'open_remaining': max(0, int(self.opened_until - time.time())) if state == OPEN else 0,
+                'consecutive_failures': self.consecutive_failures,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'samples': len(latencies),
+                'last_success_at': self.last_success_at,
+                'last_error_at': self.last_error_at,
+                **self.totals,
+            }
+
+
+class AIProvider:
+    """一个AI接口的配置及其健康状态"""
+
+    def __init__(self, name: str, api_type: str, api_url: str, api_key: str, model: str, stream: bool,
+                 health: ProviderHealth):
+        self.name = name
+        self.api_type = api_type
+        self.api_url = api_url
+        self.api_key = api_key
+        self.model = model
+        self.stream = stream
+        self.health = health
+        # 每1000 token的单价，未设置时使用 ai_usage 中的单价
+        self.price_prompt = None
+        self.price_completion = None
+
+
+# (名称, 类型, 地址, 模型) -> ProviderHealth，进程内共享
+_health = {}
+_health_lock = threading.Lock()
+
+
+def _get_health(name: str, key: tuple, settings: dict) -> ProviderHealth:
+    with _health_lock:
+        health = _health.get(key)
+        if health is None:
+            health = ProviderHealth(name)
+            _health[key] = health
+    with health.lock:
+        health.configure(settings)
+    return health
+
+
+def provider_entries(config: dict) -> List[dict]:
+    """配置中的接口列表；未配置 ai_providers 时使用原有的单个接口配置"""
+    entries = [entry for entry in (config.get('ai_providers') or [])
+               if isinstance(entry, dict) and entry.get('enabled', True)]
+    if entries:
+        return entries
+    return [{
+        'name': config.get('ai_api_type', 'openai'),
+        'api_type': config.get('ai_api_type', 'openai'),
+        'api_url': config.get('ai_api_url', ''),
+        'api_key': config.get('ai_api_key', ''),
+        'model': config.get('ai_model', 'gpt-3.5-turbo'),
+    }]
+
+
+def load_providers(config: dict) -> List[AIProvider]:
+    """按配置顺序创建接口列表"""
+    settings = config.get('ai_failover', {}) or {}
+    providers = []
+    for index, entry in enumerate(provider_entries(config)):
+        api_type = entry.get('api_type', 'openai')
+        api_url = entry.get('api_url', '')
+        model = entry.get('model', DEFAULT_MODELS.get(api_type, ''))
+        name = entry.get('name') or f"{api_type}#{index + 1}"
+        # 流式输出：接口单独配置优先，其次 ai_stream（自定义接口需明确开启）
+        stream = entry.get('stream', config.get('ai_stream', api_type != 'custom'))
+        health = _get_health(name, (name, api_type, api_url, model), settings)
+        provider = AIProvider(name, api_type, api_url, entry.get('api_key', ''), model, bool(stream), health)
+        if entry.get('price_per_1k_prompt') is not None:
+            provider.price_prompt = float(entry['price_per_1k_prompt'])
+        if entry.get('price_per_1k_completion') is not None:
+            provider.price_completion = float(entry['price_per_1k_completion'])
+        providers.append(provider)
+    return providers
+
+
+def provider_health(config: dict) -> List[dict]:
+    """当前配置中各接口的健康状态和耗时（供Web界面显示）"""
+    result = []
+    for provider in load_providers(config):
+        item = provider.health.snapshot()
+        item.update({'api_type': provider.api_type, 'api_url': provider.api_url, 'model': provider.model})
+        result.append(item)
+    return result
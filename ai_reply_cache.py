@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI回复缓存
+相同的提示（接口类型、地址和密钥、模型、系统提示词、温度、标题、正文）直接返回之前生成的回复，
+按最近使用淘汰，带有效期，可保存到 data/ai_reply_cache.json 供之后的运行和Web界面使用
+（新增回复后最多每 SAVE_INTERVAL 秒写一次文件，结束时由 flush 写入剩余的修改）
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+CACHE_VERSION = 1
+SAVE_INTERVAL = 30  # 两次写入缓存文件的最短间隔（秒）
+
+
+def reply_cache_key(api_type, api_url, model, system_prompt, temperature, title, content, content_limit=500,
+                    api_key=''):
+    """提示内容的哈希（标题去掉多余空白，正文与发送给接口的一样截断）
+
+    接口地址和密钥（只取其哈希）也参与计算，更换接口或密钥后不会返回之前生成的回复
+    """
+    normalized_title = re.sub(r'\s+', ' ', title or '').strip()
+    key_fingerprint = hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:16]
+    raw = json.dumps(
+        [api_type, api_url, key_fingerprint, model, system_prompt, temperature, normalized_title,
+         (content or '')[:content_limit]],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class AIReplyCache:
+    """AI回复的LRU缓存（配置项 ai_reply_cache）"""
+
+    def __init__(self, config: dict, path='data/ai_reply_cache.json'):
+        cache_config = config.get('ai_reply_cache', {}) or {}
+        self.enabled = bool(cache_config.get('enabled', True))
+        self.max_entries = max(1, int(cache_config.get('max_entries', 500)))
+        self.ttl = float(cache_config.get('ttl_hours', 24)) * 3600
+        self.persist = bool(cache_config.get('persist', True))
+        self.path = path
+
+        self.entries = OrderedDict()  # 键 -> {'reply': ..., 'at': ...}，越靠后越近使用
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.last_save = time.monotonic()
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expired': 0,
+        }
+        if self.enabled and self.persist:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return
+            now = time.time()
+            for key, entry in data.get('entries', {}).items():
+                if now - entry.get('at', 0) <= self.ttl:
+                    self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        except Exception as e:
+            logging.warning(f"⚠️ 读取AI回复缓存失败，将重新建立: {e}")
+            self.entries = OrderedDict()
+
+    def get(self, key):
+        """查询缓存的回复，未命中或已过期时返回None"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry.get('at', 0) > self.ttl:
+                del self.entries[key]
+                self.metrics['expired'] += 1
+                entry = None
+            if entry is None:
+                self.metrics['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.metrics['hits'] += 1
+            return entry['reply']
+
+    def put(self, key, reply):
+        """保存生成的回复"""
+        if not self.enabled or not reply:
+            return
+        with self.lock:
+            self.entries[key] = {'reply': reply, 'at': int(time.time())}
+            self.entries.move_to_end(key)
+            self.metrics['stores'] += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.metrics['evictions'] += 1
+            self.dirty = True
+            due = time.monotonic() - self.last_save >= SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def flush(self):
+        """写入尚未保存的修改（运行结束时调用）"""
+        if self.dirty:
+            self.save()
+
+    def save(self):
+        """写入缓存文件"""
+        if not self.enabled or not self.persist:
+            return
+        with self.lock:
+            snapshot = dict(self.entries)
+            self.dirty = False
+            self.last_save = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': snapshot}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.dirty = True
+            logging.warning(f"⚠️ 保存AI回复缓存失败: {e}")
+
+    def report(self):
+        """输出本次运行的缓存命中情况"""
+        m = self.metrics
+        lookups = m['hits'] + m['misses']
+        if not self.enabled or not lookups:
+            return m
+        logging.info(
+            f"♻️ AI回复缓存: 命中 {m['hits']}/{lookups} 次 ({m['hits'] / lookups * 100:.0f}%), "
+            f"新增 {m['stores']} 条, 淘汰 {m['evictions']} 条, 过期 {m['expired']} 条, 共 {len(self.entries)} 条"
+        )
+        return m
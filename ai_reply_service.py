@@ -3,31 +3,149 @@
 """
 AI智能回复服务
 支持多种AI接口（OpenAI, Claude, 国产AI等）
+同一接口地址的请求共用一个连接池（requests.Session），回复、接口测试和重试都复用已建立的连接；
+支持流式输出（SSE），得到完整的短回复后立即断开，不再等待模型生成多余内容；
+可配置多个接口（ai_providers）按顺序故障转移，熔断失败或过慢的接口，并可在首个接口较慢时向下一个接口发出对冲请求；
+每次调用的token数、耗时和费用计入用量统计，可设置每日token预算
 """
 
 import requests
 import json
+import time
 import logging
-from typing import Optional
+import threading
+from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ai_reply_cache import AIReplyCache, reply_cache_key
+from ai_providers import AIProvider, load_providers
+from ai_usage import AIUsageMeter, estimate_tokens, parse_usage
+
+# (接口类型, 协议, 主机, 连接池大小, 重试次数) -> Session，进程内共享
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(api_type: str, url: str, pool_size: int = 4, retries: int = 1) -> requests.Session:
+    """获取接口地址对应的共享 Session（带 keep-alive 连接池）
+
+    只重试连接阶段的失败（建立连接前请求尚未发出，重试不会重复生成回复）
+    """
+    parts = urlsplit(url)
+    key = (api_type, parts.scheme, parts.netloc, pool_size, retries)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            retry = Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.3)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[key] = session
+    return session
+
+
+# 回复结束的标点
+REPLY_END_CHARS = '。！？!?～~…'
+
+
+def trim_reply(text: str, max_chars: int) -> str:
+    """只保留第一段回复，超出长度时在最后一个句末标点处截断"""
+    lines = [line.strip() for line in (text or '').strip().splitlines() if line.strip()]
+    reply = lines[0] if lines else ''
+    if len(reply) > max_chars:
+        cut = max(reply.rfind(char, 0, max_chars) for char in REPLY_END_CHARS)
+        reply = reply[:cut + 1] if cut > 0 else reply[:max_chars]
+    return reply
+
+
+def _openai_delta(event: dict) -> str:
+    """OpenAI流式输出: {"choices": [{"delta": {"content": "..."}}]}"""
+    choices = event.get('choices') or []
+    if choices and isinstance(choices[0], dict):
+        return (choices[0].get('delta') or {}).get('content') or ''
+    return ''
+
+
+def _claude_delta(event: dict) -> str:
+    """Claude流式输出: {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "..."}}"""
+    if event.get('type') == 'content_block_delta':
+        return (event.get('delta') or {}).get('text') or ''
+    return ''
+
+
+def _custom_delta(event: dict) -> str:
+    """自定义接口流式输出：兼容OpenAI/Claude格式，或 {"reply"/"response"/"text": "..."}"""
+    delta = _openai_delta(event) or _claude_delta(event)
+    if delta:
+        return delta
+    for key in ('reply', 'response', 'text'):
+        if isinstance(event.get(key), str):
+            return event[key]
+    return ''
+
+
+def _parse_custom_result(result: dict) -> Optional[str]:
+    """解析自定义接口的JSON响应（尝试多种格式）"""
+    reply = None
+    if 'reply' in result:
+        reply = result['reply']
+    elif 'response' in result:
+        reply = result['response']
+    elif 'choices' in result:
+        # OpenAI格式
+        reply = result['choices'][0]['message']['content']
+    elif 'content' in result:
+        # Claude格式
+        if isinstance(result['content'], list):
+            reply = result['content'][0]['text']
+        else:
+            reply = result['content']
+    return reply
+
 
 class AIReplyService:
     """AI回复服务类"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, stats=None):
         """
         初始化AI服务
         
         Args:
             config: AI配置字典
+            stats: 统计管理器（可选），用于记录每日AI用量和检查每日预算
         """
         self.enabled = config.get('enable_ai_reply', False)
-        self.api_type = config.get('ai_api_type', 'openai')  # openai, claude, custom
-        self.api_url = config.get('ai_api_url', '')
-        self.api_key = config.get('ai_api_key', '')
-        self.model = config.get('ai_model', 'gpt-3.5-turbo')
+        # 按顺序使用的接口列表（未配置 ai_providers 时只有 ai_api_* 配置的一个接口）
+        self.providers = load_providers(config)
+        primary = self.providers[0]
+        self.api_type = primary.api_type  # openai, claude, custom
+        self.api_url = primary.api_url
+        self.api_key = primary.api_key
+        self.model = primary.model
         self.temperature = config.get('ai_temperature', 0.8)
         self.max_tokens = config.get('ai_max_tokens', 200)
         self.timeout = config.get('ai_timeout', 10)
+        # 连接超时与读取超时分开设置（未设置时沿用 ai_timeout）
+        self.connect_timeout = config.get('ai_connect_timeout', min(5, self.timeout))
+        self.read_timeout = config.get('ai_read_timeout', self.timeout)
+        self.pool_size = int(config.get('ai_pool_size', 4))
+        self.max_retries = int(config.get('ai_max_retries', 1))
+        # 流式输出（自定义接口需明确开启），以及提前结束读取的回复长度
+        self.stream = primary.stream
+        self.reply_max_chars = int(config.get('ai_reply_max_chars', 50))
+        # 批量生成：同时进行的请求数，以及每条回复的最长等待时间（从开始请求算起）
+        self.batch_concurrency = max(1, int(config.get('ai_batch_concurrency', 4)))
+        self.batch_item_timeout = float(config.get('ai_batch_item_timeout', self.connect_timeout + self.read_timeout))
+        # 对冲请求：当前接口超过该秒数仍未返回时，同时请求下一个接口（0为不对冲）
+        failover_config = config.get('ai_failover', {}) or {}
+        self.hedge_after = float(failover_config.get('hedge_after_seconds', 0))
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
         
         # 系统提示词
         self.system_prompt = config.get('ai_system_prompt', 
@@ -37,18 +155,166 @@ class AIReplyService:
         )
         
         self.logger = logging.getLogger(__name__)
+        
+        # 相同提示的回复缓存
+        self.cache = AIReplyCache(config)
+        self.last_from_cache = False
+        
+        # token用量、费用和每日预算
+        self.usage = AIUsageMeter(config, stats)
+        
+        # 接口耗时统计
+        self.last_timing = None
+        self.metrics_lock = threading.Lock()
+        self.metrics = {
+            'requests': 0,
+            'streamed': 0,
+            'cut_off': 0,
+            'ttft': 0.0,       # 首字耗时合计（仅流式）
+            'latency': 0.0,    # 总耗时合计
+            'batches': 0,
+            'batch_items': 0,
+            'batch_timeouts': 0,
+            'failovers': 0,    # 由后续接口生成回复的次数
+            'hedged': 0,
+            'hedge_wins': 0,
+            'all_open': 0,     # 所有接口都已熔断、直接改用规则回复的次数
+        }
     
     def is_enabled(self) -> bool:
         """检查AI回复是否启用"""
-        return self.enabled and bool(self.api_key)
+        return self.enabled and any(provider.api_key for provider in self.providers)
+    
+    def _post(self, provider: AIProvider, url: str, headers: dict, data: dict) -> requests.Response:
+        """通过共享连接池发送请求"""
+        session = get_session(provider.api_type, url, self.pool_size, self.max_retries)
+        if provider.stream:
+            data = dict(data, stream=True)
+        return session.post(
+            url,
+            headers=headers,
+            json=data,
+            timeout=(self.connect_timeout, self.read_timeout),
+            stream=provider.stream
+        )
+    
+    def _read_reply(self, provider: AIProvider, prompt: str, response: requests.Response,
+                    parse_result, parse_delta, started: float) -> Optional[str]:
+        """读取接口响应：SSE流式输出逐段读取，否则按JSON解析（接口不支持流式时也会返回JSON）"""
+        if 'text/event-stream' not in response.headers.get('Content-Type', ''):
+            result = response.json()
+            reply = parse_result(result)
+            self._record_timing(started, None, False)
+            self._record_usage(provider, prompt, parse_usage(result), reply or '', started)
+            return reply.strip() if reply else None
+        
+        text = ''
+        first_token = None
+        cut_off = False
+        usage = {}
+        deltas = 0
+        response.encoding = 'utf-8'
+        try:
+            for line in response.iter_lines(chunk_size=64, decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                payload = line[5:].strip()
+                if payload == '[DONE]':
+                    break
+                try:
+                    event = json.loads(payload)
+                    delta = parse_delta(event)
+                except (ValueError, AttributeError):
+                    continue
+                usage.update(parse_usage(event))
+                if not delta:
+                    continue
+                deltas += 1
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                text += delta
+                if self._reply_complete(text):
+                    # 已得到完整回复，断开连接不再读取剩余输出
+                    cut_off = True
+                    break
+        finally:
+            response.close()
+        self._record_timing(started, first_token, True, cut_off)
+        # 提前断开时收不到接口统计的输出token，按收到的输出段数估算（每段约1个token）
+        self._record_usage(provider, prompt, usage, text, started, deltas)
+        return trim_reply(text, self.reply_max_chars) or None
+    
+    def _reply_complete(self, text: str) -> bool:
+        """流式输出是否已包含完整回复（出现换行或达到长度上限）"""
+        stripped = text.lstrip()
+        return '\n' in stripped or len(stripped) >= self.reply_max_chars
+    
+    def _record_timing(self, started: float, ttft: Optional[float], streamed: bool, cut_off: bool = False):
+        total = time.perf_counter() - started
+        self.last_timing = {'ttft': ttft, 'total': total, 'streamed': streamed, 'cut_off': cut_off}
+        with self.metrics_lock:
+            m = self.metrics
+            m['requests'] += 1
+            m['latency'] += total
+            if streamed:
+                m['streamed'] += 1
+                m['ttft'] += ttft or 0.0
+                m['cut_off'] += 1 if cut_off else 0
+        if streamed:
+            first = f"{ttft:.2f}s" if ttft is not None else "-"
+            self.logger.info(f"⏱️ AI接口耗时: 首字 {first}, 总计 {total:.2f}s{'（已提前结束）' if cut_off else ''}")
+        else:
+            self.logger.info(f"⏱️ AI接口耗时: {total:.2f}s")
     
-    def generate_reply(self, title: str, content: str = "") -> Optional[str]:
+    def _record_usage(self, provider: AIProvider, prompt: str, usage: dict, output: str, started: float,
+                      chunks: Optional[int] = None):
+        """记录本次调用的用量，接口未返回的部分估算（输出token优先按流式输出的段数）"""
+        estimated = 'prompt_tokens' not in usage or 'completion_tokens' not in usage
+        prompt_tokens = usage.get('prompt_tokens')
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(self.system_prompt) + estimate_tokens(prompt)
+        completion_tokens = usage.get('completion_tokens')
+        if completion_tokens is None:
+            completion_tokens = chunks if chunks else estimate_tokens(output)
+        self.usage.record(provider, prompt_tokens, completion_tokens, time.perf_counter() - started, estimated)
+    
+    def report(self) -> dict:
+        """输出本次运行的AI接口耗时统计"""
+        m = self.metrics
+        if m['requests']:
+            line = f"🤖 AI接口: 请求 {m['requests']} 次, 平均耗时 {m['latency'] / m['requests']:.2f}s"
+            if m['streamed']:
+                line += (f", 流式 {m['streamed']} 次（平均首字 {m['ttft'] / m['streamed']:.2f}s, "
+                         f"提前结束 {m['cut_off']} 次）")
+            if m['batches']:
+                line += f", 批量 {m['batches']} 批/{m['batch_items']} 条（超时 {m['batch_timeouts']} 条）"
+            if m['failovers'] or m['hedged'] or m['all_open']:
+                line += (f", 故障转移 {m['failovers']} 次, 对冲 {m['hedged']} 次（胜出 {m['hedge_wins']} 次）, "
+                         f"全部熔断 {m['all_open']} 次")
+            self.logger.info(line)
+        if len(self.providers) > 1:
+            for provider in self.providers:
+                h = provider.health.snapshot()
+                if not h['requests'] and not h['skipped']:
+                    continue
+                p95 = f"{h['p95']:.2f}s" if h['p95'] is not None else "-"
+                self.logger.info(
+                    f"   └ {provider.name}: {h['state_label']}, 请求 {h['requests']} 次, 失败 {h['failures']} 次, "
+                    f"p95 {p95}, 熔断 {h['opened']} 次, 跳过 {h['skipped']} 次"
+                )
+        self.usage.report()
+        self.cache.flush()
+        self.cache.report()
+        return m
+    
+    def generate_reply(self, title: str, content: str = "", fresh: bool = False) -> Optional[str]:
         """
         调用AI生成回复
         
         Args:
             title: 帖子标题
             content: 帖子内容（可选）
+            fresh: 为True时不使用缓存，总是请求接口（结果仍会写入缓存）
         
         Returns:
             生成的回复内容，失败返回None
@@ -57,6 +323,26 @@ class AIReplyService:
             self.logger.warning("AI回复未启用或API Key未配置")
             return None
         
+        cache_key = reply_cache_key(self.api_type, self.api_url, self.model, self.system_prompt, self.temperature,
+                                    title, content, api_key=self.api_key)
+        if not fresh:
+            cached = self.cache.get(cache_key)
+            if cached:
+                self.last_from_cache = True
+                self.logger.info(f"♻️ 使用缓存的AI回复: {cached}")
+                return cached
+        self.last_from_cache = False
+        
+        if self.usage.budget_exhausted():
+            return None
+        
+        reply = self._request_reply(title, content)
+        if reply:
+            self.cache.put(cache_key, reply)
+        return reply
+    
+    def _request_reply(self, title: str, content: str) -> Optional[str]:
+        """构建提示词并请求接口"""
         try:
             # 构建提示词
             user_prompt = f"帖子标题：{title}"
@@ -66,33 +352,125 @@ class AIReplyService:
                 user_prompt += f"\n帖子内容：{content_preview}"
             user_prompt += "\n\n请生成一条简短的回复（不超过50字）："
             
-            # 根据API类型调用不同接口
-            if self.api_type == 'openai':
-                return self._call_openai_api(user_prompt)
-            elif self.api_type == 'claude':
-                return self._call_claude_api(user_prompt)
-            elif self.api_type == 'custom':
-                return self._call_custom_api(user_prompt)
-            else:
-                self.logger.error(f"不支持的API类型: {self.api_type}")
-                return None
+            return self._request_with_failover(user_prompt)
                 
         except Exception as e:
             self.logger.error(f"AI生成回复失败: {str(e)}")
             return None
     
-    def _call_openai_api(self, prompt: str) -> Optional[str]:
+    def _request_with_failover(self, prompt: str) -> Optional[str]:
+        """按顺序请求未熔断的接口，直到得到回复；配置了对冲时，当前接口较慢会同时请求下一个接口"""
+        candidates = [provider for provider in self.providers if provider.api_key or provider.api_type == 'custom']
+        if not candidates:
+            return None
+        primary = candidates[0]
+        
+        if not self.hedge_after or len(candidates) < 2:
+            attempted = False
+            for provider in candidates:
+                if not provider.health.allow():
+                    continue
+                attempted = True
+                reply = self._call_provider(provider, prompt)
+                if reply:
+                    if provider is not primary:
+                        self._count('failovers')
+                    return reply
+            if not attempted:
+                self._all_open()
+            return None
+        
+        # 对冲：同时最多进行两个请求，先得到回复的生效（另一个请求在后台结束，结果计入接口健康统计）
+        executor = self._get_hedge_executor()
+        queue = list(candidates)
+        pending = {}
+        hedges = set()
+        
+        def launch(hedge=False):
+            while queue:
+                provider = queue.pop(0)
+                if provider.health.allow():
+                    future = executor.submit(self._call_provider, provider, prompt)
+                    pending[future] = provider
+                    if hedge:
+                        hedges.add(future)
+                    return True
+            return False
+        
+        if not launch():
+            self._all_open()
+            return None
+        while pending:
+            can_hedge = bool(queue) and len(pending) < 2
+            done, _ = wait(pending, timeout=self.hedge_after if can_hedge else None, return_when=FIRST_COMPLETED)
+            if not done:
+                slow = next(iter(pending.values()))
+                if launch(hedge=True):
+                    self._count('hedged')
+                    self.logger.info(f"🔀 {slow.name} 超过 {self.hedge_after:g}秒未返回，同时请求下一个接口")
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                reply = future.result()
+                if reply:
+                    if provider is not primary:
+                        self._count('failovers')
+                    if future in hedges:
+                        self._count('hedge_wins')
+                    return reply
+            # 请求失败，立即改用下一个接口
+            launch()
+        return None
+    
+    def _all_open(self):
+        self._count('all_open')
+        self.logger.warning("⚠️ 所有AI接口均已熔断，直接使用规则回复")
+    
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=self.batch_concurrency * 2,
+                                                          thread_name_prefix='ai-hedge')
+            return self._hedge_executor
+    
+    def _count(self, key: str):
+        with self.metrics_lock:
+            self.metrics[key] += 1
+    
+    def _call_provider(self, provider: AIProvider, prompt: str) -> Optional[str]:
+        """请求一个接口，并把结果和耗时计入该接口的熔断统计"""
+        started = time.perf_counter()
+        reply = None
+        try:
+            if provider.api_type == 'openai':
+                reply = self._call_openai_api(provider, prompt)
+            elif provider.api_type == 'claude':
+                reply = self._call_claude_api(provider, prompt)
+            elif provider.api_type == 'custom':
+                reply = self._call_custom_api(provider, prompt)
+            else:
+                self.logger.error(f"不支持的API类型: {provider.api_type}")
+        except Exception as e:
+            self.logger.error(f"❌ {provider.name} 调用失败: {str(e)}")
+        reason = provider.health.record(bool(reply), time.perf_counter() - started)
+        if reason:
+            self.logger.warning(
+                f"⚡ AI接口 {provider.name} 已熔断（{reason}），{provider.health.open_seconds:g}秒内跳过该接口"
+            )
+        return reply
+    
+    def _call_openai_api(self, provider: AIProvider, prompt: str) -> Optional[str]:
         """调用OpenAI兼容接口"""
         try:
-            url = self.api_url or "https://api.openai.com/v1/chat/completions"
+            url = provider.api_url or "https://api.openai.com/v1/chat/completions"
             
             headers = {
                 "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
+                "Authorization": f"Bearer {provider.api_key}"
             }
             
             data = {
-                "model": self.model,
+                "model": provider.model,
                 "messages": [
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": prompt}
@@ -101,18 +479,19 @@ class AIReplyService:
                 "max_tokens": self.max_tokens
             }
             
-            self.logger.info(f"🤖 调用AI接口: {url} (model: {self.model})")
+            self.logger.info(f"🤖 调用AI接口: {url} (model: {provider.model})")
             
-            response = requests.post(
-                url, 
-                headers=headers, 
-                json=data, 
-                timeout=self.timeout
-            )
+            started = time.perf_counter()
+            response = self._post(provider, url, headers, data)
             
             if response.status_code == 200:
-                result = response.json()
-                reply = result['choices'][0]['message']['content'].strip()
+                reply = self._read_reply(
+                    provider, prompt, response, lambda result: result['choices'][0]['message']['content'],
+                    _openai_delta, started
+                )
+                if not reply:
+                    self.logger.error("❌ AI接口返回了空回复")
+                    return None
                 self.logger.info(f"✅ AI生成回复: {reply}")
                 return reply
             else:
@@ -126,19 +505,19 @@ class AIReplyService:
             self.logger.error(f"❌ OpenAI API调用失败: {str(e)}")
             return None
     
-    def _call_claude_api(self, prompt: str) -> Optional[str]:
+    def _call_claude_api(self, provider: AIProvider, prompt: str) -> Optional[str]:
         """调用Claude API"""
         try:
-            url = self.api_url or "https://api.anthropic.com/v1/messages"
+            url = provider.api_url or "https://api.anthropic.com/v1/messages"
             
             headers = {
                 "Content-Type": "application/json",
-                "x-api-key": self.api_key,
+                "x-api-key": provider.api_key,
                 "anthropic-version": "2023-06-01"
             }
             
             data = {
-                "model": self.model or "claude-3-haiku-20240307",
+                "model": provider.model or "claude-3-haiku-20240307",
                 "max_tokens": self.max_tokens,
                 "temperature": self.temperature,
                 "system": self.system_prompt,
@@ -149,16 +528,16 @@ class AIReplyService:
             
             self.logger.info(f"🤖 调用Claude接口: {url}")
             
-            response = requests.post(
-                url, 
-                headers=headers, 
-                json=data, 
-                timeout=self.timeout
-            )
+            started = time.perf_counter()
+            response = self._post(provider, url, headers, data)
             
             if response.status_code == 200:
-                result = response.json()
-                reply = result['content'][0]['text'].strip()
+                reply = self._read_reply(
+                    provider, prompt, response, lambda result: result['content'][0]['text'], _claude_delta, started
+                )
+                if not reply:
+                    self.logger.error("❌ Claude接口返回了空回复")
+                    return None
                 self.logger.info(f"✅ AI生成回复: {reply}")
                 return reply
             else:
@@ -169,7 +548,7 @@ class AIReplyService:
             self.logger.error(f"❌ Claude API调用失败: {str(e)}")
             return None
     
-    def _call_custom_api(self, prompt: str) -> Optional[str]:
+    def _call_custom_api(self, provider: AIProvider, prompt: str) -> Optional[str]:
         """
         调用自定义API接口
         
@@ -180,7 +559,7 @@ class AIReplyService:
         或者OpenAI兼容格式
         """
         try:
-            if not self.api_url:
+            if not provider.api_url:
                 self.logger.error("自定义API URL未配置")
                 return None
             
@@ -188,8 +567,8 @@ class AIReplyService:
                 "Content-Type": "application/json"
             }
             
-            if self.api_key:
-                headers["Authorization"] = f"Bearer {self.api_key}"
+            if provider.api_key:
+                headers["Authorization"] = f"Bearer {provider.api_key}"
             
             # 尝试通用格式
             data = {
@@ -199,40 +578,18 @@ class AIReplyService:
                 "max_tokens": self.max_tokens
             }
             
-            self.logger.info(f"🤖 调用自定义接口: {self.api_url}")
+            self.logger.info(f"🤖 调用自定义接口: {provider.api_url}")
             
-            response = requests.post(
-                self.api_url, 
-                headers=headers, 
-                json=data, 
-                timeout=self.timeout
-            )
+            started = time.perf_counter()
+            response = self._post(provider, provider.api_url, headers, data)
             
             if response.status_code == 200:
-                result = response.json()
-                
-                # 尝试多种响应格式
-                reply = None
-                if 'reply' in result:
-                    reply = result['reply']
-                elif 'response' in result:
-                    reply = result['response']
-                elif 'choices' in result:
-                    # OpenAI格式
-                    reply = result['choices'][0]['message']['content']
-                elif 'content' in result:
-                    # Claude格式
-                    if isinstance(result['content'], list):
-                        reply = result['content'][0]['text']
-                    else:
-                        reply = result['content']
-                
+                reply = self._read_reply(provider, prompt, response, _parse_custom_result, _custom_delta, started)
                 if reply:
-                    reply = reply.strip()
                     self.logger.info(f"✅ AI生成回复: {reply}")
                     return reply
                 else:
-                    self.logger.error(f"❌ 无法解析自定义API响应: {result}")
+                    self.logger.error("❌ 无法解析自定义API响应")
                     return None
             else:
                 self.logger.error(f"❌ 自定义接口返回错误: {response.status_code} - {response.text}")
@@ -242,10 +599,71 @@ class AIReplyService:
             self.logger.error(f"❌ 自定义API调用失败: {str(e)}")
             return None
     
-    def test_connection(self) -> dict:
+    def generate_replies_batch(self, items: List[dict], timeout: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        并发生成一批帖子的回复
+        
+        Args:
+            items: [{"tid": ..., "title": ..., "content": ...}, ...]
+            timeout: 每条回复的最长等待时间（秒），从该条开始请求时计时，默认 ai_batch_item_timeout
+        
+        Returns:
+            {tid: 回复内容}，失败或超时的帖子为None（由调用方改用规则回复）
+        """
+        results = {item['tid']: None for item in items}
+        if not items or not self.is_enabled() or self.usage.budget_exhausted():
+            return results
+        timeout = self.batch_item_timeout if timeout is None else timeout
+        
+        started_at = {}
+        
+        def worker(item):
+            started_at[item['tid']] = time.time()
+            return self.generate_reply(item['title'], item.get('content', ''))
+        
+        batch_started = time.time()
+        timeouts = 0
+        executor = ThreadPoolExecutor(max_workers=min(self.batch_concurrency, len(items)),
+                                      thread_name_prefix='ai-batch')
+        try:
+            pending = {executor.submit(worker, item): item['tid'] for item in items}
+            while pending:
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tid = pending.pop(future)
+                    try:
+                        results[tid] = future.result()
+                    except Exception as e:
+                        self.logger.error(f"AI生成回复失败 (tid={tid}): {str(e)}")
+                now = time.time()
+                for future, tid in list(pending.items()):
+                    if tid in started_at and now - started_at[tid] > timeout:
+                        # 正在进行的请求无法中断，放弃等待（连接超时/读取超时后线程自行结束）
+                        del pending[future]
+                        timeouts += 1
+                        self.logger.warning(f"⚠️ AI生成回复超时 (tid={tid}, {timeout:g}秒)，改用规则回复")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        elapsed = time.time() - batch_started
+        succeeded = sum(1 for reply in results.values() if reply)
+        with self.metrics_lock:
+            self.metrics['batches'] += 1
+            self.metrics['batch_items'] += len(items)
+            self.metrics['batch_timeouts'] += timeouts
+        self.logger.info(
+            f"🤖 批量生成 {len(items)} 条回复: 成功 {succeeded} 条, 超时 {timeouts} 条, "
+            f"耗时 {elapsed:.1f}秒（并发 {min(self.batch_concurrency, len(items))}）"
+        )
+        return results
+    
+    def test_connection(self, fresh: bool = False) -> dict:
         """
         测试AI接口连接
         
+        Args:
+            fresh: 为True时不使用缓存的测试回复，确保真正请求接口
+        
         Returns:
             {"success": bool, "message": str}
         """
@@ -256,12 +674,14 @@ class AIReplyService:
             }
         
         try:
-            test_reply = self.generate_reply("测试帖子标题", "这是一个测试内容")
+            test_reply = self.generate_reply("测试帖子标题", "这是一个测试内容", fresh=fresh)
+            self.cache.flush()
             
             if test_reply:
+                source = "（缓存）" if self.last_from_cache else ""
                 return {
                     "success": True,
-                    "message": f"连接成功！测试回复: {test_reply}"
+                    "message": f"连接成功！测试回复{source}: {test_reply}"
                 }
             else:
                 return {
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地AI接口模拟服务（用于基准测试，不调用真实的AI服务）
+按请求路径返回不同格式的回复，请求中 stream 为 true 时以SSE逐段输出：
+    /v1/chat/completions  OpenAI兼容格式
+    /v1/messages          Claude（Anthropic messages）格式
+    其他路径              自定义接口格式 {"reply": "..."}
+可模拟首字耗时（固定值或按分布随机）、每段输出的耗时、每个新连接的握手耗时，以及按比例返回错误
+用法:
+    python ai_stub_server.py [--port 8765] [--latency 0.05] [--latency-dist fixed] [--token-delay 0.02]
+                             [--handshake 0.05] [--error-rate 0] [--error-status 500] [--seed 98]
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 模拟啰嗦的模型：短回复之后还会继续输出一段说明
+STUB_REPLY = '感谢楼主分享，支持一下！\n\n（说明：这条回复简短友好，符合论坛氛围，没有使用敏感词汇，字数也控制在要求的范围之内。）'
+CHUNK_CHARS = 2  # 每段输出的字数（约等于一个token）
+PROMPT_TOKENS = 60  # 模拟的输入token数
+
+LATENCY_DISTS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+
+def _chunks(text):
+    return [text[i:i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)]
+
+
+def sample_latency(dist, mean, rng):
+    """按分布生成一次首字耗时，各分布的平均值都为 mean
+
+    uniform 在 0~2倍平均值之间均匀分布，exponential 与 lognormal（sigma=1）有较长的尾部
+    """
+    if mean <= 0:
+        return 0.0
+    if dist == 'uniform':
+        return rng.uniform(0, 2 * mean)
+    if dist == 'exponential':
+        return rng.expovariate(1 / mean)
+    if dist == 'lognormal':
+        sigma = 1.0
+        return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+    return mean
+
+
+def _api_format(path):
+    if path.rstrip('/').endswith('/chat/completions'):
+        return 'openai'
+    if path.rstrip('/').endswith('/messages'):
+        return 'claude'
+    return 'custom'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # 支持 keep-alive
+    # 响应头和正文一次写出，避免 Nagle + 延迟确认给每个 keep-alive 请求额外增加约40ms
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # 每个新连接模拟一次 TCP+TLS 握手的耗时
+        self.server.count('connections')
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端得到完整回复后提前断开
+            self.server.count('aborted')
+
+    def finish(self):
+        try:
+            super().finish()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        except ValueError:
+            request = {}
+        api_format = _api_format(self.path)
+        self.server.count('requests')
+        self.server.count(api_format)
+
+        latency, failed = self.server.draw()
+        if latency:
+            time.sleep(latency)
+        if failed:
+            self.server.count('errors')
+            self._send_json(self.server.error_status, {'error': {'type': 'stub_error', 'message': '模拟的接口错误'}})
+            return
+
+        chunks = _chunks(STUB_REPLY)
+        if request.get('stream'):
+            self._stream(api_format, chunks)
+            return
+
+        # 非流式：生成完全部内容后一次返回
+        if self.server.token_delay:
+            time.sleep(self.server.token_delay * len(chunks))
+        self._send_json(200, self._result(api_format, len(chunks)))
+
+    @staticmethod
+    def _result(api_format, completion_tokens):
+        if api_format == 'openai':
+            return {
+                'choices': [{'message': {'role': 'assistant', 'content': STUB_REPLY}}],
+                'usage': {'prompt_tokens': PROMPT_TOKENS, 'completion_tokens': completion_tokens,
+                          'total_tokens': PROMPT_TOKENS + completion_tokens},
+            }
+        if api_format == 'claude':
+            return {
+                'type': 'message',
+                'role': 'assistant',
+                'content': [{'type': 'text', 'text': STUB_REPLY}],
+                'usage': {'input_tokens': PROMPT_TOKENS, 'output_tokens': completion_tokens},
+            }
+        # 自定义接口通常不返回用量
+        return {'reply': STUB_REPLY}
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _write_event(self, data, event=None):
+        prefix = f"event: {event}\n" if event else ''
+        self._write_chunk(f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8'))
+
+    def _stream(self, api_format, chunks):
+        """以SSE逐段输出（chunked 传输），客户端提前断开时由 handle 结束连接"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        if api_format == 'claude':
+            self._write_event({'type': 'message_start', 'message': {
+                'role': 'assistant', 'usage': {'input_tokens': PROMPT_TOKENS, 'output_tokens': 1}}}, 'message_start')
+            self._write_event({'type': 'content_block_start', 'index': 0,
+                               'content_block': {'type': 'text', 'text': ''}}, 'content_block_start')
+        for index, text in enumerate(chunks):
+            if index and self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            if api_format == 'openai':
+                self._write_event({'choices': [{'index': 0, 'delta': {'content': text}}]})
+            elif api_format == 'claude':
+                self._write_event({'type': 'content_block_delta', 'index': 0,
+                                   'delta': {'type': 'text_delta', 'text': text}}, 'content_block_delta')
+            else:
+                self._write_event({'reply': text})
+            self.server.count('chunks')
+        if api_format == 'claude':
+            self._write_event({'type': 'content_block_stop', 'index': 0}, 'content_block_stop')
+            self._write_event({'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'},
+                               'usage': {'output_tokens': len(chunks)}}, 'message_delta')
+            self._write_event({'type': 'message_stop'}, 'message_stop')
+        else:
+            self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency, handshake, token_delay, latency_dist='fixed',
+                 error_rate=0.0, error_status=500, seed=None):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.handshake = handshake
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'connections': 0, 'requests': 0, 'chunks': 0, 'aborted': 0, 'errors': 0,
+                      'openai': 0, 'claude': 0, 'custom': 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def draw(self):
+        """本次请求的首字耗时和是否返回错误"""
+        with self.lock:
+            latency = sample_latency(self.latency_dist, self.latency, self.rng)
+            failed = self.error_rate > 0 and self.rng.random() < self.error_rate
+        return latency, failed
+
+
+class StubServer:
+    """在后台线程运行的模拟服务"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, handshake=0.05, token_delay=0.02,
+                 latency_dist='fixed', error_rate=0.0, error_status=500, seed=None):
+        self.httpd = StubHTTPServer((host, port), latency, handshake, token_delay, latency_dist,
+                                    error_rate, error_status, seed)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def endpoint(self, api_format):
+        """各格式的接口地址"""
+        return self.url + {'openai': '/v1/chat/completions', 'claude': '/v1/messages'}.get(api_format, '/reply')
+
+    @property
+    def stats(self):
+        return self.httpd.stats
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='ai-stub', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='本地AI接口模拟服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='平均首字耗时（秒）')
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTS, default='fixed', help='首字耗时的分布')
+    parser.add_argument('--token-delay', type=float, default=0.02, help='每段输出的耗时（秒）')
+    parser.add_argument('--handshake', type=float, default=0.05, help='每个新连接的握手耗时（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回错误的比例（0-1）')
+    parser.add_argument('--error-status', type=int, default=500, help='错误响应的状态码（如 429、500、503）')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子')
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.host, args.port, args.latency, args.handshake, args.token_delay,
+                        args.latency_dist, args.error_rate, args.error_status, args.seed)
+    print("🤖 模拟AI接口已启动（Ctrl+C 退出）:")
+    for api_format in ('openai', 'claude', 'custom'):
+        print(f"   {api_format:<7} {server.endpoint(api_format)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
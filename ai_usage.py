@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI用量统计
+记录每次调用的输入/输出token数、耗时和按单价计算的费用，汇总为本次运行和每日用量（每日用量保存在统计数据中），
+并按每日token预算限制调用：当天用完后改用规则回复
+
+接口没有返回用量时（流式输出提前断开、部分自定义接口）按字数估算并标记为估算
+"""
+
+import re
+import logging
+import threading
+from typing import Optional
+
+# 中日韩字符按每字1个token估算，其余字符按每4个字符1个token估算
+_CJK_RE = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]')
+
+
+def estimate_tokens(text: str) -> int:
+    """按字数粗略估算token数"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def parse_usage(data: dict) -> dict:
+    """从响应或流式事件中取出用量（OpenAI: prompt/completion_tokens，Claude: input/output_tokens）
+
+    Claude流式输出的输入token在 message_start 事件的 message.usage 中
+    """
+    if not isinstance(data, dict):
+        return {}
+    usage = data.get('usage')
+    if not isinstance(usage, dict):
+        usage = (data.get('message') or {}).get('usage') if isinstance(data.get('message'), dict) else None
+    if not isinstance(usage, dict):
+        return {}
+    result = {}
+    prompt = usage.get('prompt_tokens', usage.get('input_tokens'))
+    completion = usage.get('completion_tokens', usage.get('output_tokens'))
+    if isinstance(prompt, int):
+        result['prompt_tokens'] = prompt
+    if isinstance(completion, int):
+        result['completion_tokens'] = completion
+    return result
+
+
+def _empty_totals():
+    return {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'estimated_calls': 0, 'cost': 0.0, 'latency': 0.0}
+
+
+class AIUsageMeter:
+    """AI用量计量与每日预算（配置项 ai_usage）"""
+
+    def __init__(self, config: dict, stats=None):
+        usage_config = config.get('ai_usage', {}) or {}
+        self.daily_budget = max(0, int(usage_config.get('daily_token_budget', 0)))  # 0为不限制
+        self.price_prompt = float(usage_config.get('price_per_1k_prompt', 0))
+        self.price_completion = float(usage_config.get('price_per_1k_completion', 0))
+        self.stats = stats  # StatsManager，为None时只统计本次运行
+        self.lock = threading.Lock()
+        self.run = _empty_totals()
+        self.run['providers'] = {}
+        self._budget_warned = False
+
+    def cost(self, provider, prompt_tokens: int, completion_tokens: int) -> float:
+        """按单价（每1000 token）计算费用，接口单独配置的单价优先"""
+        price_prompt = getattr(provider, 'price_prompt', None)
+        price_completion = getattr(provider, 'price_completion', None)
+        price_prompt = self.price_prompt if price_prompt is None else price_prompt
+        price_completion = self.price_completion if price_completion is None else price_completion
+        return (prompt_tokens * price_prompt + completion_tokens * price_completion) / 1000
+
+    def record(self, provider, prompt_tokens: int, completion_tokens: int, latency: float, estimated: bool) -> dict:
+        """记录一次调用"""
+        entry = {
+            'provider': provider.name,
+            'prompt_tokens': int(prompt_tokens),
+            'completion_tokens': int(completion_tokens),
+            'cost': self.cost(provider, prompt_tokens, completion_tokens),
+            'latency': latency,
+            'estimated': estimated,
+        }
+        with self.lock:
+            self._add(self.run, entry)
+            self._add(self.run['providers'].setdefault(provider.name, _empty_totals()), entry)
+            if self.stats is not None:
+                self.stats.record_ai_usage(entry)
+        return entry
+
+    @staticmethod
+    def _add(totals: dict, entry: dict):
+        totals['calls'] += 1
+        totals['prompt_tokens'] += entry['prompt_tokens']
+        totals['completion_tokens'] += entry['completion_tokens']
+        totals['estimated_calls'] += 1 if entry['estimated'] else 0
+        totals['cost'] += entry['cost']
+        totals['latency'] += entry['latency']
+
+    def today_tokens(self) -> int:
+        """今日已用的token数（没有统计数据时为本次运行的用量）"""
+        if self.stats is not None:
+            today = self.stats.get_ai_usage_today()
+        else:
+            today = self.run
+        return today['prompt_tokens'] + today['completion_tokens']
+
+    def budget_exhausted(self) -> bool:
+        """今日token预算是否已用完"""
+        if not self.daily_budget:
+            return False
+        used = self.today_tokens()
+        if used < self.daily_budget:
+            return False
+        if not self._budget_warned:
+            self._budget_warned = True
+            logging.warning(f"💸 今日AI用量 {used} token 已达到预算 {self.daily_budget}，今天剩余的回复改用规则回复")
+        return True
+
+    def summary(self) -> Optional[dict]:
+        """本次运行的用量（没有调用时为None）"""
+        with self.lock:
+            if not self.run['calls']:
+                return None
+            summary = dict(self.run)
+            summary['providers'] = {name: dict(totals) for name, totals in self.run['providers'].items()}
+        return summary
+
+    def report(self):
+        """输出本次运行的用量"""
+        run = self.run
+        if not run['calls']:
+            return run
+        tokens = run['prompt_tokens'] + run['completion_tokens']
+        line = (f"🧾 AI用量: 调用 {run['calls']} 次, token 输入 {run['prompt_tokens']} / 输出 {run['completion_tokens']}"
+                f"（其中 {run['estimated_calls']} 次为估算）, 平均耗时 {run['latency'] / run['calls']:.2f}s")
+        if run['cost']:
+            line += f", 费用 {run['cost']:.4f}"
+        logging.info(line)
+        if self.daily_budget:
+            logging.info(f"   今日已用 {self.today_tokens()}/{self.daily_budget} token（本次 {tokens}）")
+        return run
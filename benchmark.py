@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+用法:
+    python benchmark.py skip [--titles 2000] [--sizes 10 22 64 100 10000]
+    python benchmark.py reply [--verify] [--rounds 20]
+    python benchmark.py tokenize [--titles 2000]
+    python benchmark.py ai [--requests 30] [--format openai] [--latency 0.05] [--latency-dist fixed]
+                           [--token-delay 0.02] [--handshake 0.05] [--error-rate 0] [--repeat-ratio 0.5] [--batch 4]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _random_text(rng, length):
+    """生成随机中文文本（常用汉字区间）"""
+    return ''.join(chr(rng.randint(0x4E00, 0x4FFF)) for _ in range(length))
+
+
+def _naive_skip(title, keywords, prefixes):
+    """原先的逐条检查方式（作为基准与结果对照）"""
+    for keyword in keywords:
+        if keyword in title:
+            return 'skipped_keyword', keyword
+    for prefix in prefixes:
+        if title.startswith(prefix):
+            return 'skipped_prefix', prefix
+    return None
+
+
+def _time_per_call(func, items, repeat=3):
+    """返回每次调用的最短平均耗时（微秒）"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        elapsed = (time.perf_counter() - started) / len(items) * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_skip(args):
+    """跳过规则：逐条检查 vs 自动机/前缀树
+
+    另外单独测量关键词匹配的两种方式（逐个 `in` 与自动机），用于确定 AUTOMATON_MIN_KEYWORDS
+    """
+    from skip_rules import SkipRules, AUTOMATON_MIN_KEYWORDS
+    from text_automaton import AhoCorasick
+
+    rng = random.Random(args.seed)
+    print(f"{'规则数':>8} {'编译(ms)':>10} {'逐条检查(us)':>14} {'编译后(us)':>12} {'加速':>8} "
+          f"{'逐个in(us)':>12} {'自动机(us)':>12}  关键词匹配方式")
+    for size in args.sizes:
+        keywords = [_random_text(rng, rng.randint(2, 4)) for _ in range(size)]
+        prefixes = ['【' + _random_text(rng, rng.randint(1, 3)) for _ in range(max(1, size // 4))]
+
+        titles = []
+        for _ in range(args.titles):
+            title = _random_text(rng, rng.randint(15, 40))
+            roll = rng.random()
+            if roll < 0.1:
+                pos = rng.randint(0, len(title))
+                title = title[:pos] + rng.choice(keywords) + title[pos:]
+            elif roll < 0.15:
+                title = rng.choice(prefixes) + title
+            titles.append(title)
+
+        rules = SkipRules(keywords, prefixes)
+        mismatches = sum(1 for t in titles if rules.match(t) != _naive_skip(t, keywords, prefixes))
+        if mismatches:
+            print(f"❌ {size} 条规则时结果不一致: {mismatches} 个标题")
+            return 1
+
+        naive = _time_per_call(lambda t: _naive_skip(t, keywords, prefixes), titles)
+        compiled = _time_per_call(rules.match, titles)
+        keyword_scan = _time_per_call(lambda t: next((k for k in keywords if k in t), None), titles)
+        keyword_automaton = _time_per_call(AhoCorasick(keywords).first_match, titles)
+        strategy = '自动机' if rules.keyword_matcher is not None else '逐个检查'
+        print(f"{size:>8} {rules.compile_time * 1000:>10.1f} {naive:>14.2f} {compiled:>12.2f} {naive / compiled:>7.1f}x "
+              f"{keyword_scan:>12.2f} {keyword_automaton:>12.2f}  {strategy}")
+    print(f"✅ 结果与逐条检查完全一致（每组 {args.titles} 个标题）")
+    print(f"ℹ️ 关键词达到 {AUTOMATON_MIN_KEYWORDS} 个时改用自动机：纯Python自动机每个字符都有固定开销，"
+          f"关键词较少时逐个 `in`（C实现）更快，见上表两列的交叉点")
+    return 0
+
+
+def bench_reply(args):
+    """规则回复：与固定种子下的原实现输出对照，并测量每秒生成次数"""
+    import json
+    from reply_rules import load_rule_set, DEFAULT_RULES_FILE
+
+    rule_set = load_rule_set(args.rules or DEFAULT_RULES_FILE)
+    with open(args.golden, 'r', encoding='utf-8') as f:
+        cases = json.load(f)['cases']
+    print(f"规则: {rule_set.name} v{rule_set.version}, 模式 {rule_set.pattern_count} 个, "
+          f"短语 {rule_set.phrase_count} 条, 编译 {rule_set.compile_time * 1000:.1f}ms, "
+          f"内存约 {rule_set.memory_size() / 1024:.0f}KB")
+
+    if args.verify:
+        mismatches = 0
+        for case in cases:
+            random.seed(case['seed'])
+            reply, _ = rule_set.generate(case['title'], case['content'])
+            # 下一个随机数也必须一致，确保随机数的调用次数与原实现相同
+            if reply != case['reply'] or random.random() != case['next_random']:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"❌ 不一致: {case['title'][:40]} -> {reply} (期望 {case['reply']})")
+        if mismatches:
+            print(f"❌ {mismatches}/{len(cases)} 个用例与原实现不一致")
+            return 1
+        print(f"✅ {len(cases)} 个用例与原实现逐字一致")
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for case in cases:
+            rule_set.generate(case['title'], case['content'])
+    elapsed = time.perf_counter() - started
+    calls = args.rounds * len(cases)
+    print(f"生成 {calls} 次, 耗时 {elapsed:.2f}s, {calls / elapsed:,.0f} 次/秒")
+    return 0
+
+
+def bench_tokenize(args):
+    """分词：词典冷启动（无缓存/有缓存）与稳定状态下的标题匹配耗时"""
+    import shutil
+    import tempfile
+    from tokenizer import Tokenizer
+    from skip_rules import SkipRules
+    from reply_rules import load_rule_set
+
+    cache_dir = tempfile.mkdtemp(prefix='aw98_jieba_')
+    try:
+        import jieba  # noqa: F401  先导入模块，冷启动只统计词典加载
+    except ImportError:
+        print("❌ 未安装 jieba")
+        return 1
+    try:
+        for label in ('无缓存（首次构建）', '读取词典缓存'):
+            tokenizer = Tokenizer({'tokenizer': {'enabled': True}}, cache_dir=cache_dir)
+            started = time.perf_counter()
+            tokenizer.start()
+            if not tokenizer.wait(60):
+                print("❌ 词典加载失败")
+                return 1
+            print(f"冷启动 {label}: {time.perf_counter() - started:.2f}s")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    rng = random.Random(args.seed)
+    rule_set = load_rule_set()
+    keywords = ['公告', '通知', '规则', '版规', '置顶', '精华', '申诉', '发布器']
+    vocabulary = list(rule_set.matcher.word_masks) + ['位置顶级', '通知书', '美女', '自拍', '高清', '合集']
+    titles = []
+    for _ in range(args.titles):
+        parts = [rng.choice(vocabulary + keywords) if rng.random() < 0.3 else _random_text(rng, rng.randint(2, 4))
+                 for _ in range(rng.randint(3, 8))]
+        titles.append(''.join(parts))
+    # 约一半的标题重复出现（与多次运行/翻页时看到的同一批帖子相当）
+    titles += titles[:len(titles) // 2]
+
+    plain = SkipRules(keywords)
+    cached = SkipRules(keywords, tokenizer=tokenizer)
+    print(f"\n{'方式':<20} {'跳过检查(us)':>14} {'特征提取(us)':>14}")
+    print(f"{'子串匹配':<20} {_time_per_call(plain.match, titles):>14.2f} "
+          f"{_time_per_call(rule_set.extract, titles):>14.2f}")
+
+    tokenized_rules = load_rule_set(tokenizer=tokenizer)
+    tokenizer.cache_size = 0
+    uncached = _time_per_call(cached.match, titles, repeat=1)
+    uncached_extract = _time_per_call(tokenized_rules.extract, titles, repeat=1)
+    print(f"{'分词（无LRU）':<20} {uncached:>14.2f} {uncached_extract:>14.2f}")
+    tokenizer.cache_size = 4096
+    print(f"{'分词（LRU）':<20} {_time_per_call(cached.match, titles):>14.2f} "
+          f"{_time_per_call(tokenized_rules.extract, titles):>14.2f}")
+
+    changed = sum(1 for t in titles if plain.match(t) != cached.match(t))
+    m = tokenizer.metrics
+    print(f"\n跨词边界被排除的跳过判断: {changed}/{len(titles)} 个标题, "
+          f"关键词确认 {m['confirmed']} 次, 排除 {m['rejected']} 次")
+    return 0
+
+
+def _latency_summary(samples):
+    """平均值 / p50 / p95 / p99（毫秒）"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return sum(ordered) / len(ordered) * 1000, pick(0.5), pick(0.95), pick(0.99)
+
+
+def bench_ai(args):
+    """AI接口各调用方式的吞吐量和尾部耗时（本地模拟服务）
+
+    逐个新建连接（requests.post）、共享连接池、连接池+流式、回复缓存、批量并发
+    """
+    import requests
+    from ai_stub_server import StubServer
+    from ai_reply_service import AIReplyService
+
+    server = StubServer(latency=args.latency, handshake=args.handshake, token_delay=args.token_delay,
+                        latency_dist=args.latency_dist, error_rate=args.error_rate, seed=args.seed).start()
+    url = server.endpoint(args.format)
+    payload = {'model': 'stub', 'messages': [{'role': 'user', 'content': '测试'}], 'prompt': '测试'}
+
+    def make_service(**overrides):
+        # 不使用缓存和流式（由各方式单独开启），熔断阈值调高，避免模拟的错误让后续请求被跳过
+        config = {'enable_ai_reply': True, 'ai_api_type': args.format, 'ai_api_url': url, 'ai_api_key': 'stub',
+                  'ai_stream': False, 'ai_reply_cache': {'enabled': False},
+                  'ai_failover': {'failure_threshold': 10 ** 6, 'slow_p95_seconds': 0}}
+        config.update(overrides)
+        return AIReplyService(config)
+
+    def report(label, samples, elapsed, succeeded, connections, first_tokens=()):
+        mean, p50, p95, p99 = _latency_summary(samples)
+        ttft = f"{sum(first_tokens) / len(first_tokens) * 1000:.1f}" if first_tokens else '-'
+        print(f"{label:<16} {succeeded:>4}/{len(samples):<4} {len(samples) / elapsed:>9.1f} {ttft:>9} "
+              f"{mean:>9.1f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {connections:>7}")
+        return {'mean': mean, 'p95': p95, 'throughput': len(samples) / elapsed}
+
+    def run(label, call, service=None):
+        """逐个调用 call(序号)，call 返回是否成功"""
+        before = server.stats['connections']
+        samples, first_tokens = [], []
+        succeeded = 0
+        started_all = time.perf_counter()
+        for index in range(args.requests):
+            started = time.perf_counter()
+            succeeded += 1 if call(index) else 0
+            samples.append(time.perf_counter() - started)
+            timing = service.last_timing if service is not None and not service.last_from_cache else None
+            if timing and timing['ttft'] is not None:
+                first_tokens.append(timing['ttft'])
+        elapsed = time.perf_counter() - started_all
+        return report(label, samples, elapsed, succeeded, server.stats['connections'] - before, first_tokens)
+
+    def raw_post(index):
+        response = requests.post(url, json=payload, headers={'Connection': 'close'}, timeout=30)
+        response.json()
+        return response.status_code == 200
+
+    rng = random.Random(args.seed)
+    # 缓存：标题从较少的几个中重复抽取，模拟重试和重复出现的帖子
+    unique_titles = max(1, int(args.requests * (1 - args.repeat_ratio)))
+    cached_titles = [f'缓存标题{rng.randrange(unique_titles)}' for _ in range(args.requests)]
+
+    print(f"模拟服务: {args.format} 格式, 首字 {args.latency * 1000:.0f}ms（{args.latency_dist}）, "
+          f"每段 {args.token_delay * 1000:.0f}ms, 新连接握手 {args.handshake * 1000:.0f}ms, "
+          f"错误率 {args.error_rate:.0%}, 请求 {args.requests} 次")
+    print(f"{'方式':<16} {'成功':>9} {'吞吐(条/s)':>9} {'首字(ms)':>9} {'平均(ms)':>9} "
+          f"{'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'新连接':>7}")
+    results = {}
+    try:
+        # 原先的方式：每次调用模块级 requests.post，每个请求都新建连接，等待完整响应
+        results['sequential'] = run('逐个新建连接', raw_post)
+        pooled_service = make_service()
+        results['pooled'] = run('共享连接池', lambda i: pooled_service.generate_reply(f'测试标题{i}'), pooled_service)
+        stream_service = make_service(ai_stream=True)
+        results['streamed'] = run('连接池+流式', lambda i: stream_service.generate_reply(f'测试标题{i}'),
+                                  stream_service)
+        cache_service = make_service(ai_stream=True, ai_reply_cache={'enabled': True, 'persist': False})
+        results['cached'] = run('流式+缓存', lambda i: cache_service.generate_reply(cached_titles[i]), cache_service)
+        cache_metrics = cache_service.cache.metrics
+
+        # 批量：一次为 batch 个帖子并发生成，统计每条回复从开始请求到完成的耗时
+        batch_service = make_service(ai_stream=True, ai_batch_concurrency=args.batch)
+        samples = []
+        generate_reply = batch_service.generate_reply
+
+        def timed_generate(*call_args, **call_kwargs):
+            started = time.perf_counter()
+            reply = generate_reply(*call_args, **call_kwargs)
+            samples.append(time.perf_counter() - started)
+            return reply
+
+        batch_service.generate_reply = timed_generate
+        items = [{'tid': str(i), 'title': f'批量标题{i}', 'content': ''} for i in range(args.requests)]
+        before = server.stats['connections']
+        succeeded = 0
+        started = time.perf_counter()
+        for offset in range(0, len(items), args.batch):
+            replies = batch_service.generate_replies_batch(items[offset:offset + args.batch])
+            succeeded += sum(1 for reply in replies.values() if reply)
+        elapsed = time.perf_counter() - started
+        results['batched'] = report(f'批量并发({args.batch})', samples, elapsed, succeeded,
+                                    server.stats['connections'] - before)
+    finally:
+        server.stop()
+
+    base = results['sequential']
+    print(f"缓存命中 {cache_metrics['hits']}/{cache_metrics['hits'] + cache_metrics['misses']} 次, "
+          f"流式提前断开 {server.stats['aborted']} 次, 模拟错误 {server.stats['errors']} 次")
+    for key, label in (('pooled', '共享连接池'), ('streamed', '连接池+流式'), ('cached', '流式+缓存'),
+                       ('batched', '批量并发')):
+        print(f"{label}: 吞吐为逐个新建连接的 {results[key]['throughput'] / base['throughput']:.1f} 倍，"
+              f"p95 {base['p95']:.1f}ms → {results[key]['p95']:.1f}ms")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AW98tang 性能基准测试')
+    parser.add_argument('--seed', type=int, default=98, help='随机种子')
+    subparsers = parser.add_subparsers(dest='command')
+
+    skip_parser = subparsers.add_parser('skip', help='帖子跳过规则匹配')
+    skip_parser.add_argument('--titles', type=int, default=2000, help='每组测试的标题数量')
+    skip_parser.add_argument('--sizes', type=int, nargs='+', default=[10, 22, 64, 100, 10000], help='规则数量')
+    skip_parser.set_defaults(func=bench_skip)
+
+    reply_parser = subparsers.add_parser('reply', help='规则回复生成')
+    reply_parser.add_argument('--verify', action='store_true', help='与 rules/smart_reply_golden.json 逐字对照')
+    reply_parser.add_argument('--golden', default=os.path.join(BASE_DIR, 'rules', 'smart_reply_golden.json'),
+                              help='对照用例文件')
+    reply_parser.add_argument('--rules', default=None, help='规则文件（默认内置规则）')
+    reply_parser.add_argument('--rounds', type=int, default=20, help='测速轮数')
+    reply_parser.set_defaults(func=bench_reply)
+
+    tokenize_parser = subparsers.add_parser('tokenize', help='jieba 分词冷启动与标题匹配')
+    tokenize_parser.add_argument('--titles', type=int, default=2000, help='测试的标题数量')
+    tokenize_parser.set_defaults(func=bench_tokenize)
+
+    ai_parser = subparsers.add_parser('ai', help='AI接口各调用方式的吞吐量和尾部耗时（本地模拟服务）')
+    ai_parser.add_argument('--requests', type=int, default=30, help='每种方式的请求次数')
+    ai_parser.add_argument('--format', choices=['openai', 'claude', 'custom'], default='openai', help='接口格式')
+    ai_parser.add_argument('--latency', type=float, default=0.05, help='模拟平均首字耗时（秒）')
+    ai_parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'exponential', 'lognormal'],
+                           default='fixed', help='首字耗时的分布')
+    ai_parser.add_argument('--error-rate', type=float, default=0.0, help='模拟服务返回错误的比例（0-1）')
+    ai_parser.add_argument('--repeat-ratio', type=float, default=0.5, help='缓存方式中重复标题的比例')
+    ai_parser.add_argument('--token-delay', type=float, default=0.02, help='模拟每段输出耗时（秒）')
+    ai_parser.add_argument('--handshake', type=float, default=0.05, help='模拟每个新连接的握手耗时（秒）')
+    ai_parser.add_argument('--batch', type=int, default=4, help='批量生成时的并发数')
+    ai_parser.set_defaults(func=bench_ai)
+
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器预热池
+在多次运行/重试之间复用同一个健康的Chrome实例，避免每次冷启动Chrome和ChromeDriver
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _process_tree_rss_mb(pid):
+    """统计进程及其所有子进程的常驻内存（MB）"""
+    if psutil:
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+            total = 0
+            for proc in procs:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / 1024 / 1024
+        except psutil.Error:
+            return None
+
+    # 无psutil时在Linux上直接读取/proc
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+            rss[int(entry)] = int(fields[21]) * os.sysconf('SC_PAGE_SIZE')
+        except Exception:
+            continue
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total / 1024 / 1024 if total else None
+
+
+class BrowserManager:
+    """长期存活的浏览器管理器（配置项 browser_pool）"""
+
+    def __init__(self, config: dict):
+        self.lock = threading.Lock()
+        self.driver = None
+        self.wait = None
+        self.headless = None
+        self.policy_active = False
+        self.owner = None  # 当前占用预热浏览器的机器人实例
+        self.runs = 0
+        self.last_release = None
+        self.cold_start_times = []
+        self.total_saved = 0.0
+        self.update_config(config)
+
+    def update_config(self, config: dict):
+        """更新回收策略（配置文件修改后无需重启）"""
+        pool_config = config.get('browser_pool', {}) or {}
+        self.max_runs = int(pool_config.get('max_runs', 20))
+        self.max_rss_mb = int(pool_config.get('max_rss_mb', 1024))
+        self.max_idle_minutes = int(pool_config.get('max_idle_minutes', 720))
+
+    def _avg_cold_start(self):
+        if not self.cold_start_times:
+            return 0.0
+        return sum(self.cold_start_times) / len(self.cold_start_times)
+
+    def _rss_mb(self):
+        try:
+            pid = self.driver.service.process.pid
+        except Exception:
+            return None
+        return _process_tree_rss_mb(pid)
+
+    def _recycle_reason(self, headless):
+        """返回需要回收浏览器的原因，无需回收时返回None"""
+        if self.driver is None:
+            return "无可用浏览器"
+        if self.headless != headless:
+            return "启动模式变化"
+        if self.runs >= self.max_runs:
+            return f"已复用 {self.runs} 次（上限 {self.max_runs}）"
+        if self.last_release and self.max_idle_minutes > 0:
+            idle = (time.time() - self.last_release) / 60
+            if idle > self.max_idle_minutes:
+                return f"空闲 {idle:.0f} 分钟"
+        try:
+            _ = self.driver.current_url
+        except Exception:
+            return "浏览器无响应"
+        rss = self._rss_mb()
+        if rss is not None and self.max_rss_mb > 0 and rss > self.max_rss_mb:
+            return f"内存占用 {rss:.0f}MB 超过 {self.max_rss_mb}MB"
+        return None
+
+    def _shutdown(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logging.debug(f"关闭预热浏览器出错: {e}")
+        self.driver = None
+        self.wait = None
+        self.runs = 0
+
+    def acquire(self, bot, headless=False) -> bool:
+        """为机器人分配浏览器：优先复用预热实例，否则冷启动
+
+        Returns:
+            是否成功获得可用的浏览器
+        """
+        with self.lock:
+            if self.owner is not None:
+                # 已被其他任务占用，回退为独立浏览器
+                logging.info("ℹ️ 预热浏览器正在使用中，本次单独启动浏览器")
+                return bot.setup_driver(headless=headless)
+
+            reason = self._recycle_reason(headless)
+            if reason is None:
+                self.runs += 1
+                self.owner = bot
+                bot.driver = self.driver
+                bot.wait = self.wait
+                bot.resource_policy.active = self.policy_active
+                saved = self._avg_cold_start()
+                self.total_saved += saved
+                logging.info(f"♻️ 复用预热浏览器（第 {self.runs} 次），节省启动时间约 {saved:.1f} 秒，累计节省 {self.total_saved:.1f} 秒")
+                return True
+
+            if self.driver is not None:
+                logging.info(f"🔄 回收预热浏览器: {reason}")
+            self._shutdown()
+
+            started = time.time()
+            if not bot.setup_driver(headless=headless):
+                return False
+            elapsed = time.time() - started
+            self.cold_start_times = (self.cold_start_times + [elapsed])[-10:]
+            logging.info(f"🔥 浏览器冷启动耗时 {elapsed:.1f} 秒，已加入预热池")
+
+            self.driver = bot.driver
+            self.wait = bot.wait
+            self.headless = headless
+            self.policy_active = bot.resource_policy.active
+            self.runs = 1
+            self.owner = bot
+            return True
+
+    def release(self, bot):
+        """归还浏览器：清理页面状态后保持存活，供下次运行复用"""
+        with self.lock:
+            driver, wait = bot.driver, bot.wait
+            bot.driver = None
+            bot.wait = None
+
+            if bot is not self.owner:
+                # 不属于预热池的独立浏览器，直接关闭
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                return
+
+            self.owner = None
+            if driver is None:
+                return
+            if driver is not self.driver:
+                # 运行中浏览器被重启过（ensure_driver_alive），接管新实例
+                self._shutdown()
+                self.driver = driver
+                self.wait = wait
+                self.runs = 1
+
+            self.last_release = time.time()
+            try:
+                handles = self.driver.window_handles
+                for handle in handles[1:]:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                self.driver.switch_to.window(handles[0])
+                self.driver.get('about:blank')
+                logging.info("🅿️ 浏览器已归还预热池")
+            except Exception as e:
+                logging.warning(f"⚠️ 浏览器状态清理失败，下次将重新启动: {e}")
+                self._shutdown()
+
+    def shutdown(self):
+        """关闭预热浏览器"""
+        with self.lock:
+            self._shutdown()
+            self.owner = None
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_browser_manager(config: dict):
+    """根据配置返回全局浏览器管理器；未启用时返回None并关闭已有实例"""
+    global _manager
+    with _manager_lock:
+        enabled = (config.get('browser_pool', {}) or {}).get('enabled', False)
+        if not enabled:
+            if _manager is not None:
+                _manager.shutdown()
+                _manager = None
+            return None
+        if _manager is None:
+            _manager = BrowserManager(config)
+            atexit.register(_manager.shutdown)
+        else:
+            _manager.update_config(config)
+        return _manager
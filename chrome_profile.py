@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome持久化用户目录与磁盘缓存管理
+复用HTTP缓存、本地存储和Cookie，并在目录损坏或超限时自动清理
+"""
+
+import os
+import json
+import time
+import shutil
+import socket
+import logging
+
+# 可以安全清理的缓存子目录（相对于用户目录）
+CACHE_SUBDIRS = [
+    os.path.join('Default', 'Cache'),
+    os.path.join('Default', 'Code Cache'),
+    os.path.join('Default', 'GPUCache'),
+    os.path.join('Default', 'Service Worker', 'CacheStorage'),
+    os.path.join('Default', 'Service Worker', 'ScriptCache'),
+    'ShaderCache',
+    'GrShaderCache',
+]
+
+LOCK_FILES = ['SingletonLock', 'SingletonCookie', 'SingletonSocket', 'lockfile']
+
+# 用于检测损坏的JSON文件
+STATE_FILES = ['Local State', os.path.join('Default', 'Preferences')]
+
+# 启动失败信息中表示用户目录被占用或损坏的关键字（小写）
+PROFILE_ERROR_MARKERS = [
+    'user data directory is already in use',
+    'singletonlock',
+    'singletoncookie',
+    'singletonsocket',
+    'profile appears to be in use',
+    'cannot create default profile directory',
+    'failed to create a profileimpl',
+    'preferences file is corrupt',
+]
+
+
+def _dir_size_mb(path):
+    """统计目录大小（MB）"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total / 1024 / 1024
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except PermissionError:
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+class ChromeProfile:
+    """持久化Chrome用户目录（配置项 browser_profile）"""
+
+    def __init__(self, config: dict):
+        profile_config = config.get('browser_profile', {}) or {}
+        self.enabled = bool(profile_config.get('enabled', False))
+        self.profile_dir = os.path.abspath(profile_config.get('profile_dir', 'data/chrome_profile'))
+        self.cache_dir = os.path.abspath(profile_config.get('cache_dir', 'data/chrome_cache'))
+        self.max_cache_mb = int(profile_config.get('max_cache_mb', 200))
+        self.max_profile_mb = int(profile_config.get('max_profile_mb', 500))
+
+    def _lock_owner_alive(self):
+        """检查用户目录是否被其他正在运行的Chrome占用，顺便清理失效的锁文件"""
+        lock_path = os.path.join(self.profile_dir, 'SingletonLock')
+        try:
+            target = os.readlink(lock_path)  # 格式: 主机名-进程号
+        except OSError:
+            target = None
+
+        if target:
+            host, _, pid = target.rpartition('-')
+            if host == socket.gethostname() and pid.isdigit() and _pid_alive(int(pid)):
+                return True
+
+        for name in LOCK_FILES:
+            path = os.path.join(self.profile_dir, name)
+            if os.path.lexists(path):
+                try:
+                    os.remove(path)
+                    logging.debug(f"清理失效的锁文件: {path}")
+                except OSError:
+                    pass
+        return False
+
+    def _is_corrupted(self):
+        for name in STATE_FILES:
+            path = os.path.join(self.profile_dir, name)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    json.load(f)
+            except Exception as e:
+                logging.warning(f"⚠️ 浏览器用户目录文件损坏: {name} ({e})")
+                return True
+        return False
+
+    def is_profile_error(self, error) -> bool:
+        """启动失败是否由用户目录被占用或损坏引起（驱动版本不匹配、找不到浏览器等不算）"""
+        message = str(error).lower()
+        if any(marker in message for marker in PROFILE_ERROR_MARKERS):
+            return True
+        return self._is_corrupted()
+
+    def clear_cache(self):
+        """清理磁盘缓存（不影响Cookie和本地存储）"""
+        for path in [self.cache_dir] + [os.path.join(self.profile_dir, d) for d in CACHE_SUBDIRS]:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def reset(self, reason):
+        """放弃当前用户目录，改用全新目录（保留一份备份用于排查）"""
+        logging.warning(f"🗑️ 重置浏览器用户目录: {reason}")
+        backup = self.profile_dir + '.corrupt'
+        shutil.rmtree(backup, ignore_errors=True)
+        try:
+            if os.path.exists(self.profile_dir):
+                os.replace(self.profile_dir, backup)
+        except OSError:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.profile_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def prepare(self) -> bool:
+        """启动前检查：占用、损坏、容量
+
+        Returns:
+            用户目录是否可用；不可用时调用方应使用临时目录
+        """
+        if not self.enabled:
+            return False
+        started = time.time()
+        os.makedirs(self.profile_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        if self._lock_owner_alive():
+            logging.info("ℹ️ 持久化用户目录正被其他浏览器使用，本次使用临时目录")
+            return False
+
+        if self._is_corrupted():
+            self.reset("状态文件损坏")
+            return True
+
+        cache_mb = _dir_size_mb(self.cache_dir)
+        if self.max_cache_mb > 0 and cache_mb > self.max_cache_mb:
+            logging.info(f"🧹 磁盘缓存 {cache_mb:.0f}MB 超过上限 {self.max_cache_mb}MB，正在清理...")
+            self.clear_cache()
+
+        profile_mb = _dir_size_mb(self.profile_dir)
+        if self.max_profile_mb > 0 and profile_mb > self.max_profile_mb:
+            logging.info(f"🧹 用户目录 {profile_mb:.0f}MB 超过上限 {self.max_profile_mb}MB，正在压缩...")
+            self.clear_cache()
+            profile_mb = _dir_size_mb(self.profile_dir)
+            if profile_mb > self.max_profile_mb:
+                self.reset(f"清理缓存后仍有 {profile_mb:.0f}MB")
+
+        logging.debug(f"用户目录检查耗时 {time.time() - started:.2f}秒")
+        return True
+
+    def apply(self, chrome_options):
+        """添加Chrome启动参数"""
+        chrome_options.add_argument(f'--user-data-dir={self.profile_dir}')
+        chrome_options.add_argument(f'--disk-cache-dir={self.cache_dir}')
+        if self.max_cache_mb > 0:
+            chrome_options.add_argument(f'--disk-cache-size={self.max_cache_mb * 1024 * 1024}')
+        logging.info(f"💾 使用持久化浏览器用户目录: {self.profile_dir}")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP快速通道
+只读页面（登录检查、用户信息、帖子列表）直接用requests获取，省去浏览器导航；
+遇到非HTML或异常页面时返回None，由调用方回退到Selenium
+"""
+
+import time
+import logging
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from page_parsers import is_blocked_page
+
+
+class HttpFetcher:
+    """基于 requests.Session 的只读页面获取器（配置项 http_fast_path）"""
+
+    def __init__(self, config: dict, browser_headers: dict):
+        fast_config = config.get('http_fast_path', {}) or {}
+        self.enabled = bool(fast_config.get('enabled', False))
+        self.timeout = fast_config.get('timeout', 15)
+        pool_size = int(fast_config.get('pool_size', 4))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        headers = {
+            'User-Agent': browser_headers.get('user_agent', ''),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Connection': 'keep-alive',
+        }
+        if browser_headers.get('accept_language'):
+            headers['Accept-Language'] = browser_headers['accept_language']
+        for key in ('sec_ch_ua', 'sec_ch_ua_mobile', 'sec_ch_ua_platform'):
+            if browser_headers.get(key):
+                headers[key.replace('_', '-')] = browser_headers[key]
+        self.session.headers.update({k: v for k, v in headers.items() if v})
+
+        self.has_cookies = False
+        self.metrics = {
+            'requests': 0,
+            'replaced_navigations': 0,
+            'fallbacks': 0,
+            'bytes': 0,
+            'elapsed': 0.0,
+        }
+
+    def load_cookies(self, cookies):
+        """载入登录Cookie（来自浏览器或已保存的登录状态）"""
+        if not self.enabled or not cookies:
+            return
+        self.session.cookies.clear()
+        for cookie in cookies:
+            try:
+                self.session.cookies.set(
+                    cookie['name'], cookie.get('value', ''),
+                    domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+                )
+            except Exception as e:
+                logging.debug(f"同步Cookie失败 ({cookie.get('name')}): {e}")
+        self.has_cookies = True
+
+    def sync_from_driver(self, driver):
+        """从浏览器同步最新Cookie"""
+        if not self.enabled or driver is None:
+            return
+        try:
+            self.load_cookies(driver.get_cookies())
+        except Exception as e:
+            logging.debug(f"从浏览器同步Cookie失败: {e}")
+
+    def fetch_html(self, url) -> Optional[str]:
+        """获取页面HTML，遇到异常响应返回None"""
+        if not self.enabled or not self.has_cookies:
+            return None
+
+        started = time.time()
+        self.metrics['requests'] += 1
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except Exception as e:
+            logging.debug(f"HTTP快速通道请求失败，回退浏览器: {e}")
+            self.metrics['fallbacks'] += 1
+            return None
+        finally:
+            self.metrics['elapsed'] += time.time() - started
+
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code != 200 or 'html' not in content_type:
+            logging.debug(f"HTTP快速通道响应异常 ({response.status_code}, {content_type})，回退浏览器")
+            self.metrics['fallbacks'] += 1
+            return None
+
+        if 'action=login' in response.url:
+            logging.debug("HTTP快速通道被重定向到登录页，回退浏览器")
+            self.metrics['fallbacks'] += 1
+            return None
+
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+        page_source = response.text
+        if is_blocked_page(page_source):
+            logging.debug("HTTP快速通道遇到验证页面，回退浏览器")
+            self.metrics['fallbacks'] += 1
+            return None
+
+        self.metrics['bytes'] += len(response.content)
+        return page_source
+
+    def record_replaced(self):
+        """记录一次被替代的浏览器导航"""
+        self.metrics['replaced_navigations'] += 1
+
+    def report(self):
+        """输出本次运行的快速通道统计"""
+        if not self.enabled or not self.metrics['requests']:
+            return self.metrics
+        m = self.metrics
+        logging.info(
+            f"⚡ HTTP快速通道: 请求 {m['requests']} 次, 替代浏览器导航 {m['replaced_navigations']} 次, "
+            f"回退 {m['fallbacks']} 次, 耗时 {m['elapsed']:.1f}秒, 流量 {m['bytes'] / 1024:.0f} KB"
+        )
+        return m
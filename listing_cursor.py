@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论坛列表游标
+按论坛记录上次看到的最大tid、已处理到的页码和首页指纹（data/forum_cursors.json），
+首页没有变化时直接从上次的页码继续，不再重复翻阅已处理过的页面
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+CURSOR_VERSION = 1
+
+
+def listing_fingerprint(posts):
+    """列表页指纹：按页面顺序的tid序列"""
+    raw = ','.join(post.get('tid', '') for post in posts)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+class ListingCursors:
+    """论坛列表游标（配置项 forum_listing）"""
+
+    def __init__(self, config: dict, path='data/forum_cursors.json'):
+        listing_config = config.get('forum_listing', {}) or {}
+        self.max_pages = max(1, int(listing_config.get('max_pages', 3)))
+        self.path = path
+        self.cursors = {}
+        self.dirty = False
+        self.metrics = {
+            'pages_loaded': 0,
+            'pages_skipped': 0,
+            'forums_unchanged': 0,
+        }
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CURSOR_VERSION:
+                self.cursors = data.get('forums', {})
+        except Exception as e:
+            logging.warning(f"⚠️ 读取论坛列表游标失败: {e}")
+
+    def start(self, forum_id, first_page):
+        """根据首页内容确定本次从第几页开始处理
+
+        首页指纹与上次相同时，说明首页帖子都已处理过，从上次停下的页码继续；
+        否则从第1页开始
+
+        Returns:
+            起始页码（大于 max_pages 时表示本论坛无需处理）
+        """
+        fingerprint = listing_fingerprint(first_page)
+        cursor = self.cursors.get(forum_id) or {}
+        tids = [int(post['tid']) for post in first_page if post.get('tid', '').isdigit()]
+        last_tid = cursor.get('last_tid', 0)
+        new_threads = sum(1 for tid in tids if tid > last_tid)
+
+        page = 1
+        if cursor.get('fingerprint') == fingerprint:
+            page = max(1, int(cursor.get('page', 1)))
+            self.metrics['forums_unchanged'] += 1
+            if page > self.max_pages:
+                logging.info(f"📌 {forum_id} 列表无变化，前 {self.max_pages} 页均已处理，跳过")
+            elif page > 1:
+                logging.info(f"📌 {forum_id} 列表无变化，从第 {page} 页继续")
+            # 首页已加载但无需评估，其余已处理页面无需加载
+            self.metrics['pages_skipped'] += min(page, self.max_pages + 1) - 2 if page > 2 else 0
+        elif cursor:
+            logging.info(f"📌 {forum_id} 列表有更新（新帖 {new_threads} 个），从第1页开始")
+
+        self.cursors[forum_id] = {
+            'fingerprint': fingerprint,
+            'page': page,
+            'last_tid': max(tids + [last_tid]),
+            'updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.dirty = True
+        return page
+
+    def advance(self, forum_id, page):
+        """记录该论坛已处理完的页码（下次从 page 开始）"""
+        cursor = self.cursors.get(forum_id)
+        if cursor is not None and page > cursor.get('page', 1):
+            cursor['page'] = page
+            self.dirty = True
+
+    def record_page_load(self):
+        self.metrics['pages_loaded'] += 1
+
+    def save(self):
+        """写入游标文件（仅在有变化时）"""
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CURSOR_VERSION, 'forums': self.cursors}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except Exception as e:
+            logging.warning(f"⚠️ 保存论坛列表游标失败: {e}")
+
+    def report(self):
+        """输出列表翻页统计"""
+        m = self.metrics
+        if m['pages_loaded']:
+            logging.info(
+                f"📑 论坛列表: 加载 {m['pages_loaded']} 页, 游标跳过 {m['pages_skipped']} 页, "
+                f"首页无变化的论坛 {m['forums_unchanged']} 个"
+            )
+        return m
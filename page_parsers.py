@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论坛页面解析
+基于lxml直接解析HTML，可同时用于浏览器页面源码和HTTP快速通道获取的页面
+"""
+
+import re
+from urllib.parse import urljoin
+from lxml import html as lxml_html
+
+TID_PATTERN = re.compile(r'tid[=-](\d+)')
+PAGE_PARAM_PATTERN = re.compile(r'&page=\d+')
+EXTRA_PARAM_PATTERN = re.compile(r'&extra=.*')
+
+# 页面异常标识：年龄验证、Cloudflare验证等（遇到时需交给浏览器处理）
+BLOCKED_MARKERS = ['满18岁', 'If you are over 18', 'Just a moment', 'Checking your browser', 'CF$cv$params']
+
+LOGOUT_MARKER = 'member.php?mod=logging&action=logout'
+
+# 用户信息字段 -> 按优先级排列的匹配模式（每个模式只有一个捕获分组）
+PROFILE_FIELD_PATTERNS = {
+    # 用户组（如：Lv5 小有名气），支持HTML标签和空白字符
+    'user_group': [
+        r'用户组[：:]\s*([^<\n]+)',
+        r'用户组[：:]</em>\s*([^<\n]+)',
+        r'>用户组[：:]\s*</em>\s*<em[^>]*>([^<]+)</em>',
+    ],
+    # 数值字段匹配 <em>积分</em>108 格式（无冒号），兼容带冒号的格式
+    'credits': [r'<em>积分</em>\s*(\d+)', r'>积分</em>\s*(\d+)', r'积分[：:]\s*(\d+)'],
+    'money': [r'<em>金钱</em>\s*(\d+)', r'>金钱</em>\s*(\d+)', r'金钱[：:]\s*(\d+)'],
+    'coins': [r'<em>色币</em>\s*(\d+)', r'>色币</em>\s*(\d+)', r'色币[：:]\s*(\d+)'],
+    'rating': [r'<em>评分</em>\s*(\d+)', r'>评分</em>\s*(\d+)', r'评分[：:]\s*(\d+)'],
+}
+
+# 字段在页面中的标签；一次扫描找出所有标签，只在标签处用该字段的模式做锚定匹配
+PROFILE_LABELS = {'用户组': 'user_group', '积分': 'credits', '金钱': 'money', '色币': 'coins', '评分': 'rating'}
+PROFILE_LABEL_PATTERN = re.compile('|'.join(PROFILE_LABELS))
+# 标签 -> [(预编译模式, 标签在模式中的偏移)]，按优先级排列
+PROFILE_MATCHERS = {
+    label: [(re.compile(pattern), pattern.index(label)) for pattern in PROFILE_FIELD_PATTERNS[field]]
+    for label, field in PROFILE_LABELS.items()
+}
+
+
+def is_blocked_page(page_source):
+    """是否为年龄验证/Cloudflare等需要浏览器处理的页面"""
+    return any(marker in page_source for marker in BLOCKED_MARKERS)
+
+
+def is_logged_in(page_source, username=''):
+    """根据页面内容判断是否处于登录状态"""
+    indicators = [
+        LOGOUT_MARKER in page_source,
+        'space-username' in page_source,
+        bool(username) and f'>{username}<' in page_source,
+    ]
+    return any(indicators)
+
+
+def parse_forum_posts(page_source, page_url, max_posts=20):
+    """解析论坛列表页中的帖子链接
+
+    Args:
+        page_source: 列表页HTML
+        page_url: 列表页URL（用于补全相对链接）
+        max_posts: 最多返回的帖子数量（None表示不限制）
+
+    Returns:
+        [{'url', 'title', 'tid'}]，按页面顺序去重
+    """
+    posts = []
+    seen_tids = set()
+    try:
+        tree = lxml_html.fromstring(page_source)
+    except Exception:
+        return posts
+
+    for link in tree.xpath("//a[contains(@href, 'thread-') or contains(@href, 'tid=')]"):
+        if max_posts is not None and len(posts) >= max_posts:
+            break
+
+        href = link.get('href') or ''
+        title = link.text_content().strip()
+        if not href or not title or 'thread' not in href:
+            continue
+
+        tid_match = TID_PATTERN.search(href)
+        if not tid_match:
+            continue
+        tid = tid_match.group(1)
+        if tid in seen_tids:
+            continue  # 跳过重复的帖子
+        seen_tids.add(tid)
+
+        # 清理URL，只保留主要的帖子链接（去掉页码）
+        clean_url = PAGE_PARAM_PATTERN.sub('', urljoin(page_url, href))
+        clean_url = EXTRA_PARAM_PATTERN.sub('', clean_url)
+        posts.append({
+            'url': clean_url,
+            'title': title,
+            'tid': tid
+        })
+    return posts
+
+
+def extract_user_info(page_source):
+    """单次扫描提取用户信息（用户组、积分、金钱、色币、评分）
+
+    扫描一次页面找出各字段的标签，只在标签处做锚定匹配；各模式互不消耗字符，
+    同一字段有多个模式命中时按 PROFILE_FIELD_PATTERNS 中的优先级取值，结果与逐个 re.search 相同。
+    应传入当前用户的个人资料页或签到结果页，帖子页中包含其他用户的资料。
+
+    Returns:
+        (user_info, found) - found 为实际匹配到的字段名集合
+    """
+    user_info = {
+        "user_group": "",
+        "credits": 0,
+        "money": 0,
+        "coins": 0,
+        "rating": 0
+    }
+    best = {}  # 字段 -> (优先级, 原始值)
+    for label_match in PROFILE_LABEL_PATTERN.finditer(page_source):
+        label = label_match.group(0)
+        field = PROFILE_LABELS[label]
+        # 每个模式的命中都包含该字段的标签，且位置固定，因此按标签顺序得到的第一个命中即 re.search 的结果
+        limit = best[field][0] if field in best else len(PROFILE_MATCHERS[label])
+        for rank, (pattern, offset) in enumerate(PROFILE_MATCHERS[label][:limit]):
+            start = label_match.start() - offset
+            match = pattern.match(page_source, start) if start >= 0 else None
+            if match:
+                best[field] = (rank, match.group(1))
+                break
+        if len(best) == len(PROFILE_LABELS) and all(rank == 0 for rank, _ in best.values()):
+            break
+
+    for field, (_, value) in best.items():
+        user_info[field] = value.strip() if field == 'user_group' else int(value)
+    return user_info, set(best)
+
+
+# 帖子正文所在元素（按优先级），与浏览器端的选择器 .t_f / .pcb / #postmessage_ / .message 对应
+POST_CONTENT_XPATHS = [
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' t_f ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' pcb ')]",
+    "//*[starts-with(@id, 'postmessage_')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' message ')]",
+]
+
+# 页面上不可见的干扰内容（Discuz防复制的随机字符、隐藏元素、脚本）
+HIDDEN_CONTENT_XPATH = (
+    ".//script | .//style | .//*[contains(concat(' ', normalize-space(@class), ' '), ' jammer ')]"
+    " | .//*[contains(translate(@style, ' ', ''), 'display:none')]"
+)
+
+
+def extract_post_content(page_source, max_length=500):
+    """提取帖子首楼正文（与浏览器中可见文本保持一致）"""
+    try:
+        tree = lxml_html.fromstring(page_source)
+    except Exception:
+        return ""
+
+    for xpath in POST_CONTENT_XPATHS:
+        elements = tree.xpath(xpath)
+        if not elements:
+            continue
+        element = elements[0]
+        for hidden in element.xpath(HIDDEN_CONTENT_XPATH):
+            hidden.drop_tree()
+        lines = [line.strip() for line in element.text_content().splitlines()]
+        return '\n'.join(line for line in lines if line)[:max_length]
+    return ""
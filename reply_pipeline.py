@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回帖流水线
+把回帖流程拆成可组合的生成器阶段：列表 -> 过滤 -> 读取正文 -> 生成回复 -> 提交（测试模式为演练），
+正常模式和测试模式共用同一套实现，每个阶段单独统计耗时和数量
+"""
+
+import time
+import random
+import logging
+import itertools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from page_parsers import extract_post_content
+from listing_cursor import listing_fingerprint
+from thread_cache import RULE_DECISIONS, DECISION_REPLIED, DECISION_FAILED
+
+STAGE_ORDER = ['listing', 'filter', 'enrich', 'generate', 'submit']
+
+_END = object()
+
+
+class ReplyPipeline:
+    """回帖流水线
+
+    每个阶段是一个接收上游迭代器、产出帖子字典的生成器函数，可通过 stages 参数替换，
+    例如用 lxml 读取正文、或带缓存的回复生成。帖子字典在各阶段间逐步补充字段：
+    listing: url/title/tid/forum_id，enrich: content，generate: reply，submit: success
+    """
+
+    def __init__(self, bot, test_mode=False, stages=None):
+        self.bot = bot
+        self.test_mode = test_mode
+        self.stages = {
+            'listing': self.listing_stage,
+            'filter': self.filter_stage,
+            # 启用HTTP快速通道时直接解析帖子页面，省去浏览器渲染
+            'enrich': self.lxml_enrich_stage if bot.http_fetcher.enabled else self.browser_enrich_stage,
+            # 启用AI回复且通过HTTP快速通道读取正文时，一次为多个帖子并发生成回复；
+            # 浏览器读取正文时提交前还要再次打开帖子，批量会让页面加载翻倍，因此逐个生成
+            'generate': self.batch_generate_stage if self._use_ai_batch(bot) else self.generate_stage,
+            'submit': self.dry_run_stage if test_mode else self.submit_stage,
+        }
+        if stages:
+            self.stages.update(stages)
+        self.metrics = {name: {'in': 0, 'out': 0, 'elapsed': 0.0} for name in STAGE_ORDER}
+        # 回复间隔期间后台准备下一个帖子的统计
+        self.prefetch_metrics = {'prefetched': 0, 'hidden': 0.0, 'blocked': 0.0}
+        self._executor = None
+        self._pending = None
+        # 各论坛本次运行的产出：列表页加载、符合条件、回复尝试、回复成功
+        self.forum_counts = defaultdict(lambda: {'page_loads': 0, 'eligible': 0, 'attempts': 0, 'successes': 0})
+        self.batch_size = max(1, int(bot.config.get('ai_batch_size', 4)))
+        self.remaining = None  # 本次运行还需成功的数量（run 中更新）
+        # 论坛 -> {页码: 尚未处理完的帖子数}，按页码顺序；页内帖子全部过滤或提交后才推进游标
+        self._open_pages = defaultdict(dict)
+
+    @staticmethod
+    def _use_ai_batch(bot):
+        return (bot.http_fetcher.enabled and bot.enable_smart_reply and bot.ai_service.is_enabled()
+                and int(bot.config.get('ai_batch_size', 4)) > 1)
+
+    @property
+    def prefix(self):
+        return "[测试] " if self.test_mode else ""
+
+    # ---------- 各阶段 ----------
+
+    def listing_stage(self, forum_ids):
+        """逐个论坛获取帖子列表"""
+        for forum_id in forum_ids:
+            if self.bot.stop_flag():
+                logging.info("🛑 检测到停止信号，停止获取帖子")
+                return
+            yield from self._walk_forum(forum_id)
+
+    def _walk_forum(self, forum_id):
+        """按页向后翻阅论坛列表
+
+        下游取够候选帖子后生成器即被关闭，不会加载多余的页面；
+        首页与上次相同时由游标决定从哪一页继续。测试模式只看第1页，不读写游标
+        """
+        cursors = self.bot.listing_cursors
+        counts = self.forum_counts[forum_id]
+        counts['page_loads'] += 1
+        first_page = self.bot.get_forum_posts(forum_id, max_posts=None)
+        if not first_page:
+            return
+        if self.test_mode:
+            start_page, last_page = 1, 1
+        else:
+            start_page, last_page = cursors.start(forum_id, first_page), cursors.max_pages
+
+        previous = None
+        for page in range(start_page, last_page + 1):
+            if page == 1:
+                posts = first_page
+            else:
+                if self.bot.stop_flag():
+                    return
+                counts['page_loads'] += 1
+                posts = self.bot.get_forum_posts(forum_id, max_posts=None, page=page)
+            # 超出最后一页时论坛会返回最后一页的内容
+            fingerprint = listing_fingerprint(posts)
+            if not posts or fingerprint == previous:
+                return
+            previous = fingerprint
+            self._open_pages[forum_id][page] = len(posts)
+            for post in posts:
+                post['forum_id'] = forum_id
+                post['page'] = page
+                yield post
+
+    def _finish_post(self, post):
+        """帖子已被过滤或已提交；所在页及之前的页都处理完后推进游标
+
+        批量生成和后台准备会提前读取下一页的帖子，因此不能在列表阶段产出完一页时就推进
+        """
+        if self.test_mode or post.get('page') is None:
+            return
+        forum_id = post.get('forum_id')
+        pages = self._open_pages.get(forum_id)
+        if not pages or post['page'] not in pages:
+            return
+        pages[post['page']] -= 1
+        while pages:
+            page = next(iter(pages))
+            if pages[page] > 0:
+                break
+            del pages[page]
+            self.bot.listing_cursors.advance(forum_id, page + 1)
+
+    def filter_stage(self, posts):
+        """关键词/前缀/已回复过滤（测试模式不检查已回复）
+
+        先查询帖子缓存，已知结论的帖子直接跳过，不再重复评估
+        """
+        cache = self.bot.thread_cache
+        # 测试模式不受已回复/回复失败结论影响
+        decisions = RULE_DECISIONS if self.test_mode else None
+        for post in posts:
+            cached = cache.lookup(post.get('forum_id'), post.get('tid'), decisions)
+            if cached:
+                logging.debug(f"⏭️ 缓存命中（{cached['decision']}）跳过: {post['title'][:50]}")
+                self._finish_post(post)
+                continue
+            skip = self.bot.get_skip_reason(post['title'], post['url'], check_replied=not self.test_mode)
+            if skip:
+                decision, reason = skip
+                cache.record(post.get('forum_id'), post.get('tid'), decision, reason, post['title'])
+                self._finish_post(post)
+                continue
+            logging.info(f"✅ {self.prefix}帖子符合条件，将处理: {post['title'][:60]}")
+            self.forum_counts[post.get('forum_id')]['eligible'] += 1
+            yield post
+
+    def browser_enrich_stage(self, posts):
+        """在浏览器中打开帖子并读取正文"""
+        for post in posts:
+            try:
+                self.bot.open_post(post['url'])
+                post['content'] = self.bot.extract_post_content()
+            except Exception as e:
+                logging.warning(f"⚠️ 打开帖子失败: {e}")
+                post['content'] = ""
+            yield post
+
+    def lxml_enrich_stage(self, posts):
+        """通过HTTP快速通道获取帖子页面并用lxml解析正文，失败时回退浏览器"""
+        for post in posts:
+            page_source = self.bot._fetch_html_fast(post['url'])
+            if page_source is None:
+                yield from self.browser_enrich_stage([post])
+                continue
+            post['content'] = extract_post_content(page_source)
+            yield post
+
+    def generate_stage(self, posts):
+        """根据标题和正文生成回复内容"""
+        for post in posts:
+            if not post.get('content'):
+                logging.warning(f"⚠️ {self.prefix}未能读取帖子内容，仅根据标题生成回复")
+            if post['title']:
+                post['reply'] = self.bot.get_smart_reply(post['title'], post.get('content', ''))
+            else:
+                post['reply'] = random.choice(self.bot.reply_templates)
+            yield post
+
+    def batch_generate_stage(self, posts):
+        """每次取出若干个帖子，批量并发生成回复（数量不超过本次运行剩余的回复数）"""
+        posts = iter(posts)
+        while True:
+            size = self.batch_size if self.remaining is None else max(1, min(self.batch_size, self.remaining))
+            batch = list(itertools.islice(posts, size))
+            if not batch:
+                return
+            for post in batch:
+                if not post.get('content'):
+                    logging.warning(f"⚠️ {self.prefix}未能读取帖子内容，仅根据标题生成回复: {post['title'][:40]}")
+            for post, reply in zip(batch, self.bot.get_smart_replies(batch)):
+                post['reply'] = reply
+            yield from batch
+
+    def submit_stage(self, posts):
+        """提交回复"""
+        for post in posts:
+            logging.info(f"💬 回复帖子: {post['url']}")
+            try:
+                post['success'] = self.bot.submit_reply(post['url'], post['reply'], post['title'])
+                reason = self.bot.last_reply_error
+            except Exception as e:
+                logging.error(f"❌ 访问帖子失败: {e}")
+                post['success'] = False
+                reason = f"访问帖子失败: {e}"
+            counts = self.forum_counts[post.get('forum_id')]
+            counts['attempts'] += 1
+            if post['success']:
+                counts['successes'] += 1
+                self.bot.thread_cache.record(post.get('forum_id'), post.get('tid'), DECISION_REPLIED, title=post['title'])
+            else:
+                self.bot.thread_cache.record(post.get('forum_id'), post.get('tid'), DECISION_FAILED, reason, post['title'])
+            self._finish_post(post)
+            yield post
+
+    def dry_run_stage(self, posts):
+        """测试模式：定位回复框并填写内容，找到提交按钮但不点击"""
+        for post in posts:
+            logging.info("🧪 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+            try:
+                post['success'] = self.bot.submit_reply(post['url'], post['reply'], post['title'], test_mode=True)
+            except Exception as e:
+                logging.warning(f"⚠️ 打开帖子失败: {e}")
+                post['success'] = False
+
+            logging.info("")
+            logging.info(f"🧪 标题: {post['title']}")
+            logging.info(f"🧪 链接: {post['url']}")
+            if post.get('content'):
+                preview = post['content'][:80].replace('\n', ' ')
+                logging.info(f"📄 内容: {preview}...")
+            else:
+                logging.info("📄 内容: (无法读取)")
+            logging.info(f"💬 回复: {post['reply']}")
+            logging.info("")
+            yield post
+
+    # ---------- 组装与统计 ----------
+
+    def _measure(self, name, stage, upstream):
+        """包装阶段生成器，只统计该阶段自身的耗时（扣除等待上游的时间）"""
+        metrics = self.metrics[name]
+        upstream_elapsed = [0.0]
+
+        def counted(items):
+            iterator = iter(items)
+            while True:
+                started = time.time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    upstream_elapsed[0] += time.time() - started
+                metrics['in'] += 1
+                yield item
+
+        generator = stage(counted(upstream))
+        try:
+            while True:
+                started = time.time()
+                before = upstream_elapsed[0]
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    metrics['elapsed'] += (time.time() - started) - (upstream_elapsed[0] - before)
+                metrics['out'] += 1
+                yield item
+        finally:
+            generator.close()
+
+    def _prefetchable(self, prepared):
+        """提交阶段的输入：后台已在准备下一个帖子时直接取其结果"""
+        while True:
+            if self._pending is not None:
+                future, self._pending = self._pending, None
+                item = future.result()
+            else:
+                item = next(prepared, _END)
+            if item is _END:
+                return
+            yield item
+
+    def _prefetch_next(self, prepared):
+        """在单线程后台执行器中提前完成下一个帖子的过滤、读取正文和回复生成"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reply-prefetch')
+        started = time.time()
+        future = self._executor.submit(next, prepared, _END)
+        future.started = started
+        future.add_done_callback(lambda f: setattr(f, 'finished', time.time()))
+        self._pending = future
+
+    def _wait_pending(self):
+        """等待后台准备完成（停止或出错时调用，避免在生成器执行中关闭它）"""
+        if self._pending is None:
+            return
+        try:
+            self._pending.result()
+        except Exception as e:
+            logging.debug(f"后台准备下一个帖子失败: {e}")
+
+    def build(self, forum_ids):
+        """按顺序串联各阶段，返回 (最终结果迭代器, 提交阶段之前的迭代器)"""
+        stream = forum_ids
+        for name in STAGE_ORDER:
+            if name == 'submit':
+                prepared = stream
+                stream = self._prefetchable(prepared)
+            stream = self._measure(name, self.stages[name], stream)
+        return stream, prepared
+
+    def _wait_interval(self, interval, prepared):
+        """回复间隔：等待期间在后台准备下一个帖子，不缩短配置的间隔
+
+        Returns:
+            是否继续（收到停止信号时返回False）
+        """
+        wait_time = random.randint(*interval)
+        self._prefetch_next(prepared)
+        logging.info(f"⏰ 等待 {wait_time} 秒（期间准备下一个帖子）...")
+
+        # 分段等待，便于响应停止信号
+        deadline = time.time() + wait_time
+        while time.time() < deadline:
+            if self.bot.stop_flag():
+                logging.info("🛑 检测到停止信号，中断等待")
+                return False
+            time.sleep(min(1, max(0, deadline - time.time())))
+
+        future = self._pending
+        waited = time.time()
+        try:
+            future.result()
+        except Exception:
+            pass  # 异常在提交阶段取结果时再抛出，与串行执行一致
+        blocked = time.time() - waited
+        prepare_time = getattr(future, 'finished', time.time()) - future.started
+        self.prefetch_metrics['prefetched'] += 1
+        self.prefetch_metrics['blocked'] += blocked
+        self.prefetch_metrics['hidden'] += max(0.0, prepare_time - blocked)
+        if blocked > 0.5:
+            logging.info(f"⏳ 下一个帖子准备耗时 {prepare_time:.1f} 秒，超出等待时间 {blocked:.1f} 秒")
+        return True
+
+    def run(self, forum_ids, limit, on_result=None, interval=None):
+        """执行流水线
+
+        Args:
+            forum_ids: 目标论坛列表
+            limit: 最多成功处理的帖子数量（达到后不再读取下一个帖子）；测试模式为最多演练的候选帖子数量
+            on_result: 每处理完一个帖子后的回调 on_result(post, success_count)，返回False时停止
+            interval: 成功后的等待间隔 (最小秒数, 最大秒数)，等待期间后台准备下一个帖子
+
+        Returns:
+            成功处理的帖子数量
+        """
+        success_count = 0
+        if limit <= 0:
+            return success_count
+
+        self.remaining = limit
+        examined = 0
+        results, prepared = self.build(forum_ids)
+        try:
+            for post in results:
+                examined += 1
+                if post.get('success'):
+                    success_count += 1
+                # 测试模式与原来一致：无论能否找到回复框，最多演练 limit 个候选帖子
+                self.remaining = limit - (examined if self.test_mode else success_count)
+                if on_result and on_result(post, success_count) is False:
+                    break
+                if self.bot.stop_flag():
+                    logging.info("🛑 检测到停止信号，停止自动回帖")
+                    break
+                if self.test_mode and examined >= limit:
+                    logging.info(f"🧪 已演练足够的帖子 ({examined}/{limit})，停止扫描")
+                    break
+                if success_count >= limit:
+                    logging.info(f"✅ 已完成本次回复任务 ({success_count}/{limit})")
+                    break
+                if interval and post.get('success') and not self._wait_interval(interval, prepared):
+                    break
+        finally:
+            self._wait_pending()
+            self._pending = None
+            results.close()
+            prepared.close()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self.bot.thread_cache.save()
+            self.bot.ai_service.cache.flush()
+            self.bot.stats.flush_ai_usage()
+            if not self.test_mode:
+                self.bot.listing_cursors.save()
+                self.bot.stats.record_forum_yields(dict(self.forum_counts))
+        return success_count
+
+    def report(self):
+        """输出各阶段的耗时与数量"""
+        logging.info("📈 回帖流水线各阶段统计:")
+        total = sum(m['elapsed'] for m in self.metrics.values()) or 1
+        for name in STAGE_ORDER:
+            m = self.metrics[name]
+            avg = m['elapsed'] / m['out'] if m['out'] else 0
+            logging.info(
+                f"   {name:<9} 输入 {m['in']:>3} 输出 {m['out']:>3}  耗时 {m['elapsed']:6.1f}秒 "
+                f"({m['elapsed'] / total:4.0%})  平均 {avg:.2f}秒"
+            )
+        pm = self.prefetch_metrics
+        if pm['prefetched']:
+            logging.info(
+                f"   ⚡ 等待间隔内预先准备 {pm['prefetched']} 个帖子，从关键路径移除 {pm['hidden']:.1f}秒，"
+                f"等待结束后仍需等待准备 {pm['blocked']:.1f}秒"
+            )
+        self.bot.listing_cursors.report()
+        self.bot.thread_cache.report()
+        self.bot.tokenizer.report()
+        self.bot.ai_service.report()
+        self.bot.stats.record_ai_run(self.bot.ai_service.usage.summary())
+        return self.metrics
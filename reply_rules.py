@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则回复引擎
+特征关键词和回复短语库来自数据文件（rules/smart_reply_default.json），加载时编译一次：
+一次正则扫描得到特征位集，再按位集直接取出预先排好序的短语库
+
+规则包放在 data/rule_packs/<名称>.json，未提供的字段沿用内置规则；
+文件修改后先校验、编译，成功后再整体替换正在使用的规则，无需重启
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import logging
+
+from text_automaton import KeywordMatcher
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'smart_reply_default.json')
+
+
+class RuleSetError(ValueError):
+    """规则数据格式错误"""
+
+
+class ReplyRuleSet:
+    """编译后的一套回复规则
+
+    数据格式:
+        features: {特征名: [关键词...]}，标题+正文中出现任一关键词即具有该特征
+        stars: {chinese: [明星名...], jp_patterns: [正则...]}，明星名按列表顺序匹配，女优名只在标题中匹配
+        sections: 按顺序排列的句子来源，{when: [特征名...], pool: [...]} 或
+                  {star: true, chinese_pool: [...], jp_pool: [...]}（短语中的 {star} 替换为名字）
+        fallback: 没有任何特征时使用的短语库
+    """
+
+    def __init__(self, data, source='', tokenizer=None):
+        started = time.perf_counter()
+        self.source = source
+        self.tokenizer = tokenizer
+        self.name = data.get('name', '') if isinstance(data, dict) else ''
+        self.version = data.get('version', 0) if isinstance(data, dict) else 0
+        self._validate(data)
+
+        self.feature_names = list(data['features'])
+        self.feature_bits = {name: 1 << i for i, name in enumerate(self.feature_names)}
+        # 明星名字作为两个额外的位参与位集（中国明星 / 日本女优）
+        self.star_cn_bit = 1 << len(self.feature_names)
+        self.star_jp_bit = 1 << (len(self.feature_names) + 1)
+
+        patterns, masks = [], []
+        for name, keywords in data['features'].items():
+            for keyword in keywords:
+                patterns.append(keyword)
+                masks.append(self.feature_bits[name])
+
+        # 中国明星名字与特征关键词在同一次扫描中匹配，每个名字占一位（位置越低越优先）
+        stars = data.get('stars', {}) or {}
+        self.chinese_stars = list(stars.get('chinese', []))
+        self.star_shift = len(self.feature_names) + 2
+        for index, star in enumerate(self.chinese_stars):
+            patterns.append(star)
+            masks.append(1 << (self.star_shift + index))
+        self.feature_mask = (1 << len(self.feature_names)) - 1
+        self.matcher = KeywordMatcher(patterns, masks)
+        if tokenizer is not None:
+            tokenizer.add_words(patterns)
+        self.jp_patterns = [re.compile(p) for p in stars.get('jp_patterns', [])]
+
+        # 每个句子来源编译为 (需要的位, 短语库, 是否为明星短语)
+        self.sections = []
+        for section in data['sections']:
+            if section.get('star'):
+                self.sections.append((self.star_cn_bit, tuple(section['chinese_pool']), True))
+                self.sections.append((self.star_jp_bit, tuple(section['jp_pool']), True))
+            else:
+                bits = 0
+                for name in section['when']:
+                    bits |= self.feature_bits[name]
+                self.sections.append((bits, tuple(section['pool']), False))
+        self.fallback = tuple(data['fallback'])
+        self.log_features = [n for n in data.get('log_features', []) if n in self.feature_bits]
+
+        self._plans = {}  # 位集 -> 依次使用的短语库
+        self.compile_time = time.perf_counter() - started
+        self.pattern_count = len(patterns) + len(self.jp_patterns)
+        self.phrase_count = sum(len(pool) for _, pool, _ in self.sections) + len(self.fallback)
+
+    @staticmethod
+    def _validate(data):
+        """检查数据格式，出错时抛出 RuleSetError"""
+        if not isinstance(data, dict):
+            raise RuleSetError("规则数据必须是JSON对象")
+        features = data.get('features')
+        if not isinstance(features, dict) or not features:
+            raise RuleSetError("缺少 features")
+        for name, keywords in features.items():
+            if not isinstance(keywords, list) or not all(isinstance(k, str) and k for k in keywords):
+                raise RuleSetError(f"特征 {name} 的关键词必须是非空字符串列表")
+        stars = data.get('stars', {}) or {}
+        if not isinstance(stars, dict):
+            raise RuleSetError("stars 必须是JSON对象")
+        chinese = stars.get('chinese', [])
+        if not isinstance(chinese, list) or not all(isinstance(s, str) and s for s in chinese):
+            raise RuleSetError("stars.chinese 必须是非空字符串列表")
+        jp_patterns = stars.get('jp_patterns', [])
+        if not isinstance(jp_patterns, list) or not all(isinstance(p, str) and p for p in jp_patterns):
+            raise RuleSetError("stars.jp_patterns 必须是非空字符串列表")
+        for pattern in jp_patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise RuleSetError(f"女优名正则无效: {pattern} ({e})")
+        sections = data.get('sections')
+        if not isinstance(sections, list):
+            raise RuleSetError("缺少 sections")
+        for index, section in enumerate(sections):
+            if not isinstance(section, dict):
+                raise RuleSetError(f"sections[{index}] 必须是JSON对象")
+            pools = ['chinese_pool', 'jp_pool'] if section.get('star') else ['pool']
+            for key in pools:
+                pool = section.get(key)
+                if not isinstance(pool, list) or not pool or not all(isinstance(p, str) for p in pool):
+                    raise RuleSetError(f"sections[{index}].{key} 必须是非空字符串列表")
+            when = section.get('when', []) if not section.get('star') else []
+            if not isinstance(when, list):
+                raise RuleSetError(f"sections[{index}].when 必须是特征名列表")
+            for name in when:
+                if not isinstance(name, str) or name not in features:
+                    raise RuleSetError(f"sections[{index}] 引用了未定义的特征: {name}")
+            if not section.get('star') and not section.get('when'):
+                raise RuleSetError(f"sections[{index}] 缺少 when")
+        fallback = data.get('fallback')
+        if not isinstance(fallback, list) or not fallback or not all(isinstance(p, str) for p in fallback):
+            raise RuleSetError("fallback 必须是非空字符串列表")
+        if not isinstance(data.get('log_features', []), list):
+            raise RuleSetError("log_features 必须是特征名列表")
+
+    def extract(self, title, content=""):
+        """提取特征位集和明星名字
+
+        Returns:
+            (位集, 明星名字)
+        """
+        if self.tokenizer is not None and self.tokenizer.ready:
+            mask = self._token_mask(title, content)
+        else:
+            mask = self.matcher.collect_mask(title + " " + content)
+        bits = mask & self.feature_mask
+
+        star_name = ""
+        stars = mask >> self.star_shift
+        if stars:
+            # 最低位即列表中最靠前的名字
+            star_name = self.chinese_stars[(stars & -stars).bit_length() - 1]
+            bits |= self.star_cn_bit
+        else:
+            for pattern in self.jp_patterns:
+                name_match = pattern.search(title)
+                if name_match:
+                    star_name = name_match.group(0)
+                    bits |= self.star_jp_bit
+                    break
+        return bits, star_name
+
+    def _token_mask(self, title, content):
+        """只保留落在词边界上的关键词（标题分词走LRU缓存，正文不缓存）"""
+        words = self.matcher.find_all(title + " " + content)
+        if not words:
+            return 0
+        tokens = self.tokenizer.tokens(title)
+        if content:
+            tokens = tokens | self.tokenizer.tokens(content, cache=False)
+        mask = 0
+        word_masks = self.matcher.word_masks
+        for word in words:
+            if self.tokenizer.contains(tokens, word):
+                mask |= word_masks[word]
+        return mask
+
+    def _plan(self, bits):
+        """位集对应的短语库序列（按位集缓存）"""
+        plan = self._plans.get(bits)
+        if plan is None:
+            plan = tuple((pool, is_star) for need, pool, is_star in self.sections if bits & need)
+            self._plans[bits] = plan
+        return plan
+
+    def generate(self, title, content="", rng=random):
+        """生成回复
+
+        随机数的调用顺序与原先逐段判断的实现一致：每个命中的句子来源各 choice 一次，
+        多于一句时再 randint + sample
+
+        Returns:
+            (回复内容, 位集)
+        """
+        bits, star_name = self.extract(title, content)
+        sentences = []
+        for pool, is_star in self._plan(bits):
+            sentence = rng.choice(pool)
+            sentences.append(sentence.replace('{star}', star_name) if is_star else sentence)
+        if not sentences:
+            sentences.append(rng.choice(self.fallback))
+
+        # 随机选择1-2个句子组合
+        if len(sentences) > 1:
+            num_sentences = rng.randint(1, min(2, len(sentences)))
+            reply = "，".join(rng.sample(sentences, k=num_sentences)) + "！"
+        else:
+            reply = sentences[0] + "！"
+        return reply, bits
+
+    def memory_size(self):
+        """编译后规则占用的内存（字节，含短语字符串和匹配器，不含共用的分词器）"""
+        return deep_sizeof(self, seen={id(self.tokenizer)})
+
+    def describe(self, bits):
+        """日志用的特征说明"""
+        return ", ".join(f"{name}={bool(bits & self.feature_bits[name])}" for name in self.log_features)
+
+
+def deep_sizeof(obj, seen=None):
+    """对象及其引用的容器、字符串的总内存（字节，估算值）"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_rule_set(path=DEFAULT_RULES_FILE, tokenizer=None):
+    """从JSON文件加载并编译回复规则"""
+    rule_set = ReplyRuleSet(_read_json(path), source=path, tokenizer=tokenizer)
+    logging.debug(
+        f"回复规则已编译: {rule_set.name} v{rule_set.version}, 模式 {rule_set.pattern_count} 个, "
+        f"短语 {rule_set.phrase_count} 条, 耗时 {rule_set.compile_time * 1000:.1f}ms"
+    )
+    return rule_set
+
+
+class ReplyRuleLoader:
+    """回复规则包的加载器（配置项 reply_rules，规则包目录 data/rule_packs）
+
+    pack 为空时使用内置规则；否则加载 data/rule_packs/<pack>.json 覆盖内置规则的同名字段。
+    规则包文件修改后自动重新编译，校验或编译失败时继续使用当前规则
+    """
+
+    def __init__(self, config: dict, pack_dir='data/rule_packs', base_file=DEFAULT_RULES_FILE, tokenizer=None):
+        rules_config = config.get('reply_rules', {}) or {}
+        self.pack = rules_config.get('pack', '') or ''
+        self.check_interval = float(rules_config.get('check_interval', 2.0))
+        self.base_file = base_file
+        self.tokenizer = tokenizer
+        self.path = os.path.join(pack_dir, self.pack + '.json') if self.pack else base_file
+        self.mtime = self._mtime()
+        self.last_check = time.monotonic()
+        self.rules = None
+
+        if not self._build():
+            # 规则包无效时回退到内置规则
+            self.rules = load_rule_set(base_file, tokenizer)
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _read_pack(self):
+        """读取规则包并与内置规则合并"""
+        data = _read_json(self.base_file)
+        if not self.pack:
+            return data
+        pack = _read_json(self.path)
+        if not isinstance(pack, dict):
+            raise RuleSetError("规则包必须是JSON对象")
+        if not isinstance(pack.get('version', 0), int):
+            raise RuleSetError("version 必须是整数")
+        data.update(pack)
+        data['name'] = pack.get('name') or self.pack
+        data['version'] = pack.get('version', 0)
+        return data
+
+    def _build(self):
+        """读取、校验并编译规则包，成功后替换当前规则"""
+        try:
+            rule_set = ReplyRuleSet(self._read_pack(), source=self.path, tokenizer=self.tokenizer)
+        except Exception as e:
+            # 校验未覆盖的格式问题（如 TypeError）也不能影响回复，继续使用当前规则
+            logging.warning(f"⚠️ 回复规则包 {self.path} 无效，继续使用当前规则: {e}")
+            return False
+        logging.info(
+            f"📦 回复规则包: {rule_set.name} v{rule_set.version}, 模式 {rule_set.pattern_count} 个, "
+            f"短语 {rule_set.phrase_count} 条, 编译 {rule_set.compile_time * 1000:.1f}ms, "
+            f"内存约 {rule_set.memory_size() / 1024:.0f}KB"
+        )
+        self.rules = rule_set
+        return True
+
+    def refresh(self):
+        """规则包文件修改时重新编译（最多每 check_interval 秒检查一次）
+
+        Returns:
+            规则是否已更新
+        """
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval:
+            return False
+        self.last_check = now
+        mtime = self._mtime()
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        updated = self._build()
+        if updated:
+            logging.info(f"🔄 检测到规则包修改，回复规则已切换为 {self.rules.name} v{self.rules.version}")
+        return updated
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器资源拦截策略
+通过CDP屏蔽图片、字体、媒体和第三方脚本，降低页面加载耗时、带宽和内存占用
+"""
+
+import json
+import os
+import logging
+from datetime import datetime
+
+# 资源类型 -> URL匹配模式（Network.setBlockedURLs 只支持通配符，按扩展名匹配）
+TYPE_PATTERNS = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'ico', 'svg', 'avif'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'media': ['mp4', 'webm', 'mp3', 'm3u8', 'ogg', 'wav', 'flv', 'ts'],
+    'stylesheet': ['css'],
+    'script': ['js'],
+}
+
+# CDP资源类型名称 -> 策略中的类型名称
+CDP_TYPE_MAP = {
+    'Image': 'image',
+    'Font': 'font',
+    'Media': 'media',
+    'Stylesheet': 'stylesheet',
+    'Script': 'script',
+    'Document': 'document',
+}
+
+# 没有历史数据时，用于估算节省流量的单个资源平均大小（字节）
+DEFAULT_AVG_BYTES = {
+    'image': 60 * 1024,
+    'font': 40 * 1024,
+    'media': 512 * 1024,
+    'stylesheet': 20 * 1024,
+    'script': 30 * 1024,
+    'other': 10 * 1024,
+}
+
+DEFAULT_POLICY = {
+    'enabled': False,
+    'headless_only': True,
+    'measure': True,
+    'types': {
+        'image': {'block': True, 'allow_domains': []},
+        'font': {'block': True, 'allow_domains': []},
+        'media': {'block': True, 'allow_domains': []},
+        'stylesheet': {'block': False, 'allow_domains': []},
+        'script': {'block': False, 'allow_domains': []},
+    },
+    'deny_domains': [
+        'google-analytics.com',
+        'googletagmanager.com',
+        'doubleclick.net',
+        'googlesyndication.com',
+        'hm.baidu.com',
+        'cnzz.com',
+    ],
+    'allow_domains': [],
+}
+
+
+class ResourcePolicy:
+    """资源拦截策略（配置项 resource_policy）"""
+
+    def __init__(self, config: dict, stats_file='data/resource_stats.json'):
+        policy = dict(DEFAULT_POLICY)
+        policy.update(config.get('resource_policy', {}) or {})
+        types = {k: dict(v) for k, v in DEFAULT_POLICY['types'].items()}
+        for name, rule in (policy.get('types') or {}).items():
+            types.setdefault(name, {'block': False, 'allow_domains': []}).update(rule or {})
+
+        self.enabled = bool(policy.get('enabled', False))
+        self.headless_only = bool(policy.get('headless_only', True))
+        self.measure = bool(policy.get('measure', True))
+        self.types = types
+        self.deny_domains = [d.strip().lstrip('.') for d in policy.get('deny_domains', []) if d.strip()]
+        self.allow_domains = [d.strip().lstrip('.') for d in policy.get('allow_domains', []) if d.strip()]
+        self.stats_file = stats_file
+
+        self.active = False  # 本次运行是否实际启用了拦截
+        self.run_metrics = self._empty_metrics()
+        self._requests = {}  # requestId -> 资源类型
+        self._nav_start = {}  # loaderId -> 导航开始时间戳
+
+    @staticmethod
+    def _empty_metrics():
+        return {
+            'navigations': 0,
+            'load_time_total': 0.0,
+            'bytes_transferred': 0,
+            'bytes_by_type': {},
+            'count_by_type': {},
+            'blocked_by_type': {},
+        }
+
+    def should_apply(self, headless: bool) -> bool:
+        """判断当前启动方式下是否需要启用拦截"""
+        return self.enabled and (headless or not self.headless_only)
+
+    def configure_options(self, chrome_options, headless: bool):
+        """在Chrome启动参数中开启性能日志（用于统计节省的流量和耗时）"""
+        self.active = self.should_apply(headless)
+        if self.active or (self.enabled and self.measure):
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            chrome_options.add_experimental_option('perfLoggingPrefs', {
+                'enableNetwork': True,
+                'enablePage': True,
+            })
+
+    def build_patterns(self):
+        """生成拦截与放行的URL匹配模式
+
+        Returns:
+            (block_patterns, allow_patterns)
+        """
+        block, allow = [], []
+        for domain in self.allow_domains:
+            allow.extend([f'*://{domain}/*', f'*://*.{domain}/*'])
+        for domain in self.deny_domains:
+            block.extend([f'*://{domain}/*', f'*://*.{domain}/*'])
+        for name, rule in self.types.items():
+            if not rule.get('block'):
+                continue
+            for domain in rule.get('allow_domains', []) or []:
+                domain = domain.strip().lstrip('.')
+                for ext in TYPE_PATTERNS.get(name, []):
+                    allow.extend([f'*://{domain}/*.{ext}', f'*://*.{domain}/*.{ext}',
+                                  f'*://{domain}/*.{ext}?*', f'*://*.{domain}/*.{ext}?*'])
+            for ext in TYPE_PATTERNS.get(name, []):
+                block.extend([f'*.{ext}', f'*.{ext}?*'])
+        return block, allow
+
+    def apply(self, driver) -> bool:
+        """通过CDP下发拦截规则（需在首次导航前调用）"""
+        if not self.active:
+            return False
+        block, allow = self.build_patterns()
+        if not block:
+            return False
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            if allow:
+                # 新版Chrome支持带放行规则的 urlPatterns，第一个匹配的规则生效
+                patterns = [{'urlPattern': p, 'block': False} for p in allow]
+                patterns += [{'urlPattern': p, 'block': True} for p in block]
+                try:
+                    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urlPatterns': patterns})
+                    logging.info(f"🧱 资源拦截已启用: {len(block)} 条拦截规则, {len(allow)} 条放行规则")
+                    return True
+                except Exception as e:
+                    logging.warning(f"⚠️ 当前Chrome不支持放行规则，忽略 allow_domains: {e}")
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': block})
+            logging.info(f"🧱 资源拦截已启用: {len(block)} 条拦截规则")
+            return True
+        except Exception as e:
+            logging.warning(f"⚠️ 资源拦截设置失败（可忽略）: {e}")
+            self.active = False
+            return False
+
+    def collect(self, driver):
+        """读取并累计性能日志（可在运行过程中多次调用，避免日志缓冲过大）"""
+        if not (self.active or (self.enabled and self.measure)) or driver is None:
+            return
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logging.debug(f"读取性能日志失败: {e}")
+            return
+
+        metrics = self.run_metrics
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except Exception:
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if method == 'Network.requestWillBeSent':
+                res_type = CDP_TYPE_MAP.get(params.get('type'), 'other')
+                self._requests[params.get('requestId')] = res_type
+                if res_type == 'document' and params.get('requestId') == params.get('loaderId'):
+                    self._nav_start[params.get('loaderId')] = params.get('timestamp', 0)
+            elif method == 'Network.loadingFinished':
+                res_type = self._requests.pop(params.get('requestId'), 'other')
+                size = int(params.get('encodedDataLength', 0) or 0)
+                metrics['bytes_transferred'] += size
+                metrics['bytes_by_type'][res_type] = metrics['bytes_by_type'].get(res_type, 0) + size
+                metrics['count_by_type'][res_type] = metrics['count_by_type'].get(res_type, 0) + 1
+            elif method == 'Network.loadingFailed':
+                res_type = CDP_TYPE_MAP.get(params.get('type'), self._requests.get(params.get('requestId'), 'other'))
+                self._requests.pop(params.get('requestId'), None)
+                if params.get('blockedReason') == 'inspector':
+                    metrics['blocked_by_type'][res_type] = metrics['blocked_by_type'].get(res_type, 0) + 1
+            elif method == 'Page.loadEventFired' and self._nav_start:
+                # 取最近一次主文档导航计算加载耗时
+                loader_id, started = self._nav_start.popitem()
+                self._nav_start.clear()
+                duration = params.get('timestamp', 0) - started
+                if 0 < duration < 600:
+                    metrics['navigations'] += 1
+                    metrics['load_time_total'] += duration
+
+    def _load_history(self):
+        try:
+            if os.path.exists(self.stats_file):
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logging.debug(f"读取资源统计失败: {e}")
+        return {'avg_bytes': {}, 'baseline': {'navigations': 0, 'load_time_total': 0.0}, 'runs': []}
+
+    def report(self, driver=None) -> dict:
+        """汇总本次运行的节省情况，写入 data/resource_stats.json 并输出日志"""
+        if not (self.active or (self.enabled and self.measure)):
+            return {}
+        self.collect(driver)
+        metrics = self.run_metrics
+        history = self._load_history()
+        avg_bytes = history.setdefault('avg_bytes', {})
+        baseline = history.setdefault('baseline', {'navigations': 0, 'load_time_total': 0.0})
+
+        # 未拦截的运行用于学习各类资源的平均大小和页面加载基线
+        if not self.active:
+            for res_type, count in metrics['count_by_type'].items():
+                if count:
+                    current = metrics['bytes_by_type'].get(res_type, 0) / count
+                    previous = avg_bytes.get(res_type)
+                    avg_bytes[res_type] = int(current if previous is None else previous * 0.7 + current * 0.3)
+            baseline['navigations'] += metrics['navigations']
+            baseline['load_time_total'] += metrics['load_time_total']
+
+        blocked_total = sum(metrics['blocked_by_type'].values())
+        bytes_saved = sum(
+            count * avg_bytes.get(res_type, DEFAULT_AVG_BYTES.get(res_type, DEFAULT_AVG_BYTES['other']))
+            for res_type, count in metrics['blocked_by_type'].items()
+        )
+        avg_load = metrics['load_time_total'] / metrics['navigations'] if metrics['navigations'] else 0
+        baseline_load = baseline['load_time_total'] / baseline['navigations'] if baseline['navigations'] else 0
+        time_saved = (baseline_load - avg_load) * metrics['navigations'] if (self.active and baseline_load) else 0
+
+        result = {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'blocking': self.active,
+            'navigations': metrics['navigations'],
+            'avg_load_time': round(avg_load, 3),
+            'bytes_transferred': metrics['bytes_transferred'],
+            'blocked_requests': blocked_total,
+            'blocked_by_type': metrics['blocked_by_type'],
+            'bytes_saved_estimate': int(bytes_saved),
+            'load_time_saved_estimate': round(max(time_saved, 0), 2),
+        }
+
+        history.setdefault('runs', []).insert(0, result)
+        history['runs'] = history['runs'][:30]
+        try:
+            os.makedirs(os.path.dirname(self.stats_file) or '.', exist_ok=True)
+            with open(self.stats_file, 'w', encoding='utf-8') as f:
+                json.dump(history, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logging.debug(f"保存资源统计失败: {e}")
+
+        logging.info(
+            f"📉 资源统计: 导航 {result['navigations']} 次, 平均加载 {result['avg_load_time']}秒, "
+            f"下载 {result['bytes_transferred'] / 1024:.0f} KB"
+        )
+        if self.active:
+            baseline_text = f"{result['load_time_saved_estimate']}秒" if baseline_load else "暂无基线（关闭拦截运行一次后可估算）"
+            logging.info(
+                f"🧱 已拦截 {blocked_total} 个请求 {metrics['blocked_by_type']}, "
+                f"预计节省流量 {bytes_saved / 1024:.0f} KB, 预计节省加载时间 {baseline_text}"
+            )
+        self.run_metrics = self._empty_metrics()
+        return result
@@ -15,6 +15,7 @@ from datetime import datetime
 from croniter import croniter
 from selenium_auto_bot import SeleniumAutoBot
 from stats_manager import StatsManager
+from browser_pool import get_browser_manager
 
 # 设置日志
 import sys
@@ -67,7 +68,8 @@ def run_bot_task():
             else:
                 logging.info("⏰ 定时任务触发，开始运行机器人...")
             
-            bot = SeleniumAutoBot()
+            # 启用浏览器预热池时，重试和后续定时运行复用同一个浏览器
+            bot = SeleniumAutoBot(browser_manager=get_browser_manager(load_config()))
             success = bot.run()
             
             if success:
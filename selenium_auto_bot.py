@@ -9,9 +9,9 @@ import json
 import time
 import random
 import logging
-import pickle
 import os
-from datetime import datetime
+import socket
+from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -21,6 +21,17 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from stats_manager import StatsManager
 from ai_reply_service import AIReplyService
+from resource_policy import ResourcePolicy
+from chrome_profile import ChromeProfile
+from session_store import SessionStore
+from http_fetcher import HttpFetcher
+from reply_pipeline import ReplyPipeline
+from listing_cursor import ListingCursors
+from thread_cache import ThreadCache, rules_fingerprint, DECISION_SKIPPED_KEYWORD, DECISION_SKIPPED_PREFIX, DECISION_REPLIED
+from skip_rules import SkipRuleMatcher
+from reply_rules import ReplyRuleLoader
+from tokenizer import Tokenizer
+from page_parsers import is_logged_in, parse_forum_posts, extract_user_info, PROFILE_FIELD_PATTERNS
 
 # 设置日志
 import sys
@@ -38,15 +49,24 @@ for handler in logging.root.handlers:
         handler.stream = open(sys.stdout.fileno(), mode='w', encoding='utf-8', buffering=1)
 
 class SeleniumAutoBot:
-    def __init__(self, config_file='config.json'):
-        """初始化Selenium自动化机器人"""
+    def __init__(self, config_file='config.json', browser_manager=None):
+        """初始化Selenium自动化机器人
+        
+        Args:
+            config_file: 配置文件路径
+            browser_manager: 浏览器预热池（可选），用于跨运行复用浏览器
+        """
         self.config = self.load_config(config_file)
+        self.browser_manager = browser_manager
         self.driver = None
         self.wait = None
         self.stop_flag = lambda: False  # 停止标志检查函数
         self.fatal_error = None  # 致命错误标记（如密码错误、账号封禁等）
         self.stats = StatsManager()  # 初始化统计管理器
-        self.ai_service = AIReplyService(self.config)  # 初始化AI服务
+        self.ai_service = AIReplyService(self.config, stats=self.stats)  # 初始化AI服务（用量计入统计）
+        self.resource_policy = ResourcePolicy(self.config)  # 资源拦截策略
+        self.chrome_profile = ChromeProfile(self.config)  # 持久化浏览器用户目录
+        self._profile_reset_tried = False
         
         # 配置信息
         self.base_url = self.config.get('base_url', 'https://sehuatang.org/')
@@ -55,9 +75,10 @@ class SeleniumAutoBot:
         self.security_question_id = self.config.get('security_question_id', '')
         self.security_answer = self.config.get('security_answer', '')
         
-        # Cookies 保存路径
+        # 登录状态存储（兼容旧版 data/cookies.pkl）
         self.cookies_file = 'data/cookies.pkl'
         os.makedirs('data', exist_ok=True)
+        self.session_store = SessionStore('data/session.json', legacy_path=self.cookies_file)
         
         # 自动化配置
         self.daily_reply_limit = self.config.get('max_replies_per_day', 10)
@@ -78,6 +99,18 @@ class SeleniumAutoBot:
         self.enable_smart_reply = self.config.get('enable_smart_reply', True)
         self.skip_keywords = self.config.get('skip_keywords', [])
         self.skip_prefixes = self.config.get('skip_prefixes', [])
+        self.skip_regex = self.config.get('skip_regex', [])
+        # 可选的中文分词（后台加载词典，就绪前使用子串匹配）
+        self.tokenizer = Tokenizer(self.config)
+        self.tokenizer.start()
+        # 跳过规则编译为自动机/前缀树，配置文件修改后自动重新编译
+        self.skip_rules = SkipRuleMatcher(config_file, self.config, tokenizer=self.tokenizer)
+        # 已评估帖子缓存（过滤规则变化时自动清除相关结论）
+        self.thread_cache = ThreadCache(self.config)
+        self.thread_cache.set_rules(rules_fingerprint(self.skip_keywords, self.skip_prefixes, self.skip_regex))
+        # 论坛列表游标（翻页位置与首页指纹）
+        self.listing_cursors = ListingCursors(self.config)
+        self.order_by_yield = (self.config.get('forum_listing', {}) or {}).get('order_by_yield', True)
         self.forum_names = self.config.get('forum_names', {})
         
         # 智能回复模板
@@ -91,6 +124,13 @@ class SeleniumAutoBot:
             '谢谢分享，收藏了'
         ])
         
+        # 规则回复引擎（特征关键词与短语库预先编译，规则包修改后自动重新加载；加载失败时使用回复模板）
+        try:
+            self.reply_rules = ReplyRuleLoader(self.config, tokenizer=self.tokenizer)
+        except Exception as e:
+            logging.warning(f"⚠️ 加载回复规则失败，将使用回复模板: {e}")
+            self.reply_rules = None
+        
         # 浏览器请求头配置
         self.browser_headers = self.config.get('browser_headers', {
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
@@ -101,6 +141,10 @@ class SeleniumAutoBot:
             'accept_encoding': 'gzip, deflate, br, zstd'
         })
         
+        # HTTP快速通道（只读页面不经过浏览器）
+        self.http_fetcher = HttpFetcher(self.config, self.browser_headers)
+        self.last_reply_error = ""  # 最近一次回复失败的原因
+        
     def load_config(self, config_file):
         """加载配置文件"""
         try:
@@ -143,6 +187,21 @@ class SeleniumAutoBot:
             return self.setup_driver(headless=headless)
         return True
     
+    def _fetch_html_fast(self, url):
+        """通过HTTP快速通道获取只读页面，返回None时调用方回退到浏览器"""
+        if not self.http_fetcher.enabled:
+            return None
+        if not self.http_fetcher.has_cookies:
+            self.http_fetcher.sync_from_driver(self.driver)
+        return self.http_fetcher.fetch_html(url)
+    
+    @staticmethod
+    def _find_free_port():
+        """获取一个空闲的本地端口"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(('127.0.0.1', 0))
+            return s.getsockname()[1]
+    
     def setup_driver(self, headless=False):
         """设置Chrome浏览器"""
         chrome_options = Options()
@@ -156,6 +215,9 @@ class SeleniumAutoBot:
             if is_docker:
                 logging.info("🐳 检测到Docker环境，启用headless模式")
         
+        # 资源拦截策略（需要开启性能日志用于统计）
+        self.resource_policy.configure_options(chrome_options, headless or is_docker)
+        
         # 反检测设置
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
@@ -165,7 +227,8 @@ class SeleniumAutoBot:
         chrome_options.add_argument('--disable-web-security')
         chrome_options.add_argument('--allow-running-insecure-content')
         chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-        chrome_options.add_argument('--remote-debugging-port=9222')
+        # 动态分配调试端口，允许同时运行多个浏览器实例
+        chrome_options.add_argument(f'--remote-debugging-port={self._find_free_port()}')
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
@@ -174,6 +237,11 @@ class SeleniumAutoBot:
         chrome_options.add_argument(f'--user-agent={user_agent}')
         logging.info(f"🌐 设置 User-Agent: {user_agent}")
         
+        # 持久化用户目录和磁盘缓存（可选，重复运行可命中本地缓存）
+        use_profile = self.chrome_profile.prepare()
+        if use_profile:
+            self.chrome_profile.apply(chrome_options)
+        
         try:
             from selenium.webdriver.chrome.service import Service
             import os
@@ -241,6 +309,9 @@ class SeleniumAutoBot:
             except Exception as e:
                 logging.warning(f"⚠️ CDP命令执行失败（可忽略）: {e}")
             
+            # 屏蔽图片/字体/媒体/第三方脚本（需在首次导航前设置）
+            self.resource_policy.apply(self.driver)
+            
             self.wait = WebDriverWait(self.driver, 30)  # 增加到30秒，应对首次访问慢的情况
             
             # 设置页面加载超时（防止页面加载卡住）
@@ -251,6 +322,13 @@ class SeleniumAutoBot:
             return True
             
         except Exception as e:
+            # 用户目录被占用或已损坏时换用全新目录重试一次，其他原因（驱动版本不匹配等）不清理用户目录
+            if use_profile and not self._profile_reset_tried and self.chrome_profile.is_profile_error(e):
+                self._profile_reset_tried = True
+                logging.warning(f"⚠️ 使用持久化用户目录启动失败: {e}")
+                self.chrome_profile.reset("浏览器启动失败")
+                return self.setup_driver(headless=headless)
+            
             logging.error(f"❌ 浏览器启动失败: {e}")
             logging.error("请确保已安装Chrome浏览器和ChromeDriver")
             
@@ -791,7 +869,7 @@ class SeleniumAutoBot:
             return False
     
     def save_cookies(self):
-        """保存登录cookies到文件（包括年龄验证相关cookie）"""
+        """保存登录cookies（包括年龄验证相关cookie）"""
         try:
             cookies = self.driver.get_cookies()
             
@@ -800,101 +878,62 @@ class SeleniumAutoBot:
             found_keys = [c['name'] for c in cookies if c['name'] in key_cookies]
             logging.info(f"📋 检测到关键Cookie: {', '.join(found_keys) if found_keys else '无'}")
             
-            # 保存为pickle格式（供程序使用）
-            with open(self.cookies_file, 'wb') as f:
-                pickle.dump(cookies, f)
-            logging.info(f"🍪 登录状态已保存到 {self.cookies_file} ({len(cookies)} 个)")
-            
-            # 同时保存为JSON格式（便于查看和调试）
-            json_cookies_file = self.cookies_file.replace('.pkl', '.json')
-            cookie_string_file = self.cookies_file.replace('.pkl', '_string.txt')
-            try:
-                import json
-                # 处理不可序列化的字段
-                cookies_for_json = []
-                for cookie in cookies:
-                    cookie_copy = cookie.copy()
-                    # 转换expiry为可读时间
-                    if 'expiry' in cookie_copy:
-                        from datetime import datetime
-                        try:
-                            expiry_time = datetime.fromtimestamp(cookie_copy['expiry'])
-                            cookie_copy['expiry_readable'] = expiry_time.strftime('%Y-%m-%d %H:%M:%S')
-                        except:
-                            pass
-                    cookies_for_json.append(cookie_copy)
-                
-                with open(json_cookies_file, 'w', encoding='utf-8') as f:
-                    json.dump(cookies_for_json, f, indent=2, ensure_ascii=False)
-                logging.info(f"📝 Cookie已同步保存为JSON: {json_cookies_file}")
-                
-                # 保存Cookie字符串格式（HTTP请求头格式）
-                cookie_string_parts = []
-                for cookie in cookies:
-                    name = cookie.get('name', '')
-                    value = cookie.get('value', '')
-                    if name and value:
-                        cookie_string_parts.append(f"{name}={value}")
-                cookie_string = "; ".join(cookie_string_parts)
-                
-                with open(cookie_string_file, 'w', encoding='utf-8') as f:
-                    f.write(cookie_string)
-                logging.info(f"📝 Cookie字符串已保存: {cookie_string_file}")
-                
-            except Exception as e:
-                logging.debug(f"保存JSON格式Cookie失败（不影响功能）: {e}")
-            
+            self.session_store.save(cookies, self.base_url)
+            logging.info(f"🍪 登录状态已保存到 {self.session_store.path} ({len(cookies)} 个)")
             return True
         except Exception as e:
             logging.error(f"❌ 保存cookies失败: {e}")
             return False
     
-    def load_cookies(self):
-        """从文件加载cookies（优化版：直接注入，避开年龄验证）"""
+    def load_cookies(self, cookies=None):
+        """注入已保存的cookies（优化版：首次导航前通过CDP一次性注入，避开年龄验证）
+        
+        Args:
+            cookies: 已离线校验过的Cookie列表，为空时从存储中读取
+        """
         try:
-            if not os.path.exists(self.cookies_file):
-                logging.info("ℹ️ 未找到已保存的登录状态")
-                return False
+            if cookies is None:
+                cookies = self.session_store.load()
+                if not cookies:
+                    logging.info("ℹ️ 未找到已保存的登录状态")
+                    return False
+            cookies = self.session_store.without_expired(cookies)
             
-            # 步骤1: 直接访问一个简单的API页面建立域，避开年龄验证HTML页面
-            # 使用一个不会显示年龄验证的URL
             base_url = self.base_url if self.base_url.startswith('https://') else self.base_url.replace('http://', 'https://')
-            # 访问一个简单的页面（不触发年龄验证）
-            init_url = base_url + "robots.txt"  # robots.txt不会有年龄验证
             
-            logging.info(f"🌐 正在建立域连接...")
-            try:
-                self.driver.get(init_url)
-                time.sleep(1)
-            except:
-                # 如果robots.txt不存在，访问任意页面
-                self.driver.get(base_url)
-                time.sleep(1)
-            
-            # 步骤2: 立即注入Cookies（不要等待，不要处理年龄验证）
+            # 步骤1: 首次导航前通过CDP一次性注入全部Cookies
             logging.info("🍪 正在注入Cookies...")
-            with open(self.cookies_file, 'rb') as f:
-                cookies = pickle.load(f)
-            
-            cookie_count = 0
-            for cookie in cookies:
+            try:
+                self.driver.execute_cdp_cmd('Network.setCookies', {
+                    'cookies': [self.session_store.to_cdp(c, base_url) for c in cookies]
+                })
+                logging.info(f"✅ 已通过CDP注入 {len(cookies)} 个Cookies")
+            except Exception as e:
+                # CDP不可用时回退：先访问robots.txt建立域，再逐个添加
+                logging.debug(f"CDP注入Cookie失败，改用逐个添加: {e}")
                 try:
-                    # 移除可能导致问题的字段
-                    if 'expiry' in cookie:
-                        cookie['expiry'] = int(cookie['expiry'])
-                    self.driver.add_cookie(cookie)
-                    cookie_count += 1
-                except Exception as e:
-                    logging.debug(f"添加cookie失败 ({cookie.get('name', 'unknown')}): {e}")
-            
-            logging.info(f"✅ 已注入 {cookie_count}/{len(cookies)} 个Cookies")
-            
-            # 步骤3: 直接访问目标页面（Cookie已注入，应该不会有年龄验证）
-            logging.info("🔄 访问个人中心验证登录状态...")
-            self.driver.get(base_url + "home.php?mod=space")
-            time.sleep(3)
+                    self.driver.get(base_url + "robots.txt")  # robots.txt不会有年龄验证
+                except Exception:
+                    self.driver.get(base_url)
+                time.sleep(1)
+                cookie_count = 0
+                for cookie in cookies:
+                    try:
+                        cookie = {k: v for k, v in cookie.items() if k != 'expiry_readable'}
+                        if 'expiry' in cookie:
+                            cookie['expiry'] = int(cookie['expiry'])
+                        self.driver.add_cookie(cookie)
+                        cookie_count += 1
+                    except Exception as add_error:
+                        logging.debug(f"添加cookie失败 ({cookie.get('name', 'unknown')}): {add_error}")
+                logging.info(f"✅ 已注入 {cookie_count}/{len(cookies)} 个Cookies")
+            
+            # 步骤2: 访问论坛首页验证登录状态（论坛按产出排序、列表按游标续页，首个访问的列表页事先无法确定）
+            logging.info("🔄 访问论坛页面验证登录状态...")
+            self.driver.get(base_url + "forum.php")
+            time.sleep(2)
             
-            # 步骤4: 如果仍有年龄验证（不太可能），再处理
+            # 步骤3: 如果仍有年龄验证（不太可能），再处理
             page_source = self.driver.page_source
             if "满18岁" in page_source or "If you are over 18" in page_source:
                 logging.warning("⚠️ Cookie注入后仍有年龄验证，尝试处理...")
@@ -916,95 +955,36 @@ class SeleniumAutoBot:
             logging.debug(traceback.format_exc())
             return False
     
-    def get_user_info(self):
-        """获取用户信息（等级、积分、金钱等）"""
+    def get_user_info(self, page_source=None):
+        """获取用户信息（等级、积分、金钱等）
+        
+        Args:
+            page_source: 已加载的当前用户页面源码（如签到结果页，不能是帖子页），包含全部字段时不再访问个人中心
+        """
         try:
             logging.info("📊 开始获取用户信息...")
             
-            # 访问个人中心页面
-            profile_url = f"{self.base_url}home.php?mod=space&uid=&do=profile"
-            self.driver.get(profile_url)
-            time.sleep(3)  # 增加等待时间确保页面完全加载
-            
-            user_info = {
-                "user_group": "",
-                "credits": 0,
-                "money": 0,
-                "coins": 0,
-                "rating": 0
-            }
-            
-            # 获取页面源码
-            page_source = self.driver.page_source
-            
-            # 使用正则表达式提取信息
-            import re
-            
-            # 提取用户组（如：Lv5 小有名气）
-            # 更灵活的匹配模式，支持HTML标签和空白字符
-            group_patterns = [
-                r'用户组[：:]\s*([^<\n]+)',
-                r'用户组[：:]</em>\s*([^<\n]+)',
-                r'>用户组[：:]\s*</em>\s*<em[^>]*>([^<]+)</em>',
-            ]
-            for pattern in group_patterns:
-                group_match = re.search(pattern, page_source)
-                if group_match:
-                    user_info["user_group"] = group_match.group(1).strip()
-                    logging.info(f"✅ 用户组: {user_info['user_group']}")
-                    break
-            
-            # 提取积分 - 匹配 <em>积分</em>108 格式（无冒号）
-            credits_patterns = [
-                r'<em>积分</em>\s*(\d+)',
-                r'>积分</em>\s*(\d+)',
-                r'积分[：:]\s*(\d+)',  # 兼容带冒号的格式
-            ]
-            for pattern in credits_patterns:
-                credits_match = re.search(pattern, page_source)
-                if credits_match:
-                    user_info["credits"] = int(credits_match.group(1))
-                    logging.info(f"✅ 积分: {user_info['credits']}")
-                    break
-            
-            # 提取金钱 - 匹配 <em>金钱</em>302 格式（无冒号）
-            money_patterns = [
-                r'<em>金钱</em>\s*(\d+)',
-                r'>金钱</em>\s*(\d+)',
-                r'金钱[：:]\s*(\d+)',  # 兼容带冒号的格式
-            ]
-            for pattern in money_patterns:
-                money_match = re.search(pattern, page_source)
-                if money_match:
-                    user_info["money"] = int(money_match.group(1))
-                    logging.info(f"✅ 金钱: {user_info['money']}")
-                    break
-            
-            # 提取色币 - 匹配 <em>色币</em>0 格式（无冒号）
-            coins_patterns = [
-                r'<em>色币</em>\s*(\d+)',
-                r'>色币</em>\s*(\d+)',
-                r'色币[：:]\s*(\d+)',  # 兼容带冒号的格式
-            ]
-            for pattern in coins_patterns:
-                coins_match = re.search(pattern, page_source)
-                if coins_match:
-                    user_info["coins"] = int(coins_match.group(1))
-                    logging.info(f"✅ 色币: {user_info['coins']}")
-                    break
+            user_info, found = extract_user_info(page_source) if page_source else ({}, set())
+            if len(found) == len(PROFILE_FIELD_PATTERNS):
+                logging.info("✅ 从当前页面提取到全部用户信息，跳过个人中心访问")
+            else:
+                # 访问个人中心页面（优先HTTP快速通道）
+                profile_url = f"{self.base_url}home.php?mod=space&uid=&do=profile"
+                page_source = self._fetch_html_fast(profile_url)
+                if page_source is not None:
+                    self.http_fetcher.record_replaced()
+                else:
+                    self.driver.get(profile_url)
+                    time.sleep(3)  # 增加等待时间确保页面完全加载
+                    page_source = self.driver.page_source
+                
+                # 单次扫描页面中的字段标签，提取全部字段
+                user_info, found = extract_user_info(page_source)
             
-            # 提取评分 - 匹配 <em>评分</em>0 格式（无冒号）
-            rating_patterns = [
-                r'<em>评分</em>\s*(\d+)',
-                r'>评分</em>\s*(\d+)',
-                r'评分[：:]\s*(\d+)',  # 兼容带冒号的格式
-            ]
-            for pattern in rating_patterns:
-                rating_match = re.search(pattern, page_source)
-                if rating_match:
-                    user_info["rating"] = int(rating_match.group(1))
-                    logging.info(f"✅ 评分: {user_info['rating']}")
-                    break
+            field_labels = [('user_group', '用户组'), ('credits', '积分'), ('money', '金钱'), ('coins', '色币'), ('rating', '评分')]
+            for field, label in field_labels:
+                if field in found:
+                    logging.info(f"✅ {label}: {user_info[field]}")
             
             # 调试：如果关键字段未获取到，保存HTML用于分析
             missing_fields = []
@@ -1023,6 +1003,7 @@ class SeleniumAutoBot:
                     logging.info(f"📝 已保存用户信息页面到: {debug_file}")
                     
                     # 查找包含"统计信息"的HTML区域并输出
+                    import re
                     stats_section = re.search(r'统计信息.*?</ul>', page_source, re.DOTALL)
                     if stats_section:
                         section_html = stats_section.group(0)
@@ -1069,13 +1050,21 @@ class SeleniumAutoBot:
             # 如果快速检查未通过，访问个人中心确认
             logging.info("🔍 快速检查未通过，访问个人中心确认登录状态...")
             try:
-                # 访问个人中心页面
                 profile_url = f"{self.base_url}home.php?mod=space&do=profile"
-                self.driver.get(profile_url)
-                time.sleep(2)
                 
-                page_source = self.driver.page_source
-                current_url = self.driver.current_url
+                # 优先HTTP快速通道（使用浏览器当前Cookie）
+                self.http_fetcher.sync_from_driver(self.driver)
+                page_source = self.http_fetcher.fetch_html(profile_url)
+                if page_source is not None:
+                    self.http_fetcher.record_replaced()
+                    current_url = profile_url
+                else:
+                    # 访问个人中心页面
+                    self.driver.get(profile_url)
+                    time.sleep(2)
+                    
+                    page_source = self.driver.page_source
+                    current_url = self.driver.current_url
                 
                 # 详细检查登录标识
                 login_indicators = [
@@ -1266,10 +1255,10 @@ class SeleniumAutoBot:
                                         self.stats.mark_checkin_success()
                                         time.sleep(2)
                                         
-                                        # 签到成功后获取用户信息（此时积分已更新）
+                                        # 签到成功后获取用户信息（此时积分已更新，优先从签到结果页提取）
                                         try:
                                             logging.info("📊 签到完成，获取最新用户信息...")
-                                            self.get_user_info()
+                                            self.get_user_info(page_source=self.driver.page_source)
                                         except Exception as e:
                                             logging.warning(f"⚠️ 获取用户信息失败: {e}")
                                     break
@@ -1342,14 +1331,33 @@ class SeleniumAutoBot:
             else:
                 logging.error(f"❌ 签到失败: {e}")
     
-    def get_forum_posts(self, forum_id="fid=141", max_posts=20):
-        """获取论坛帖子列表"""
+    def get_forum_posts(self, forum_id="fid=141", max_posts=20, page=1):
+        """获取论坛帖子列表
+        
+        Args:
+            forum_id: 论坛ID（如 fid=141）
+            max_posts: 最多返回的帖子数量（None表示整页）
+            page: 列表页码
+        """
         try:
             forum_display = self.forum_names.get(forum_id, forum_id)
-            logging.info(f"📋 获取论坛帖子: {forum_id} - {forum_display}")
+            page_label = f" 第{page}页" if page > 1 else ""
+            logging.info(f"📋 获取论坛帖子: {forum_id} - {forum_display}{page_label}")
             
-            # 访问论坛页面
             forum_url = f"{self.base_url}forum.php?mod=forumdisplay&{forum_id}"
+            if page > 1:
+                forum_url += f"&page={page}"
+            self.listing_cursors.record_page_load()
+            
+            # 优先使用HTTP快速通道
+            page_source = self._fetch_html_fast(forum_url)
+            if page_source is not None and is_logged_in(page_source, self.username):
+                self.http_fetcher.record_replaced()
+                posts = parse_forum_posts(page_source, forum_url, max_posts)
+                logging.info(f"✅ 找到 {len(posts)} 个帖子（HTTP快速通道）")
+                return posts
+            
+            # 访问论坛页面
             self.driver.get(forum_url)
             time.sleep(3)
             
@@ -1366,43 +1374,12 @@ class SeleniumAutoBot:
                 logging.info("🔄 尝试访问个人中心后重新获取...")
                 self.driver.get(f"{self.base_url}home.php?mod=space")
                 time.sleep(2)
-            self.driver.get(forum_url)
-            time.sleep(3)
-            
-            # 查找帖子链接
-            post_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='thread-'], a[href*='tid=']")
-            
-            posts = []
-            seen_tids = set()  # 用于去重
+                self.driver.get(forum_url)
+                time.sleep(3)
+                page_source = self.driver.page_source
             
-            for link in post_links:
-                if len(posts) >= max_posts:
-                    break
-                    
-                href = link.get_attribute('href')
-                title = link.text.strip()
-                
-                if not href or not title or 'thread' not in href:
-                    continue
-                
-                # 提取tid进行去重
-                import re
-                tid_match = re.search(r'tid[=-](\d+)', href)
-                if tid_match:
-                    tid = tid_match.group(1)
-                    if tid in seen_tids:
-                        continue  # 跳过重复的帖子
-                    seen_tids.add(tid)
-                    
-                    # 清理URL，只保留主要的帖子链接（去掉页码）
-                    clean_url = re.sub(r'&page=\d+', '', href)
-                    clean_url = re.sub(r'&extra=.*', '', clean_url)
-                    
-                    posts.append({
-                        'url': clean_url,
-                        'title': title,
-                        'tid': tid
-                    })
+            # 直接解析页面源码查找帖子链接（避免逐个元素调用WebDriver）
+            posts = parse_forum_posts(page_source, self.driver.current_url, max_posts)
             
             logging.info(f"✅ 找到 {len(posts)} 个帖子")
             return posts
@@ -1411,6 +1388,177 @@ class SeleniumAutoBot:
             logging.error(f"❌ 获取帖子失败: {e}")
             return []
     
+    def open_post(self, post_url):
+        """在浏览器中打开帖子（已停留在该帖子页面时不重复加载）"""
+        if self.driver.current_url != post_url:
+            self.driver.get(post_url)
+            time.sleep(3)
+    
+    def extract_post_content(self):
+        """读取当前帖子页面的正文（首楼前500字符）"""
+        content_selectors = [
+            ".t_f",  # Discuz帖子内容
+            ".pcb",  # Discuz帖子内容区
+            "#postmessage_",  # 帖子消息
+            ".message"
+        ]
+        for selector in content_selectors:
+            try:
+                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                if elements:
+                    return elements[0].text[:500]  # 只取前500字符
+            except Exception:
+                continue
+        return ""
+    
+    def _find_reply_box(self):
+        """查找可用的回复框"""
+        # 尝试不同的回复框选择器（针对Discuz论坛优化）
+        reply_selectors = [
+            "textarea[name='message']",      # 标准Discuz
+            "#fastpostmessage",               # 快速回复
+            "textarea#e_textarea",            # 编辑器
+            "textarea.pt",                    # Discuz样式
+            ".reply_textarea",
+            "textarea"                        # 通用
+        ]
+        
+        for selector in reply_selectors:
+            try:
+                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                for elem in elements:
+                    if elem.is_displayed() and elem.is_enabled():
+                        logging.info(f"✅ 找到回复框: {selector}")
+                        return elem
+            except Exception as e:
+                logging.debug(f"选择器 {selector} 失败: {e}")
+                continue
+        return None
+    
+    def _find_submit_button(self):
+        """查找回复提交按钮（排除搜索按钮）"""
+        submit_selectors = [
+            "input[type='submit'][value*='回复']",
+            "input[type='submit'][value*='发表']",
+            "button[name='replysubmit']",  # Discuz回复按钮
+            "button[name='topicsubmit']",  # Discuz发帖按钮
+            ".btn_submit"
+        ]
+        
+        for selector in submit_selectors:
+            try:
+                buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                for btn in buttons:
+                    if not btn.is_displayed():
+                        continue
+                    btn_name = btn.get_attribute('name') or ''
+                    btn_id = btn.get_attribute('id') or ''
+                    btn_value = btn.get_attribute('value') or ''
+                    btn_text = btn.text or ''
+                    
+                    # 排除搜索相关按钮
+                    if 'search' in btn_name.lower() or 'search' in btn_id.lower():
+                        continue
+                    if 'scbar' in btn_id.lower():
+                        continue
+                    
+                    # 确认是回复按钮
+                    if '回复' in btn_value or '发表' in btn_value or '回复' in btn_text or '发表' in btn_text or 'reply' in btn_name.lower():
+                        logging.info(f"✅ 找到回复提交按钮: {selector}")
+                        return btn
+            except Exception:
+                continue
+        return None
+    
+    def submit_reply(self, post_url, reply_content, post_title="", test_mode=False):
+        """在帖子页面填写并提交回复（测试模式只填写不提交）
+        
+        Returns:
+            是否成功（测试模式下为是否找到回复框和提交按钮）
+        """
+        self.last_reply_error = ""
+        self.open_post(post_url)
+        
+        try:
+            reply_box = self._find_reply_box()
+            if not reply_box:
+                self.last_reply_error = "找不到回复框"
+                logging.error("❌ 找不到回复框")
+                # 保存页面HTML用于调试
+                try:
+                    with open('debug/reply_page_debug.html', 'w', encoding='utf-8') as f:
+                        f.write(self.driver.page_source)
+                    logging.info("📄 已保存页面HTML到 debug/reply_page_debug.html")
+                except:
+                    pass
+                return False
+            
+            # 填写回复内容
+            reply_box.clear()
+            reply_box.send_keys(reply_content)
+            logging.info(f"📝 填写回复内容: {reply_content}")
+            
+            submit_button = self._find_submit_button()
+            if not submit_button:
+                self.last_reply_error = "找不到提交按钮"
+                logging.error("❌ 找不到提交按钮")
+                return False
+            
+            if test_mode:
+                logging.info("🚫 [测试] 测试模式 - 不点击提交按钮")
+                return True
+            
+            # 使用JavaScript点击，避免被其他元素遮挡
+            try:
+                # 先尝试滚动到按钮位置
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", submit_button)
+                time.sleep(0.5)
+                
+                # 使用JavaScript点击，绕过遮挡问题
+                self.driver.execute_script("arguments[0].click();", submit_button)
+                logging.info("🚀 提交回复")
+                time.sleep(3)
+            except Exception as e:
+                self.last_reply_error = f"点击提交按钮失败: {e}"
+                logging.error(f"❌ 点击提交按钮失败: {e}")
+                return False
+            
+            # 检查回复是否成功（多种成功标识）
+            page_source = self.driver.page_source
+            current_url = self.driver.current_url
+            
+            success_indicators = [
+                "回复发表成功" in page_source,
+                "感谢您的回复" in page_source,
+                "回复成功" in page_source,
+                "发表成功" in page_source,
+                "帖子已提交" in page_source,
+                # 如果页面有跳转或刷新，也认为成功
+                "tid=" in current_url and "forum.php" in current_url
+            ]
+            
+            if not any(success_indicators):
+                # 保存页面用于调试
+                try:
+                    with open('debug/reply_result_debug.html', 'w', encoding='utf-8') as f:
+                        f.write(page_source)
+                    logging.info("📄 已保存回复结果页面到 debug/reply_result_debug.html")
+                except:
+                    pass
+                self.last_reply_error = "未检测到回复成功标识"
+                logging.warning("⚠️ 回复可能失败，请检查调试文件")
+                return False
+            
+            logging.info("✅ 回复成功")
+            # 记录回复统计（仅正常模式）
+            self.stats.add_reply(post_title, post_url, reply_content)
+            return True
+                
+        except Exception as e:
+            self.last_reply_error = f"回复过程出错: {e}"
+            logging.error(f"❌ 回复过程出错: {e}")
+            return False
+    
     def reply_to_post(self, post_url, reply_content=None, post_title="", test_mode=False):
         """回复帖子"""
         try:
@@ -1419,221 +1567,86 @@ class SeleniumAutoBot:
             else:
                 logging.info(f"💬 回复帖子: {post_url}")
             
-            # 访问帖子页面
-            self.driver.get(post_url)
-            time.sleep(3)
-            
             # 使用智能回复选择内容
             if not reply_content:
-                # 尝试获取帖子内容（首楼部分文字）
-                post_content = ""
-                try:
-                    # 尝试获取帖子正文的前500字符
-                    content_selectors = [
-                        ".t_f",  # Discuz帖子内容
-                        ".pcb",  # Discuz帖子内容区
-                        "#postmessage_",  # 帖子消息
-                        ".message"
-                    ]
-                    for selector in content_selectors:
-                        try:
-                            elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            if elements:
-                                post_content = elements[0].text[:500]  # 只取前500字符
-                                break
-                        except:
-                            continue
-                except Exception as e:
-                    logging.debug(f"获取帖子内容失败: {e}")
-                
-                # 使用标题和内容生成智能回复
+                self.open_post(post_url)
+                post_content = self.extract_post_content()
                 if post_title:
                     reply_content = self.get_smart_reply(post_title, post_content)
                 else:
                     reply_content = random.choice(self.reply_templates)
             
-            # 查找回复框
-            try:
-                # 尝试不同的回复框选择器（针对Discuz论坛优化）
-                reply_selectors = [
-                    "textarea[name='message']",      # 标准Discuz
-                    "#fastpostmessage",               # 快速回复
-                    "textarea#e_textarea",            # 编辑器
-                    "textarea.pt",                    # Discuz样式
-                    ".reply_textarea",
-                    "textarea"                        # 通用
-                ]
-                
-                reply_box = None
-                for selector in reply_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for elem in elements:
-                            if elem.is_displayed() and elem.is_enabled():
-                                reply_box = elem
-                                logging.info(f"✅ 找到回复框: {selector}")
-                                break
-                        if reply_box:
-                            break
-                    except Exception as e:
-                        logging.debug(f"选择器 {selector} 失败: {e}")
-                        continue
-                
-                if not reply_box:
-                    logging.error("❌ 找不到回复框")
-                    # 保存页面HTML用于调试
-                    try:
-                        with open('debug/reply_page_debug.html', 'w', encoding='utf-8') as f:
-                            f.write(self.driver.page_source)
-                        logging.info("📄 已保存页面HTML到 debug/reply_page_debug.html")
-                    except:
-                        pass
-                    return False
-                
-                # 填写回复内容
-                reply_box.clear()
-                reply_box.send_keys(reply_content)
-                logging.info(f"📝 填写回复内容: {reply_content}")
-                
-                # 查找并点击提交按钮（排除搜索按钮）
-                submit_selectors = [
-                    "input[type='submit'][value*='回复']",
-                    "input[type='submit'][value*='发表']",
-                    "button[name='replysubmit']",  # Discuz回复按钮
-                    "button[name='topicsubmit']",  # Discuz发帖按钮
-                    ".btn_submit"
-                ]
-                
-                submit_button = None
-                for selector in submit_selectors:
-                    try:
-                        buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        for btn in buttons:
-                            # 排除搜索按钮
-                            if btn.is_displayed():
-                                btn_name = btn.get_attribute('name') or ''
-                                btn_id = btn.get_attribute('id') or ''
-                                btn_value = btn.get_attribute('value') or ''
-                                btn_text = btn.text or ''
-                                
-                                # 排除搜索相关按钮
-                                if 'search' in btn_name.lower() or 'search' in btn_id.lower():
-                                    continue
-                                if 'scbar' in btn_id.lower():
-                                    continue
-                                
-                                # 确认是回复按钮
-                                if '回复' in btn_value or '发表' in btn_value or '回复' in btn_text or '发表' in btn_text or 'reply' in btn_name.lower():
-                                    submit_button = btn
-                                    logging.info(f"✅ 找到回复提交按钮: {selector}")
-                                    break
-                        
-                        if submit_button:
-                            break
-                    except:
-                        continue
-                
-                if submit_button:
-                    # 使用JavaScript点击，避免被其他元素遮挡
-                    try:
-                        # 先尝试滚动到按钮位置
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", submit_button)
-                        time.sleep(0.5)
-                        
-                        # 使用JavaScript点击，绕过遮挡问题
-                        self.driver.execute_script("arguments[0].click();", submit_button)
-                        logging.info("🚀 提交回复")
-                        time.sleep(3)
-                    except Exception as e:
-                        logging.error(f"❌ 点击提交按钮失败: {e}")
-                        return False
-                    
-                    # 检查回复是否成功（多种成功标识）
-                    page_source = self.driver.page_source
-                    current_url = self.driver.current_url
-                    
-                    success_indicators = [
-                        "回复发表成功" in page_source,
-                        "感谢您的回复" in page_source,
-                        "回复成功" in page_source,
-                        "发表成功" in page_source,
-                        "帖子已提交" in page_source,
-                        # 如果页面有跳转或刷新，也认为成功
-                        "tid=" in current_url and "forum.php" in current_url
-                    ]
-                    
-                    if any(success_indicators):
-                        if test_mode:
-                            logging.info("✅ [测试] 回复成功（测试模式不记录统计）")
-                        else:
-                            logging.info("✅ 回复成功")
-                            # 记录回复统计（仅正常模式）
-                            self.stats.add_reply(post_title, post_url, reply_content)
-                    else:
-                        # 保存页面用于调试
-                        try:
-                            with open('debug/reply_result_debug.html', 'w', encoding='utf-8') as f:
-                                f.write(page_source)
-                            logging.info("📄 已保存回复结果页面到 debug/reply_result_debug.html")
-                        except:
-                            pass
-                        logging.warning("⚠️ 回复可能失败，请检查调试文件")
-                        return False
-                else:
-                    logging.error("❌ 找不到提交按钮")
-                    return False
-                    
-            except Exception as e:
-                logging.error(f"❌ 回复过程出错: {e}")
-                return False
+            return self.submit_reply(post_url, reply_content, post_title, test_mode)
                 
         except Exception as e:
             logging.error(f"❌ 访问帖子失败: {e}")
             return False
     
-    def should_skip_post(self, title, post_url="", check_replied=True):
-        """判断是否应该跳过该帖子
+    def order_forums_by_yield(self, forum_ids):
+        """按历史产出排列论坛：没有统计的论坛优先（先积累数据），其余按每页成功回复数从高到低
+        
+        超过7天未访问的论坛视为没有统计，避免低产出论坛一直排在最后而得不到更新
+        """
+        stale_before = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+        yields = {row['forum_id']: row for row in self.stats.get_forum_yield()
+                  if (row.get('last_update') or '') >= stale_before}
+        unknown = [f for f in forum_ids if f not in yields]
+        known = sorted((f for f in forum_ids if f in yields), key=lambda f: yields[f]['replies_per_page'], reverse=True)
+        ordered = unknown + known
+        if ordered != list(forum_ids):
+            logging.info(f"📊 按产出排列论坛: {', '.join(self.forum_names.get(f, f) for f in ordered)}")
+        return ordered
+    
+    def get_skip_reason(self, title, post_url="", check_replied=True):
+        """判断帖子是否应该跳过，返回 (结论, 原因)，无需跳过时返回None
         
         Args:
             title: 帖子标题
             post_url: 帖子URL
             check_replied: 是否检查已回复（测试模式下可设为False）
         """
-        # 检查跳过关键词
-        for keyword in self.skip_keywords:
-            if keyword in title:
-                logging.info(f"⏭️ 跳过包含关键词 '{keyword}' 的帖子: {title}")
-                return True
+        # 配置文件修改后重新编译跳过规则
+        if self.skip_rules.refresh():
+            rules = self.skip_rules.rules
+            self.skip_keywords = rules.keywords
+            self.skip_prefixes = rules.prefixes
+            self.skip_regex = [p.pattern for p in rules.regex]
+            self.thread_cache.set_rules(rules_fingerprint(self.skip_keywords, self.skip_prefixes, self.skip_regex))
         
-        # 检查跳过前缀
-        for prefix in self.skip_prefixes:
-            if title.startswith(prefix):
-                logging.info(f"⏭️ 跳过前缀为 '{prefix}' 的帖子: {title}")
-                return True
+        # 检查跳过关键词、前缀和正则（一次扫描标题）
+        matched = self.skip_rules.match(title)
+        if matched:
+            decision, rule = matched
+            if decision == DECISION_SKIPPED_KEYWORD:
+                logging.info(f"⏭️ 跳过包含关键词 '{rule}' 的帖子: {title}")
+            elif decision == DECISION_SKIPPED_PREFIX:
+                logging.info(f"⏭️ 跳过前缀为 '{rule}' 的帖子: {title}")
+            else:
+                logging.info(f"⏭️ 跳过匹配正则 '{rule}' 的帖子: {title}")
+            return matched
         
         # 检查是否已经回复过该帖子（根据URL）
         if check_replied and post_url:
-            logging.debug(f"🔍 检查已回复记录: {post_url}")
-            all_replies = self.stats.get_all_replies(limit=1000)  # 获取最近1000条回复记录
-            logging.debug(f"🔍 共有 {len(all_replies)} 条回复记录")
-            for reply in all_replies:
-                if reply.get('url') == post_url:
-                    logging.info(f"⏭️ 跳过已回复过的帖子: {title}")
-                    return True
-        else:
-            if not check_replied:
-                logging.debug(f"🔍 测试模式：跳过已回复检查")
+            if self.stats.has_replied(post_url):
+                logging.info(f"⏭️ 跳过已回复过的帖子: {title}")
+                return DECISION_REPLIED, "回复记录中已存在"
+        elif not check_replied:
+            logging.debug(f"🔍 测试模式：跳过已回复检查")
         
         logging.debug(f"✅ 帖子未被跳过: {title[:50]}")
-        return False
+        return None
+    
+    def should_skip_post(self, title, post_url="", check_replied=True):
+        """判断是否应该跳过该帖子"""
+        return self.get_skip_reason(title, post_url, check_replied) is not None
     
-    def get_smart_reply(self, title, content=""):
-        """根据帖子标题和内容生成纯色情风格回复"""
+    def get_smart_reply(self, title, content="", use_ai=True):
+        """根据帖子标题和内容生成纯色情风格回复（use_ai=False 时只使用规则回复）"""
         if not self.enable_smart_reply:
             return random.choice(self.reply_templates)
         
         # 优先尝试使用AI生成回复
-        if self.ai_service.is_enabled():
+        if use_ai and self.ai_service.is_enabled():
             logging.info("🤖 尝试使用AI生成回复...")
             ai_reply = self.ai_service.generate_reply(title, content)
             if ai_reply:
@@ -1643,1367 +1656,54 @@ class SeleniumAutoBot:
                 logging.warning("⚠️ AI回复失败，降级使用规则回复")
         
         # AI未启用或失败时，使用规则生成回复
-        # 合并标题和内容
-        full_text = title + " " + content
-        import re
-        
-        # 提取明星名字（中国明星优先）
-        star_name = ""
-        
-        # 中国明星名字列表
-        chinese_stars = [
-            '刘亦菲', '杨幂', '赵丽颖', '古力娜扎', '迪丽热巴', 
-            '范冰冰', '杨颖', 'Angelababy', '唐嫣', '郑爽',
-            '关晓彤', '欧阳娜娜', '宋茜', '倪妮', '周冬雨',
-            '刘诗诗', '高圆圆', '林志玲', '舒淇', '徐若瑄'
-        ]
-        
-        for star in chinese_stars:
-            if star in full_text:
-                star_name = star
-                break
-        
-        # 如果没找到中国明星，尝试提取日本女优名字
-        if not star_name:
-            # 日本女优名字模式
-            jp_patterns = [
-                r'[^\x00-\xff]{2,5}(?:かな|なるみ|みゆ|結衣|美穂|百合香)',
-                r'京野結衣|森沢かな|綾瀬なるみ|鳳みゆ|沢北みなみ|川北メイサ|三宮つばき|葵百合香'
-            ]
-            for pattern in jp_patterns:
-                name_match = re.search(pattern, title)
-                if name_match:
-                    star_name = name_match.group(0)
-                    break
-        
-        # 详细特征检测
-        has_高清 = any(x in full_text for x in ['4K', '8K', '1080P', '2160P', 'HEVC', '高清', '原档'])
-        
-        # 身材细节特征
-        has_巨乳 = any(x in full_text for x in ['巨乳', '爆乳', '大奶', 'G罩杯', 'H罩杯', 'I罩杯', '大きな'])
-        has_美腿 = any(x in full_text for x in ['美腿', '长腿', '美脚', '腿'])
-        has_翘臀 = any(x in full_text for x in ['翘臀', '美臀', '屁股', 'お尻'])
-        has_细腰 = any(x in full_text for x in ['细腰', '小蛮腰', 'A4腰', '纤腰'])
-        has_嫩 = any(x in full_text for x in ['嫩', '粉嫩', '少女', '清纯'])
-        has_紧 = any(x in full_text for x in ['激狭', '狭', '紧', '紧致', 'マ◯コ', 'きつい'])
-        has_湿润 = any(x in full_text for x in ['湿', '濡れ', '潮吹', '喷水'])
-        
-        # 性格特征
-        has_淫荡 = any(x in full_text for x in ['淫荡', '骚', '浪', '淫乱', 'エロい'])
-        has_可爱 = any(x in full_text for x in ['可爱', 'かわいい', '愛嬌', '甜美'])
-        
-        # 内容特征
-        has_无码 = '无码' in full_text
-        has_VR = 'VR' in full_text
-        has_中出 = any(x in full_text for x in ['中出', '内射', '射精'])
-        has_多P = any(x in full_text for x in ['3P', '4P', '多P', '群交', '輪姦'])
-        has_口交 = any(x in full_text for x in ['口交', 'フェラ', '吹箫'])
-        has_肛交 = any(x in full_text for x in ['肛交', 'アナル', '后入'])
-        has_AI换脸 = any(x in full_text for x in ['AI换脸', 'AI增强', 'deepfake', 'Deepfake'])
-        has_明星 = any(x in full_text for x in ['刘亦菲', '杨幂', '赵丽颖', '古力娜扎', '迪丽热巴', '明星'])
-        
-        # 构建有文采的色情回复（参考示例风格）
-        reply_sentences = []
-        
-        # 根据特征构建描述性句子
-        
-        # 紧致特征（100个回复）
-        if has_紧:
-            tight_phrases = [
-                "激狭美穴让人心痒难耐，真想亲身体验那种紧致的快感",
-                "那紧致的小穴一定爽到爆，想狠狠插进去感受",
-                "光是想象那紧窄的感觉就让人欲罢不能",
-                "紧致的蜜穴肯定能把鸡巴夹得死死的，太爽了",
-                "紧窄的小逼插进去肯定爽翻天",
-                "激狭名器，想插进去感受那极致的包裹感",
-                "这么紧的屄，进去肯定夹得很舒服",
-                "紧致蜜穴，每次抽插都能爽到头皮发麻",
-                "狭窄小穴太诱人了，想狠狠贯穿",
-                "那种紧致感想想就硬了，太想操了",
-                "激狭逼穴，鸡巴插进去肯定爽爆",
-                "紧到不行的小穴，想体验被夹得动弹不得的感觉",
-                "这紧致度绝了，插进去肯定舒服得要命",
-                "名器级的紧致感，想好好开发一番",
-                "狭窄湿润，插入的瞬间肯定爽翻",
-                "紧窄小穴夹得鸡巴要爆炸了",
-                "激狭美穴，想一插到底感受那极致快感",
-                "紧致得让人欲罢不能，真想狠狠操烂",
-                "这紧度太顶了，想插进去慢慢品味",
-                "狭小蜜穴，抽插起来肯定摩擦感十足",
-                "紧窄逼洞夹得我射得特别快",
-                "激狭小屄，插一次爽一次",
-                "这紧致感太上瘾了，想天天插",
-                "名器般的紧致，每次都能榨干我",
-                "狭窄蜜洞，插进去就不想出来",
-                "紧得像处女一样，太爽了",
-                "激狭美逼，想狠狠开拓",
-                "紧致小穴吸得我欲罢不能",
-                "这紧度堪称完美，想插烂它",
-                "狭窄逼眼太诱人，想用力捅进去",
-                "紧致感爆表，插进去爽到起飞",
-                "激狭蜜穴夹得鸡巴疼痛又爽",
-                "这紧窄程度绝了，想慢慢享受",
-                "名器级小屄，想好好品味",
-                "紧致湿滑，插入感太完美了",
-                "激狭逼洞，每次抽插都爽翻",
-                "紧得让人射精都困难，太爽了",
-                "狭窄蜜穴，想插到最深处",
-                "这紧致度让我疯狂，想狂插不止",
-                "激狭美穴包裹感太强了",
-                "紧窄小逼，插着插着就射了",
-                "紧致蜜洞，想一整晚都插着",
-                "激狭屄眼，进出都是极致享受",
-                "这紧度太犯规了，根本把持不住",
-                "狭窄逼穴，想用鸡巴撑开",
-                "紧致感让每次抽插都爽爆",
-                "激狭名器，想插到她求饶",
-                "紧窄蜜穴，夹得我头皮发麻",
-                "这紧致小屄太销魂了",
-                "激狭美逼，想狠狠贯穿到底",
-                "紧得让人欲仙欲死，太爽了",
-                "狭窄小穴，想插得她腿发软",
-                "紧致蜜洞吸力太强了",
-                "激狭逼穴，想天天操",
-                "这紧窄感让我射得特别爽",
-                "名器级紧致，想好好开发",
-                "狭窄美穴，插进去就硬了",
-                "紧致小逼，想插到精尽人亡",
-                "激狭蜜穴，每一下都爽到极致",
-                "紧窄屄眼，想慢慢磨蹭",
-                "这紧致度太犯规，想狂操",
-                "激狭美屄夹得我动不了",
-                "紧致小穴，想插得她浪叫",
-                "狭窄蜜洞，抽插声音太刺激",
-                "紧得像要把我夹断，爽翻了",
-                "激狭逼洞，想用力顶到最深",
-                "这紧致感太完美，欲罢不能",
-                "名器般小穴，想狠狠蹂躏",
-                "紧窄美逼，插着太舒服了",
-                "激狭蜜穴，想射在里面",
-                "紧致屄眼，每次都能榨干",
-                "狭窄小屄太诱人，想日夜不停",
-                "这紧度让我疯狂，想插烂",
-                "激狭美穴，插进去就不想拔出来",
-                "紧窄蜜洞夹得我要射了",
-                "紧致逼穴，想狠狠冲刺",
-                "激狭小逼，插着太爽了",
-                "这紧致感太上头，想一直插",
-                "狭窄美穴吸得我魂都没了",
-                "紧致蜜洞，想插到她崩溃",
-                "激狭屄眼，每次都爽到颤抖",
-                "紧窄小穴太完美，想天天操",
-                "这紧致度堪称极品",
-                "激狭美逼，想插得她求饶",
-                "紧致蜜穴，夹得我欲仙欲死",
-                "狭窄逼洞，想狠狠贯穿",
-                "这紧度太销魂，控制不住",
-                "激狭小屄，想插到射不出来",
-                "紧窄美穴包裹感太强",
-                "紧致蜜洞，想慢慢品尝",
-                "激狭逼眼，插进去爽炸了",
-                "这紧致小穴太犯规了",
-                "狭窄屄洞，想用力捅进去",
-                "紧致美逼，每次都射得特别爽",
-                "激狭蜜穴，想插到腿软",
-                "紧窄小逼太诱人，想狂插",
-                "这紧度让人发疯，太爽了",
-                "激狭美穴夹得我要崩溃",
-                "紧致蜜洞，想插个够本"
-            ]
-            reply_sentences.append(random.choice(tight_phrases))
-        
-        # 巨乳特征（100个回复）
-        if has_巨乳:
-            breast_phrases = [
-                "那对巨乳摇曳的样子肯定很诱人，想狠狠揉捏",
-                "大奶子晃来晃去太刺激了，忍不住想埋进去",
-                "丰满的胸部让人食指大动，真想好好玩弄一番",
-                "爆乳太诱人了，想边插边抓着那对大奶",
-                "奶子又大又软，想狠狠揉搓",
-                "巨乳在身下摇晃的景象肯定很爽",
-                "大波霸看着就想含在嘴里吸",
-                "丰满巨乳，想埋进去窒息而亡",
-                "奶子这么大，乳交肯定很舒服",
-                "波涛汹涌，看着就想上手揉",
-                "巨乳女优就是好，奶子大操着爽",
-                "爆乳摇晃太刺激，想抓着奶子狠狠插",
-                "大奶子太诱人，想边吸边操",
-                "胸这么大，夹鸡巴肯定很爽",
-                "丰乳肥臀，奶子看着就想舔",
-                "巨乳晃得我眼花，鸡巴都硬了",
-                "波霸级别，想把脸埋进去",
-                "奶子又圆又大，想狠狠玩弄",
-                "巨乳诱惑太大了，看着就流口水",
-                "大胸美女最骚了，想抓着奶子后入",
-                "这对奶子太完美了，想日夜把玩",
-                "巨乳摇晃的样子太销魂，硬了",
-                "大奶抖动起来太诱人，想舔个够",
-                "爆乳太犯规了，想夹着鸡巴射",
-                "丰满双乳，想边操边捏",
-                "奶子大得夸张，想狠狠蹂躏",
-                "巨乳晃动的节奏太撩人",
-                "大波浪看着就受不了，想埋进去",
-                "胸部这么饱满，想好好享受",
-                "爆乳女优最爽，奶子揉着特舒服",
-                "巨大奶子，想用鸡巴戳",
-                "丰乳配小蛮腰，身材绝了",
-                "大奶晃得我把持不住",
-                "巨乳诱惑力太强，想狠狠吸",
-                "奶子又软又弹，想玩一整晚",
-                "爆乳摇起来太刺激，看着就射",
-                "丰满巨乳夹着鸡巴肯定爽翻",
-                "大胸器太诱人，想抓着不放",
-                "巨乳女神，奶子看着就硬",
-                "波霸身材，想边插边揉奶",
-                "奶子这么大只，想狠狠抓",
-                "巨乳晃动太淫荡，看着就想操",
-                "大奶子软软的，想捏爆",
-                "爆乳太顶了，想含在嘴里",
-                "丰满双峰，想埋脸进去",
-                "巨乳摇晃声都听得见，太骚了",
-                "大奶子看着就流水，想摸",
-                "胸部太饱满，想边操边玩",
-                "爆乳级别，夹鸡巴肯定爽",
-                "巨大奶子晃得人心痒",
-                "丰乳美臀，身材太犯规",
-                "大胸妹子，奶子揉着最爽",
-                "巨乳诱惑，想狠狠吸奶",
-                "奶子又大又挺，想玩弄",
-                "爆乳摇晃画面太刺激",
-                "丰满巨乳，想边插边抓",
-                "大波浪太诱人，想埋进去吸",
-                "巨乳女优最骚，奶子大操着舒服",
-                "胸器太犯规，看着就硬了",
-                "爆乳晃动太淫荡",
-                "巨大双乳，想狠狠揉捏",
-                "丰满奶子，想含住不放",
-                "大胸美女操起来最爽",
-                "巨乳摇曳太销魂",
-                "奶子饱满，想边操边玩弄",
-                "爆乳太诱惑，想夹射",
-                "丰乳配骚脸，绝配",
-                "大奶子抖动太刺激",
-                "巨乳晃得我要射了",
-                "胸部太大，想狠狠蹂躏",
-                "爆乳女优，奶子最好玩",
-                "巨大双峰，想埋进去",
-                "丰满巨乳夹着最舒服",
-                "大胸器晃动太骚",
-                "巨乳诱惑，看着就想摸",
-                "奶子又圆又软，想捏",
-                "爆乳摇晃太淫荡",
-                "丰满奶子想边吸边插",
-                "大波霸太诱人",
-                "巨乳女神，想抓着奶子操",
-                "胸这么大，乳交肯定爽爆",
-                "爆乳级身材，太完美了",
-                "巨大奶子，想狠狠玩",
-                "丰乳肥臀，想从后面抓奶操",
-                "大奶晃动节奏太撩人",
-                "巨乳美女，奶子看着就想射",
-                "奶子太饱满，想揉到她叫",
-                "爆乳摇起来太骚",
-                "丰满双乳，想边插边吸",
-                "大胸妹最好操，奶子能玩很久",
-                "巨乳晃动画面太刺激",
-                "胸器太犯规，想狠狠抓",
-                "爆乳太诱惑，看着就硬",
-                "巨大奶子，想埋脸窒息",
-                "丰满巨乳，想夹着鸡巴射",
-                "大波浪太性感，想好好品尝",
-                "巨乳女优最香，奶子又大又软"
-            ]
-            reply_sentences.append(random.choice(breast_phrases))
-        
-        # 美腿特征（100个回复）
-        if has_美腿:
-            leg_phrases = [
-                "那双美腿修长诱人，真想架在肩上好好操",
-                "美腿太性感了，想边抚摸边深入",
-                "看着那双腿就硬了，想舔遍每一寸",
-                "纤细的美腿缠上来肯定很爽",
-                "大长腿太诱人，想分开狠狠插",
-                "美腿玩年，想从脚趾舔到大腿根",
-                "这腿又长又直，想架在肩上狂操",
-                "美腿太骚了，想边舔边插",
-                "修长美腿，想让她用腿夹着我",
-                "腿这么美，想把玩一整晚",
-                "纤细美腿太性感，想咬一口",
-                "长腿妹子就是诱人，想把她腿掰开",
-                "美腿夹腰的感觉肯定很爽",
-                "这双腿太完美了，想好好品尝",
-                "美腿翘臀，想从后面抱着操",
-                "长腿太骚，想让她用腿勾着我",
-                "腿型太美了，想抚摸每一寸肌肤",
-                "美腿丝袜，想撕开狠狠干",
-                "修长双腿，想分开到极限",
-                "美腿控福利，看着就想射在腿上",
-                "大长腿太勾人，想扛在肩上操",
-                "美腿白皙光滑，想好好舔",
-                "修长双腿分开的样子太淫荡",
-                "腿这么长，缠腰上肯定爽",
-                "美腿太诱人，想从上舔到下",
-                "纤细长腿，想掰开狠狠插",
-                "大长腿妹子最骚，想操",
-                "美腿控的天堂，看着就硬",
-                "修长美腿太性感，想把玩",
-                "腿型完美，想架着狂插",
-                "美腿丝袜诱惑太大",
-                "长腿美女最诱人，想操翻",
-                "纤细双腿，想让她夹紧我",
-                "美腿太养眼，想边摸边插",
-                "大长腿分开的瞬间最刺激",
-                "修长美腿缠上来肯定很爽",
-                "腿这么美，想舔个够",
-                "美腿白嫩，想咬上一口",
-                "长腿妹子操起来最舒服",
-                "纤细美腿太勾魂，想玩",
-                "美腿夹腰的画面太刺激",
-                "大长腿太诱惑，想掰开",
-                "修长双腿太完美，想品尝",
-                "腿型这么好，想狠狠把玩",
-                "美腿丝袜，撕开就干",
-                "长腿美女最骚浪",
-                "纤细美腿，想从脚舔起",
-                "美腿控看了都硬",
-                "大长腿架肩上操最爽",
-                "修长美腿太性感了",
-                "腿这么直，想掰开到极限",
-                "美腿诱惑让人把持不住",
-                "长腿妹子想狠狠操",
-                "纤细双腿缠着最舒服",
-                "美腿太勾人，想边舔边干",
-                "大长腿分开插进去最爽",
-                "修长美腿，想好好享受",
-                "腿型太犯规，看着就想摸",
-                "美腿白嫩光滑，想舔遍",
-                "长腿美女操着最带劲",
-                "纤细美腿太诱人了",
-                "美腿夹腰爽到飞起",
-                "大长腿太骚，想狂操",
-                "修长双腿，想让她用腿勾我",
-                "腿这么美，想玩一整晚",
-                "美腿丝袜太刺激",
-                "长腿控的最爱，想操",
-                "纤细美腿分开的样子绝了",
-                "美腿太性感，想边摸边插",
-                "大长腿架着操太爽了",
-                "修长美腿缠腰上肯定舒服",
-                "腿型完美，想好好品尝",
-                "美腿白皙，想从上舔到下",
-                "长腿妹最好操",
-                "纤细双腿太养眼",
-                "美腿诱惑力爆表",
-                "大长腿掰开最刺激",
-                "修长美腿太勾魂",
-                "腿这么直，想狠狠玩",
-                "美腿丝袜想撕了干",
-                "长腿美女最淫荡",
-                "纤细美腿想边舔边操",
-                "美腿夹紧的感觉太爽",
-                "大长腿太完美了",
-                "修长双腿想掰到极限",
-                "腿型太诱人，想摸个够",
-                "美腿白嫩想咬",
-                "长腿控福利，看着就射",
-                "纤细美腿太勾人",
-                "美腿太骚浪",
-                "大长腿分开插最爽",
-                "修长美腿想好好把玩",
-                "腿这么美想舔遍每寸",
-                "美腿丝袜太刺激了",
-                "长腿妹子想狂操不止",
-                "纤细双腿缠着太舒服",
-                "美腿诱惑太犯规",
-                "大长腿架肩上最爽",
-                "修长美腿太性感了"
-            ]
-            reply_sentences.append(random.choice(leg_phrases))
+        if self.reply_rules is None:
+            return random.choice(self.reply_templates)
+        self.reply_rules.refresh()
+        rule_set = self.reply_rules.rules
+        reply, bits = rule_set.generate(title, content)
+        logging.info(f"💡 智能回复 - 特征: {rule_set.describe(bits)}")
         
-        # 嫩/粉嫩特征（100个回复）
-        if has_嫩:
-            tender_phrases = [
-                "粉嫩的小穴一看就很敏感，轻轻一碰就出水",
-                "嫩得让人想温柔疼爱，又想狠狠蹂躏",
-                "粉嫩嫩的屄水肯定很多，想舔个够",
-                "看着那粉嫩的小逼就想狠狠插入",
-                "嫩屄太诱人，想慢慢品尝那青涩的味道",
-                "粉嫩小穴，插进去肯定嫩滑湿润",
-                "嫩得出水，想好好疼爱这小骚货",
-                "粉粉嫩嫩的，看着就想舔",
-                "嫩逼太骚了，想狠狠开苞",
-                "粉嫩美穴，想温柔插入感受那紧致",
-                "嫩到极致，想好好调教",
-                "粉嫩小屄，想舔得她浪叫",
-                "嫩屄水多，插进去肯定滑溜溜",
-                "粉嫩蜜穴，想慢慢开发",
-                "嫩得让人心痒，真想狠狠疼爱",
-                "粉嫩逼穴，舔起来肯定很爽",
-                "嫩屄嫩逼，想插得她求饶",
-                "粉嫩小穴太诱惑，控制不住想插",
-                "嫩滑湿润，想一插到底",
-                "粉嫩美屄，想好好玩弄",
-                "嫩穴太诱人，想狠狠品尝",
-                "粉嫩嫩的看着就硬了",
-                "嫩逼水多，想舔干净",
-                "粉嫩小屄，想慢慢疼爱",
-                "嫩得像少女，想好好开发",
-                "粉嫩蜜洞，插进去肯定爽",
-                "嫩屄太骚，想狠狠插",
-                "粉嫩逼眼，舔着肯定很爽",
-                "嫩滑的触感想象就硬了",
-                "粉嫩小穴，想插到她叫",
-                "嫩屄嫩得出水",
-                "粉嫩美逼，想好好玩",
-                "嫩到极致的小穴太诱人",
-                "粉嫩蜜穴，想狠狠开拓",
-                "嫩逼太嫩，想慢慢品味",
-                "粉嫩小屄，看着就想舔",
-                "嫩得让人心动，想插",
-                "粉嫩逼洞，想用力插进去",
-                "嫩屄水润，插着肯定舒服",
-                "粉嫩美穴太完美",
-                "嫩逼嫩屄，想狠狠疼爱",
-                "粉嫩小穴太诱惑",
-                "嫩得像处子，想开苞",
-                "粉嫩蜜洞，想一插到底",
-                "嫩屄太骚浪",
-                "粉嫩逼穴，想慢慢享受",
-                "嫩滑湿润的感觉绝了",
-                "粉嫩小屄，想插得她哭",
-                "嫩得出水的样子太骚",
-                "粉嫩美逼，想好好调教",
-                "嫩屄嫩穴，想狠狠插",
-                "粉嫩蜜穴太诱人了",
-                "嫩逼水多肉滑",
-                "粉嫩小穴，想边舔边插",
-                "嫩得让人疯狂",
-                "粉嫩逼洞，插进去肯定爽翻",
-                "嫩屄太嫩，想温柔对待",
-                "粉嫩美穴，想狠狠品尝",
-                "嫩逼嫩得流水",
-                "粉嫩小屄太完美",
-                "嫩穴嫩逼，想好好玩弄",
-                "粉嫩蜜洞，看着就想插",
-                "嫩得像花瓣，想轻轻抚摸",
-                "粉嫩逼穴太骚了",
-                "嫩屄水润润的",
-                "粉嫩小穴，想插到最深",
-                "嫩得让人把持不住",
-                "粉嫩美逼，想慢慢开发",
-                "嫩逼太诱人，想舔",
-                "粉嫩蜜穴，想狠狠蹂躏",
-                "嫩屄嫩到极致",
-                "粉嫩小屄，插着肯定爽",
-                "嫩穴太骚浪",
-                "粉嫩逼洞，想好好疼爱",
-                "嫩得出水的小穴绝了",
-                "粉嫩美穴太刺激",
-                "嫩逼嫩屄，想插烂",
-                "粉嫩小穴太嫩了",
-                "嫩得让人想狠狠插",
-                "粉嫩蜜洞，舔着肯定爽",
-                "嫩屄太完美",
-                "粉嫩逼穴，想插得她浪叫",
-                "嫩滑的触感太诱人",
-                "粉嫩小屄，想好好品味",
-                "嫩得像婴儿肌肤",
-                "粉嫩美逼，想狠狠操",
-                "嫩逼水多肉嫩",
-                "粉嫩蜜穴，想插到她崩溃",
-                "嫩屄嫩穴太骚",
-                "粉嫩小穴，看着就流水",
-                "嫩得让人欲罢不能",
-                "粉嫩逼洞，想慢慢享受",
-                "嫩屄太诱惑了",
-                "粉嫩美穴，想边舔边玩",
-                "嫩逼嫩得不行",
-                "粉嫩小屄，想插个够本",
-                "嫩穴太嫩太爽",
-                "粉嫩蜜洞，想好好疼爱"
-            ]
-            reply_sentences.append(random.choice(tender_phrases))
+        return reply
+    
+    def get_smart_replies(self, posts):
+        """为一批帖子生成回复：AI启用时并发请求，失败或超时的帖子使用规则回复
         
-        # 湿润/潮吹特征（100个回复）
-        if has_湿润:
-            wet_phrases = [
-                "淫水泛滥的样子太骚了，想舔干净",
-                "潮吹喷得到处都是的景象光想就硬了",
-                "那湿润的蜜穴肯定水声很大",
-                "屄水流得满床都是，太淫荡了",
-                "湿淋淋的小穴太诱人",
-                "潮吹的瞬间最刺激",
-                "淫水直流，想舔个够",
-                "湿透的样子太骚浪",
-                "潮喷画面太刺激",
-                "屄水多得流出来",
-                "湿润蜜穴，插着肯定爽",
-                "潮吹喷射太淫荡",
-                "淫水横流的样子绝了",
-                "湿得不行，想狠狠插",
-                "潮吹高潮太刺激",
-                "屄水泛滥，舔着最爽",
-                "湿润小穴太诱惑",
-                "潮喷瞬间想看",
-                "淫水多得吓人",
-                "湿透的逼穴太骚",
-                "潮吹画面太淫荡",
-                "屄水流不停",
-                "湿润蜜洞，插进去爽翻",
-                "潮喷得到处都是",
-                "淫水直流太骚",
-                "湿得一塌糊涂",
-                "潮吹高潮最刺激",
-                "屄水多到爆",
-                "湿润小穴想舔",
-                "潮喷场景太淫乱",
-                "淫水泛滥成灾",
-                "湿透的样子太诱人",
-                "潮吹瞬间最爽",
-                "屄水横流太骚浪",
-                "湿润蜜穴太完美",
-                "潮喷画面绝了",
-                "淫水多得流出来",
-                "湿得要命",
-                "潮吹高潮太淫荡",
-                "屄水流满床",
-                "湿润逼穴想插",
-                "潮喷瞬间太刺激",
-                "淫水泛滥太骚",
-                "湿透小穴太爽",
-                "潮吹画面太销魂",
-                "屄水多到夸张",
-                "湿润蜜洞想舔",
-                "潮喷高潮绝了",
-                "淫水横流太淫乱",
-                "湿得不像话",
-                "潮吹瞬间最淫荡",
-                "屄水流不停太骚",
-                "湿润小穴想插个够",
-                "潮喷画面太诱人",
-                "淫水多得吓死人",
-                "湿透逼穴太刺激",
-                "潮吹高潮最淫乱",
-                "屄水泛滥想舔",
-                "湿润蜜穴太诱惑",
-                "潮喷瞬间太销魂",
-                "淫水直流太淫荡",
-                "湿得一发不可收拾",
-                "潮吹画面最刺激",
-                "屄水横流想舔干净",
-                "湿润小穴太骚浪",
-                "潮喷高潮太刺激",
-                "淫水泛滥成河",
-                "湿透蜜洞想插",
-                "潮吹瞬间绝了",
-                "屄水多得离谱",
-                "湿润逼穴太完美",
-                "潮喷画面最淫荡",
-                "淫水横流太刺激",
-                "湿得要死",
-                "潮吹高潮最销魂",
-                "屄水流满地",
-                "湿润小穴想好好品尝",
-                "潮喷瞬间最淫乱",
-                "淫水泛滥太淫荡",
-                "湿透逼穴想插烂",
-                "潮吹画面绝配",
-                "屄水多到溢出",
-                "湿润蜜穴想狠狠插",
-                "潮喷高潮太淫乱",
-                "淫水直流太刺激",
-                "湿得不得了",
-                "潮吹瞬间太诱人",
-                "屄水横流太完美",
-                "湿润小穴最骚",
-                "潮喷画面最销魂",
-                "淫水泛滥想舔干净",
-                "湿透蜜洞太刺激",
-                "潮吹高潮绝了",
-                "屄水流个不停",
-                "湿润逼穴太淫荡",
-                "潮喷瞬间最刺激"
+        Returns:
+            与 posts 顺序一致的回复列表
+        """
+        ai_replies = {}
+        if self.enable_smart_reply and self.ai_service.is_enabled():
+            items = [
+                {'tid': post.get('tid') or post['url'], 'title': post['title'], 'content': post.get('content', '')}
+                for post in posts if post['title']
             ]
-            reply_sentences.append(random.choice(wet_phrases))
+            ai_replies = self.ai_service.generate_replies_batch(items)
         
-        # 明星/女优名字特征
-        if star_name:
-            # 区分是中国明星还是日本女优
-            is_chinese = star_name in chinese_stars
-            
-            if is_chinese:
-                # 中国明星专用回复
-                star_phrases = [
-                    f"{star_name}的脸太美了，看着被操的样子简直绝了",
-                    f"终于能看到{star_name}被狂操的样子，AI技术万岁",
-                    f"{star_name}这种女神级的，想象着操她就硬了",
-                    f"看{star_name}被插的样子太爽了，虽然是换脸也很带劲"
-                ]
+        replies = []
+        for post in posts:
+            if not post['title']:
+                replies.append(random.choice(self.reply_templates))
+                continue
+            reply = ai_replies.get(post.get('tid') or post['url'])
+            if reply:
+                logging.info(f"✅ AI回复成功: {reply}")
             else:
-                # 日本女优专用回复
-                star_phrases = [
-                    f"{star_name}的身体太诱人了，想好好品尝",
-                    f"就喜欢{star_name}这种骚浪的，叫床声肯定很撩人",
-                    f"{star_name}真是极品，想和她来一发",
-                    f"看{star_name}的表演就能射，太他妈骚了"
-                ]
-            reply_sentences.append(random.choice(star_phrases))
-        
-        # 无码特征（100个回复）
-        if has_无码:
-            uncensored_phrases = [
-                "无码看得一清二楚，连屄毛都看得见",
-                "无码真爽，能清楚看到鸡巴插入的每个细节",
-                "就爱看无码的，有码根本不够劲",
-                "无码高清，屄的每个褶皱都看得清清楚楚",
-                "无码才是王道，看着鸡巴进出太爽了",
-                "无码看着真实，插入的感觉看得一清二楚",
-                "就喜欢无码的，能看清逼穴被撑开的样子",
-                "无码画质，连阴蒂都看得清清楚楚",
-                "无马赛克真爽，小穴被插得变形都看得见",
-                "无码就是好，屄水流出来都看得清",
-                "无码片才够劲，能看到每一下抽插",
-                "无码高清，鸡巴进出小穴的画面太刺激",
-                "无遮挡看着爽，阴唇被顶开的瞬间绝了",
-                "无码才真实，能看清屄被操烂的过程",
-                "就爱无码，看着鸡巴插进粉穴的样子硬了",
-                "无码清晰，连淫水都看得一清二楚",
-                "无码版本太赞，能看清逼穴的每个细节",
-                "无遮挡真爽，看着小穴被撑满太刺激",
-                "无码画面，插入抽出都看得清清楚楚",
-                "就要看无码的，有码太不过瘾了",
-                "无码片看得最爽，细节都能看清",
-                "无马赛克最刺激，插入瞬间太真实",
-                "无码高清画质绝了",
-                "无遮挡才过瘾，屄看得清清楚楚",
-                "无码版本最带劲",
-                "就爱无码片，有码不看",
-                "无码看着最真实",
-                "无马赛克太爽了，每个细节都清晰",
-                "无码高清才是王道",
-                "无遮挡画面太刺激",
-                "无码片最过瘾，看得清清楚楚",
-                "就要看无码，有码太假",
-                "无码版本太完美",
-                "无马赛克看着爽",
-                "无码高清画面绝配",
-                "无遮挡才够劲",
-                "无码片看着最真",
-                "就喜欢无码版",
-                "无码画质太清晰",
-                "无马赛克最真实",
-                "无码高清最刺激",
-                "无遮挡画面绝了",
-                "无码片才过瘾",
-                "就要无码的，有码不看",
-                "无码版本最爽",
-                "无马赛克太清楚",
-                "无码高清太带劲",
-                "无遮挡最刺激",
-                "无码片最真实",
-                "就爱看无码版本",
-                "无码画质完美",
-                "无马赛克看得爽",
-                "无码高清绝了",
-                "无遮挡才真实",
-                "无码片最刺激",
-                "就要无码高清",
-                "无码版本太清晰",
-                "无马赛克最爽",
-                "无码高清过瘾",
-                "无遮挡太真实",
-                "无码片太完美",
-                "就喜欢无码高清",
-                "无码画质绝配",
-                "无马赛克太刺激",
-                "无码高清最真",
-                "无遮挡太爽了",
-                "无码片看着舒服",
-                "就要看无码高清",
-                "无码版本太真实",
-                "无马赛克太完美",
-                "无码高清太清晰",
-                "无遮挡最过瘾",
-                "无码片太刺激",
-                "就爱无码高清版",
-                "无码画质太真实",
-                "无马赛克绝了",
-                "无码高清最完美",
-                "无遮挡太清楚",
-                "无码片最带劲",
-                "就要无码版本",
-                "无码画质最爽",
-                "无马赛克太真",
-                "无码高清太刺激",
-                "无遮挡最真实",
-                "无码片太爽了",
-                "就喜欢看无码",
-                "无码版本最刺激",
-                "无马赛克最清晰",
-                "无码高清太过瘾",
-                "无遮挡太完美",
-                "无码片最清晰",
-                "就要无码的看",
-                "无码画质最刺激",
-                "无马赛克太过瘾",
-                "无码高清太真实",
-                "无遮挡最爽",
-                "无码片太清晰",
-                "就爱看无码的"
-            ]
-            reply_sentences.append(random.choice(uncensored_phrases))
-        
-        # 中出特征（100个回复）
-        if has_中出:
-            creampie_phrases = [
-                "中出内射最刺激，看着精液流出来太爽了",
-                "就爱看中出，射在里面的感觉一定爽翻",
-                "内射画面太带感了，想象自己也射进去",
-                "中出最爽，看着精液从逼里流出来硬了",
-                "内射瞬间太刺激，想狠狠射满她",
-                "就喜欢中出结局，看着精液溢出太爽",
-                "射在里面的画面绝了，想感受那温热",
-                "中出才够劲，看着被灌满的样子硬了",
-                "内射深处，想把精液全射进去",
-                "中出画面太刺激，看着就想射",
-                "射进去的瞬间肯定爽翻，真想体验",
-                "中出特写太诱人，精液流出来的样子绝了",
-                "就爱看内射，被射满的屄太骚了",
-                "中出完的小穴流着精液，太淫荡了",
-                "内射最带感，想狠狠射进最深处",
-                "中出镜头绝了，看着就忍不住想射",
-                "射满小穴的画面太爽，想亲身体验",
-                "中出高潮，看着精液喷涌而出硬了",
-                "内射特写，逼穴里满是精液太刺激",
-                "中出结束，看着精液慢慢流出来绝了",
-                "内射画面最刺激，精液溢出太爽",
-                "中出才过瘾，射在里面最舒服",
-                "就爱中出结局，看着流出来硬了",
-                "内射瞬间绝了，想射满她",
-                "中出画面太淫荡",
-                "就要看中出的，外射不过瘾",
-                "内射深处最爽",
-                "中出特写太诱人",
-                "就喜欢看内射画面",
-                "中出高潮太刺激",
-                "内射完流出来的样子绝了",
-                "中出才够劲，外射太浪费",
-                "就爱看中出特写",
-                "内射画面最淫荡",
-                "中出瞬间太爽了",
-                "就要中出结局",
-                "内射深处太刺激",
-                "中出完的样子太骚",
-                "就喜欢内射画面",
-                "中出特写绝配",
-                "内射瞬间最爽",
-                "中出画面最带劲",
-                "就爱看中出高潮",
-                "内射深处绝了",
-                "中出才最爽",
-                "就要看内射的",
-                "中出瞬间太淫荡",
-                "内射画面太完美",
-                "中出结局最刺激",
-                "就喜欢中出特写",
-                "内射深处最淫乱",
-                "中出高潮绝了",
-                "就爱中出画面",
-                "内射瞬间太诱人",
-                "中出完太骚了",
-                "就要中出的看",
-                "内射画面最刺激",
-                "中出特写太爽",
-                "就喜欢看中出的",
-                "内射深处太淫荡",
-                "中出瞬间最淫乱",
-                "就爱内射结局",
-                "中出画面太诱人",
-                "内射高潮绝了",
-                "中出才最刺激",
-                "就要内射画面",
-                "中出瞬间太完美",
-                "内射深处最爽",
-                "中出结局绝配",
-                "就喜欢中出高潮",
-                "内射画面太淫乱",
-                "中出特写最爽",
-                "就爱看内射的",
-                "中出瞬间太刺激",
-                "内射深处绝配",
-                "中出画面最淫荡",
-                "就要中出特写",
-                "内射瞬间最淫荡",
-                "中出高潮太爽",
-                "就喜欢内射深处",
-                "中出完最淫乱",
-                "内射画面绝了",
-                "中出才最淫荡",
-                "就爱中出瞬间",
-                "内射深处太爽",
-                "中出特写最刺激",
-                "就要看中出画面",
-                "内射瞬间太淫乱",
-                "中出结局太爽",
-                "就喜欢中出完的样子",
-                "内射画面最爽",
-                "中出瞬间绝配",
-                "就爱内射特写",
-                "中出深处太刺激",
-                "内射高潮最爽",
-                "中出画面绝了",
-                "就要内射瞬间",
-                "中出完太淫荡",
-                "内射深处最淫荡",
-                "中出特写太淫乱"
-            ]
-            reply_sentences.append(random.choice(creampie_phrases))
-        
-        # 多P特征（100个回复）
-        if has_多P:
-            group_phrases = [
-                "多P场面太刺激了，几根鸡巴同时插肯定爽爆",
-                "群交看着就硬，这种淫乱场面我最爱",
-                "被轮流操的样子太淫荡了，骚货",
-                "3P画面太刺激，前后一起插肯定爽翻",
-                "群P太淫乱，看着几个男人轮流上硬了",
-                "多人运动最带劲，看着就想加入",
-                "轮奸场景太刺激，一个接一个操真骚",
-                "群交淫乱，看着被多根鸡巴填满太爽",
-                "多P最爽，各种姿势各种插",
-                "被几个男人同时玩弄，骚屄一个",
-                "群交画面绝了，看着就想射",
-                "多人齐上，看着被操到崩溃太刺激",
-                "轮流内射，看着被灌满精液太淫荡",
-                "群P场面太劲爆，几个洞都被填满",
-                "多人运动太骚，看着就硬邦邦",
-                "被群操的样子绝了，淫娃一个",
-                "多P淫乱派对，看着就想参与",
-                "轮番上阵，看着被操到求饶太爽",
-                "群交高潮，被操得浪叫连连",
-                "多根鸡巴同时伺候，骚屄享福了",
-                "多P画面最淫荡，看着就硬",
-                "群交场面太刺激",
-                "被轮流插的样子太骚",
-                "3P最爽，前后齐插",
-                "群P淫乱，几个男人轮着来",
-                "多人运动太刺激了",
-                "轮奸画面绝了",
-                "群交淫乱派对最爽",
-                "多P场面太带劲",
-                "被几根鸡巴同时插太淫荡",
-                "群交高潮最刺激",
-                "多人齐上太骚",
-                "轮流内射画面绝配",
-                "群P最淫乱",
-                "多人运动场面太爽",
-                "被群操太刺激",
-                "多P淫乱最带劲",
-                "轮番上阵太骚浪",
-                "群交画面最淫荡",
-                "多根鸡巴伺候太爽",
-                "多P场面最刺激",
-                "群交淫乱太骚",
-                "被轮流操绝了",
-                "3P画面最淫荡",
-                "群P太刺激",
-                "多人运动最淫乱",
-                "轮奸场景最骚",
-                "群交高潮绝配",
-                "多P最淫荡",
-                "被几个男人同时玩太爽",
-                "群交画面太刺激",
-                "多人齐上最淫乱",
-                "轮流内射最骚",
-                "群P场面绝了",
-                "多人运动太淫荡",
-                "被群操最刺激",
-                "多P淫乱派对绝配",
-                "轮番上阵最淫乱",
-                "群交最骚浪",
-                "多根鸡巴最爽",
-                "多P画面太淫荡",
-                "群交淫乱最刺激",
-                "被轮流插最骚",
-                "3P场面绝了",
-                "群P最骚浪",
-                "多人运动绝配",
-                "轮奸画面最淫荡",
-                "群交高潮最淫乱",
-                "多P太骚",
-                "被几个男人操最爽",
-                "群交画面最刺激",
-                "多人齐上绝了",
-                "轮流内射最淫荡",
-                "群P场面最淫乱",
-                "多人运动最骚",
-                "被群操绝配",
-                "多P淫乱最骚浪",
-                "轮番上阵最刺激",
-                "群交太淫荡",
-                "多根鸡巴最淫乱",
-                "多P场面太骚",
-                "群交淫乱绝了",
-                "被轮流操最淫荡",
-                "3P画面最刺激",
-                "群P淫乱最骚",
-                "多人运动最刺激",
-                "轮奸场景绝配",
-                "群交高潮太骚",
-                "多P最刺激",
-                "被几个男人玩最淫荡",
-                "群交画面绝了",
-                "多人齐上最骚",
-                "轮流内射绝配",
-                "群P场面太骚浪",
-                "多人运动太刺激",
-                "被群操最淫荡",
-                "多P淫乱绝了",
-                "轮番上阵太淫荡"
-            ]
-            reply_sentences.append(random.choice(group_phrases))
-        
-        # AI换脸/明星特征（100个回复）
-        if has_AI换脸 or has_明星:
-            ai_phrases = [
-                "AI换脸技术太牛了，看着和真的一样，撸得更带劲",
-                "换脸换得真像，想象着操女神的感觉太爽了",
-                "AI技术真是造福宅男，终于能看到女神被操了",
-                "换脸效果太逼真了，看着明星被狂操心里爽翻",
-                "科技改变生活，AI让我们能看到平时看不到的画面",
-                "AI技术万岁，女神终于肯下海了",
-                "换脸太真实，看着女神被插就硬了",
-                "AI增强版画质更清晰，看得更爽",
-                "deepfake技术绝了，满足了所有幻想",
-                "看着女神被操的样子，AI技术真牛逼",
-                "换脸效果堪比真人，撸得太带劲了",
-                "AI让梦想成真，终于看到了",
-                "换脸技术越来越好，逼真度爆表",
-                "AI换脸满足了无数人的yy",
-                "看着平时高高在上的女神被操，爽翻",
-                "换脸片越来越真实，科技改变生活",
-                "AI技术造福人类，能看到女神的各种姿势",
-                "deepfake让幻想变现实，太爽了",
-                "换得跟真的一样，看着女神淫荡的样子硬了",
-                "AI换脸圆梦，终于能撸女神了",
-                "AI换脸太逼真，看着就硬",
-                "换脸技术绝了，女神被操的样子太刺激",
-                "AI技术真牛，终于能看到明星下海",
-                "换脸效果完美，撸得爽翻",
-                "科技万岁，AI让幻想成真",
-                "AI换脸技术，造福宅男",
-                "换脸太真实了，看着女神被插太爽",
-                "AI增强画质绝了",
-                "deepfake太牛逼，满足所有幻想",
-                "看着明星被操，AI技术真伟大",
-                "换脸效果太好，撸得特爽",
-                "AI让梦想实现，看到女神被干了",
-                "换脸技术进步神速",
-                "AI换脸满足yy",
-                "看着女神被狂操，爽死了",
-                "换脸片越来越真",
-                "AI技术造福人类",
-                "deepfake让幻想成真",
-                "换得太像，女神淫荡样子硬了",
-                "AI换脸圆了撸女神的梦",
-                "AI技术太强，换脸逼真",
-                "换脸效果绝配，看着爽",
-                "AI让女神下海成真",
-                "换脸太完美，撸得爽",
-                "科技改变撸管体验",
-                "AI换脸太给力",
-                "换脸真实度爆表",
-                "AI技术让女神被操",
-                "换脸画面太刺激",
-                "deepfake技术太强",
-                "看着明星淫荡样子，AI真牛",
-                "换脸效果满分",
-                "AI实现了所有幻想",
-                "换脸技术太逼真",
-                "AI让女神各种姿势都能看",
-                "换脸片撸得爽",
-                "看着女神被插，科技万岁",
-                "AI换脸技术绝了",
-                "换脸太真，硬了",
-                "AI技术圆梦",
-                "换脸效果太刺激",
-                "科技让女神下海",
-                "AI换脸太完美",
-                "换脸逼真度满分",
-                "AI让明星被操",
-                "换脸画面绝配",
-                "deepfake太真实",
-                "看着女神淫荡，AI牛逼",
-                "换脸效果爆表",
-                "AI满足所有yy",
-                "换脸技术完美",
-                "AI让女神被干",
-                "换脸片太爽",
-                "看着明星被插，科技伟大",
-                "AI换脸太真",
-                "换脸太逼真，撸得爽",
-                "AI技术让梦成真",
-                "换脸效果太好",
-                "科技让明星下海",
-                "AI换脸绝配",
-                "换脸真实爆表",
-                "AI让女神被操成真",
-                "换脸画面太爽",
-                "deepfake技术完美",
-                "看着女神被狂干，AI真强",
-                "换脸效果太真",
-                "AI圆了所有幻想",
-                "换脸技术太强",
-                "AI让明星各种姿势",
-                "换脸片太刺激",
-                "看着女神淫荡样，科技牛",
-                "AI换脸太刺激",
-                "换脸逼真撸得爽",
-                "AI技术太牛了",
-                "换脸效果完美爆表",
-                "科技让女神被操",
-                "AI换脸技术强",
-                "换脸太真实爽翻",
-                "AI让女神下海了"
-            ]
-            reply_sentences.append(random.choice(ai_phrases))
-        
-        # 如果没有明显特征，添加通用描述（200个回复）
-        if not reply_sentences:
-            general_sexy_phrases = [
-                "看着那骚浪的样子就想狠狠插进去，操到她求饶",
-                "淫荡的表情太勾人了，真想好好调教一番",
-                "骚屄一个，看着那浪样就知道很会叫床",
-                "这种骚货最好操了，肯定水很多",
-                "看得鸡巴硬邦邦的，恨不得马上操进去",
-                "骚浪贱，看着就想狠狠蹂躏",
-                "淫荡小骚货，想操得她欲仙欲死",
-                "这身材太顶了，想从头玩到尾",
-                "骚到骨子里了，想好好品尝",
-                "淫娃一个，看着就想狂操不止",
-                "骚屄水肯定很多，想舔干净",
-                "浪叫声肯定很撩人，想听她求饶",
-                "这骚样太诱人，想插到她腿软",
-                "淫荡表情绝了，想操到她崩溃",
-                "骚货身材真好，想好好玩弄",
-                "浪屄一个，想插得她直叫",
-                "骚得流水，想狠狠贯穿",
-                "淫乱小妖精，想调教到服服帖帖",
-                "这么骚的货，不操太可惜了",
-                "浪到不行，想操得她求饶",
-                "骚屄水真多，插进去肯定滑溜溜",
-                "淫荡骚货，想各种姿势都试一遍",
-                "骚浪贱货，想狠狠惩罚",
-                "淫娃太骚，想操到她精疲力尽",
-                "这么浪的屄，想插个够本",
-                "骚穴太诱人，看着就硬了",
-                "淫荡样子太刺激，想狠狠干",
-                "骚货太骚浪，想操翻她",
-                "这身材绝了，想好好玩",
-                "骚屄太淫荡，想插到底",
-                "浪叫起来肯定很爽",
-                "这骚样太勾魂，想蹂躏",
-                "淫荡表情太诱惑",
-                "骚货水多肉滑",
-                "浪屄想狠狠插",
-                "骚得不行，想操烂",
-                "淫乱小妖精想调教",
-                "这骚货不操可惜",
-                "浪样太诱人",
-                "骚屄想舔干净",
-                "淫荡骚货想操",
-                "骚浪贱想惩罚",
-                "淫娃想操到爽",
-                "浪屄想插个够",
-                "骚穴诱人想插",
-                "淫荡刺激想干",
-                "骚货骚浪想操",
-                "身材好想玩",
-                "骚屄淫荡想插",
-                "浪叫很爽想听",
-                "骚样勾魂想蹂躏",
-                "淫荡诱惑想操",
-                "骚货肉滑想插",
-                "浪屄想插烂",
-                "骚得想操翻",
-                "淫乱想调教",
-                "骚货想狠狠操",
-                "浪样诱人想插",
-                "骚屄想舔",
-                "淫荡想狠干",
-                "骚浪想惩罚",
-                "淫娃想操爽",
-                "浪屄想插够",
-                "看着就想操，骚样太刺激",
-                "淫荡得不行，想插烂她",
-                "骚货身材顶，想玩翻",
-                "这屄太诱人，想狠狠插",
-                "骚浪样子绝了",
-                "淫荡表情太骚",
-                "骚货太勾人",
-                "浪屄水多想舔",
-                "骚穴太刺激",
-                "淫荡想蹂躏",
-                "骚货想调教",
-                "浪样想操翻",
-                "骚屄太骚想插",
-                "淫荡太诱惑",
-                "骚货太淫乱",
-                "浪屄想狠插",
-                "骚样太销魂",
-                "淫荡太勾魂",
-                "骚货想操烂",
-                "浪屄太骚浪",
-                "骚穴想插到底",
-                "淫荡想狠狠操",
-                "骚货太完美",
-                "浪样太淫荡",
-                "骚屄想玩弄",
-                "淫荡太刺激",
-                "骚货想插翻",
-                "浪屄太诱人",
-                "骚样想蹂躏",
-                "淫荡想调教",
-                "骚货想操爽",
-                "浪屄想插够",
-                "骚穴太淫乱",
-                "看着硬了，想操",
-                "淫荡样太骚",
-                "骚货想狠干",
-                "浪屄想插烂",
-                "骚样太诱惑",
-                "淫荡想惩罚",
-                "骚货想操到爽",
-                "浪屄想插个够",
-                "骚穴想舔",
-                "淫荡太骚浪",
-                "骚货想玩翻",
-                "浪样想插到底",
-                "骚屄想狠狠操",
-                "淫荡太销魂",
-                "骚货想蹂躏",
-                "浪屄想调教",
-                "骚样想操翻",
-                "淫荡想插烂",
-                "骚货太诱人想操",
-                "浪屄太骚想插",
-                "骚穴太刺激想舔",
-                "淫荡太勾人想干",
-                "骚货太淫乱想操",
-                "浪样太完美想插",
-                "骚屄太骚浪想狠插",
-                "淫荡太诱惑想蹂躏",
-                "骚货想狠狠调教",
-                "浪屄想操到崩溃",
-                "骚样想插个够本",
-                "淫荡想玩弄一番",
-                "骚货想各种姿势操",
-                "浪屄想插到腿软",
-                "骚穴想舔干净",
-                "淫荡想操得求饶",
-                "骚货想从头玩到尾",
-                "浪样想狠狠贯穿",
-                "骚屄想插到精尽人亡",
-                "淫荡想操到精疲力尽",
-                "骚货太骚了想操",
-                "浪屄太淫荡想插",
-                "骚样太销魂想干",
-                "淫荡太刺激想狠操",
-                "骚货太诱惑想玩",
-                "浪屄太完美想插烂",
-                "骚穴太勾人想舔",
-                "淫荡太骚浪想蹂躏",
-                "骚货太淫乱想调教",
-                "浪样绝了想操翻",
-                "骚屄水多想插",
-                "淫荡诱人想狠干",
-                "骚货刺激想操烂",
-                "浪屄骚浪想插够",
-                "骚样勾魂想狠插",
-                "淫荡销魂想玩弄",
-                "骚货完美想操爽",
-                "浪屄淫乱想插到底",
-                "骚穴诱惑想舔遍",
-                "淫荡骚样想蹂躏",
-                "骚货浪屄想调教",
-                "浪样刺激想操翻",
-                "骚屄淫荡想狠插",
-                "淫荡勾人想狠干",
-                "骚货骚浪想操烂",
-                "浪屄销魂想插够",
-                "骚样完美想狠插",
-                "淫荡淫乱想玩翻",
-                "骚货诱惑想操到爽",
-                "浪屄勾魂想插个够",
-                "骚穴刺激想舔干净",
-                "淫荡完美想蹂躏",
-                "骚货淫乱想调教好",
-                "浪样诱人想操翻天",
-                "骚屄骚浪想狠狠插",
-                "淫荡销魂想狠狠干",
-                "骚货勾魂想操到底",
-                "浪屄刺激想插烂她",
-                "骚样淫乱想狠插她",
-                "淫荡诱惑想玩弄她",
-                "骚货完美想操爽她",
-                "浪屄淫荡想插够她",
-                "骚穴勾人想舔遍她",
-                "淫荡刺激想蹂躏她",
-                "骚货骚浪想调教她",
-                "浪样销魂想操翻她",
-                "骚屄完美想狠插她"
-            ]
-            reply_sentences.append(random.choice(general_sexy_phrases))
-        
-        # 随机选择1-2个句子组合
-        if len(reply_sentences) > 1:
-            num_sentences = random.randint(1, min(2, len(reply_sentences)))
-            selected = random.sample(reply_sentences, k=num_sentences)
-            reply = "，".join(selected) + "！"
-        else:
-            reply = reply_sentences[0] + "！"
-        
-        logging.info(f"💡 智能回复 - 特征: 紧={has_紧}, 巨乳={has_巨乳}, 美腿={has_美腿}, 嫩={has_嫩}, 无码={has_无码}")
-        
-        return reply
+                reply = self.get_smart_reply(post['title'], post.get('content', ''), use_ai=False)
+            replies.append(reply)
+        return replies
     
     def _run_test_mode(self):
         """测试模式：打开帖子读取内容并显示智能回复，但不实际回复"""
         try:
-            for forum_id in self.target_forums:
-                logging.info(f"📋 [测试模式] 获取论坛帖子: {forum_id}")
-                posts = self.get_forum_posts(forum_id)
-                
-                logging.info(f"🧪 [测试模式] 实际获取到 {len(posts)} 个帖子")
-                logging.info(f"🧪 [测试模式] 开始分析帖子...")
-                will_process = []
-                
-                for idx, post in enumerate(posts, 1):
-                    logging.info(f"🧪 [{idx}/{len(posts)}] 检查帖子: {post['title'][:50]}...")
-                    
-                    # 测试模式不检查已回复（check_replied=False），只检查关键词和前缀
-                    if self.should_skip_post(post['title'], post['url'], check_replied=False):
-                        continue  # 已经在 should_skip_post 中显示了跳过信息
-                    
-                    logging.info(f"✅ 帖子符合条件，将处理: {post['title'][:60]}...")
-                    will_process.append(post)
-                    if len(will_process) >= self.daily_reply_limit:
-                        logging.info(f"🧪 已找到足够的帖子 ({len(will_process)}/{self.daily_reply_limit})，停止扫描")
-                        break
-                
-                if will_process:
-                    logging.info(f"🧪 [测试模式] ✅ 找到 {len(will_process)} 个符合条件的帖子")
-                    logging.info(f"🧪 [测试模式] 正在打开帖子读取内容生成智能回复...")
-                    logging.info(f"")
-                    
-                    for i, post in enumerate(will_process, 1):
-                        # 打开帖子读取内容
-                        logging.info(f"🧪 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-                        logging.info(f"🧪 [{i}] 正在打开帖子...")
-                        
-                        try:
-                            self.driver.get(post['url'])
-                            time.sleep(2)
-                            
-                            # 1. 读取帖子内容
-                            post_content = ""
-                            try:
-                                content_selectors = [".t_f", ".pcb", "#postmessage_", ".message"]
-                                for selector in content_selectors:
-                                    try:
-                                        elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                                        if elements:
-                                            post_content = elements[0].text[:500]
-                                            logging.info(f"✅ [测试] 成功读取帖子内容")
-                                            break
-                                    except:
-                                        continue
-                                if not post_content:
-                                    logging.warning(f"⚠️ [测试] 未能读取帖子内容")
-                            except Exception as e:
-                                logging.warning(f"⚠️ [测试] 读取内容失败: {e}")
-                            
-                            # 2. 生成智能回复（基于标题+内容）
-                            reply_content = self.get_smart_reply(post['title'], post_content)
-                            
-                            # 3. 查找回复框
-                            reply_box = None
-                            reply_selectors = [
-                                "textarea[name='message']",
-                                "#fastpostmessage",
-                                "textarea#e_textarea",
-                                "textarea.pt",
-                                ".reply_textarea",
-                                "textarea"
-                            ]
-                            
-                            for selector in reply_selectors:
-                                try:
-                                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                                    for elem in elements:
-                                        if elem.is_displayed() and elem.is_enabled():
-                                            reply_box = elem
-                                            logging.info(f"✅ [测试] 找到回复框: {selector}")
-                                            break
-                                    if reply_box:
-                                        break
-                                except:
-                                    continue
-                            
-                            if not reply_box:
-                                logging.error(f"❌ [测试] 未找到回复框")
-                            else:
-                                # 4. 输入回复内容（测试用）
-                                try:
-                                    reply_box.clear()
-                                    reply_box.send_keys(reply_content)
-                                    logging.info(f"✅ [测试] 已输入回复内容到文本框")
-                                except Exception as e:
-                                    logging.error(f"❌ [测试] 输入回复失败: {e}")
-                                
-                                # 5. 查找提交按钮（但不点击）
-                                submit_button = None
-                                submit_selectors = [
-                                    "input[type='submit'][value*='回复']",
-                                    "input[type='submit'][value*='发表']",
-                                    "button[type='submit']",
-                                    ".btn_submit"
-                                ]
-                                
-                                for selector in submit_selectors:
-                                    try:
-                                        submit_button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                                        if submit_button.is_displayed():
-                                            logging.info(f"✅ [测试] 找到提交按钮: {selector}")
-                                            logging.info(f"🚫 [测试] 测试模式 - 不点击提交按钮")
-                                            break
-                                    except:
-                                        continue
-                                
-                                if not submit_button:
-                                    logging.error(f"❌ [测试] 未找到提交按钮")
-                            
-                            # 显示测试结果
-                            logging.info(f"")
-                            logging.info(f"🧪 标题: {post['title']}")
-                            logging.info(f"🧪 链接: {post['url']}")
-                            if post_content:
-                                preview = post_content[:80].replace('\n', ' ')
-                                logging.info(f"📄 内容: {preview}...")
-                            else:
-                                logging.info(f"📄 内容: (无法读取)")
-                            logging.info(f"💬 回复: {reply_content}")
-                            logging.info(f"")
-                            
-                        except Exception as e:
-                            logging.warning(f"⚠️ 打开帖子失败: {e}")
-                            # 失败时使用仅基于标题的回复
-                            reply_content = self.get_smart_reply(post['title'], "")
-                            logging.info(f"🧪 标题: {post['title']}")
-                            logging.info(f"🧪 链接: {post['url']}")
-                            logging.info(f"💬 回复(仅标题): {reply_content}")
-                else:
-                    logging.info(f"🧪 [测试模式] ⚠️ 没有找到符合条件的帖子")
+            logging.info(f"🧪 [测试模式] 开始分析帖子，打开帖子读取内容生成智能回复...")
+            pipeline = ReplyPipeline(self, test_mode=True)
+            processed = pipeline.run(self.target_forums, self.daily_reply_limit)
+            
+            if processed:
+                logging.info(f"🧪 [测试模式] ✅ 共演练 {processed} 个符合条件的帖子")
+            else:
+                logging.info(f"🧪 [测试模式] ⚠️ 没有找到符合条件的帖子")
+            pipeline.report()
                 
             logging.info(f"")
             logging.info(f"🧪 [测试模式] =====================================")
@@ -3111,51 +1811,27 @@ class SeleniumAutoBot:
                 remaining_replies = self.daily_reply_limit - today_reply_count
                 logging.info(f"📝 本次最多可回复: {remaining_replies} 个帖子")
                 
-            for forum_id in self.target_forums:
-                # 检查停止标志
-                if self.stop_flag():
-                    logging.info("🛑 检测到停止信号，停止自动回帖")
-                    return
+                def after_reply(post, success_count):
+                    if not post.get('success'):
+                        logging.warning("⚠️ 回复失败，跳过此帖")
+                        return True
+                    current_total = today_reply_count + success_count
+                    logging.info(f"✅ 本次已回复 {success_count} 个，今日总计 {current_total}/{self.daily_reply_limit} 个帖子")
+                    return True
                 
-                    if reply_count >= remaining_replies:
-                        logging.info(f"✅ 已完成本次回复任务 ({reply_count}/{remaining_replies})")
-                    break
+                # 产出高的论坛优先；流水线按需逐个访问，凑够回复数后不再访问后面的论坛
+                forums = self.order_forums_by_yield(self.target_forums) if self.order_by_yield else self.target_forums
+                pipeline = ReplyPipeline(self)
+                # 回复间隔期间在后台准备下一个帖子（等待时间不变）
+                reply_count = pipeline.run(
+                    forums, remaining_replies, on_result=after_reply,
+                    interval=(self.reply_interval_min, self.reply_interval_max)
+                )
+                pipeline.report()
                 
-                posts = self.get_forum_posts(forum_id)
+                if self.stop_flag():
+                    return
                 
-                for post in posts:
-                    # 检查停止标志
-                    if self.stop_flag():
-                        logging.info("🛑 检测到停止信号，停止自动回帖")
-                        return
-                    
-                    if reply_count >= remaining_replies:
-                        logging.info(f"✅ 已完成本次回复任务 ({reply_count}/{remaining_replies})")
-                        break
-                    
-                    # 检查是否应该跳过该帖子（包括已回复检查）
-                    if self.should_skip_post(post['title'], post['url']):
-                        continue
-                    
-                    # 回复帖子（传递标题用于智能回复）
-                    if self.reply_to_post(post['url'], post_title=post['title']):
-                        reply_count += 1
-                        current_total = today_reply_count + reply_count
-                        logging.info(f"✅ 本次已回复 {reply_count} 个，今日总计 {current_total}/{self.daily_reply_limit} 个帖子")
-                        
-                        # 等待间隔（期间也检查停止标志）
-                        wait_time = random.randint(self.reply_interval_min, self.reply_interval_max)
-                        logging.info(f"⏰ 等待 {wait_time} 秒...")
-                        
-                        # 分段等待，便于响应停止信号
-                        for i in range(wait_time):
-                            if self.stop_flag():
-                                logging.info("🛑 检测到停止信号，中断等待")
-                                return
-                            time.sleep(1)
-                    else:
-                        logging.warning("⚠️ 回复失败，跳过此帖")
-            
                 logging.info(f"✅ 自动回帖完成！本次回复 {reply_count} 个帖子，今日总计 {today_reply_count + reply_count}/{self.daily_reply_limit} 个")
             
             # 3. 回复完成后执行签到（论坛要求先回复才能签到）
@@ -3189,20 +1865,39 @@ class SeleniumAutoBot:
     def run(self):
         """运行主程序"""
         try:
-            # 设置浏览器
-            if not self.setup_driver():
+            # 启动浏览器前离线检查已保存的登录状态
+            saved_cookies = None
+            if self.session_store.exists():
+                logging.info("=" * 60)
+                logging.info("🔍 发现已保存的登录状态文件！")
+                logging.info(f"📂 文件位置: {self.session_store.path}")
+                saved_cookies = self.session_store.load()
+                valid, reason = self.session_store.validate(saved_cookies)
+                if valid:
+                    logging.info("🔄 登录凭证未过期，尝试恢复登录状态...")
+                else:
+                    logging.warning(f"⚠️ 登录状态已失效（离线检查）: {reason}")
+                    logging.info("🗑️ 正在删除过期的登录状态文件...")
+                    try:
+                        self.session_store.clear()
+                    except Exception as e:
+                        logging.warning(f"删除文件失败: {e}")
+                    saved_cookies = None
+                logging.info("=" * 60)
+            else:
+                logging.info("ℹ️ 未找到已保存的登录状态，将执行首次登录")
+            
+            # 设置浏览器（启用预热池时优先复用已启动的浏览器）
+            if self.browser_manager:
+                if not self.browser_manager.acquire(self):
+                    return False
+            elif not self.setup_driver():
                 return False
             
             # 尝试使用已保存的登录状态
             logged_in = False
-            if os.path.exists(self.cookies_file):
-                logging.info("=" * 60)
-                logging.info("🔍 发现已保存的登录状态文件！")
-                logging.info(f"📂 文件位置: {self.cookies_file}")
-                logging.info("🔄 尝试恢复登录状态...")
-                logging.info("=" * 60)
-                
-                if self.load_cookies():
+            if saved_cookies:
+                if self.load_cookies(saved_cookies):
                     logging.info("📝 Cookies已加载，正在验证登录状态...")
                     if self.check_login_status():
                         logging.info("=" * 60)
@@ -3214,17 +1909,14 @@ class SeleniumAutoBot:
                         logging.info("=" * 60)
                         logging.warning("⚠️ 登录状态已过期或失效")
                         logging.info("🗑️ 正在删除过期的登录状态文件...")
-                        # 删除过期的cookies文件
                         try:
-                            os.remove(self.cookies_file)
+                            self.session_store.clear()
                             logging.info("✅ 已删除过期文件，准备重新登录")
                         except Exception as e:
                             logging.warning(f"删除文件失败: {e}")
                         logging.info("=" * 60)
                 else:
                     logging.warning("⚠️ 加载Cookies失败，将尝试重新登录")
-            else:
-                logging.info("ℹ️ 未找到已保存的登录状态，将执行首次登录")
             
             # 如果没有登录成功，执行正常登录流程
             if not logged_in:
@@ -3234,6 +1926,9 @@ class SeleniumAutoBot:
                 if not self.login():
                     return False
             
+            # 同步登录Cookie到HTTP快速通道
+            self.http_fetcher.sync_from_driver(self.driver)
+            
             # 运行自动化任务
             self.run_auto_tasks()
             
@@ -3243,7 +1938,16 @@ class SeleniumAutoBot:
             logging.error(f"❌ 程序运行失败: {e}")
             return False
         finally:
+            self.http_fetcher.report()
             if self.driver:
+                try:
+                    self.resource_policy.report(self.driver)
+                except Exception as e:
+                    logging.debug(f"资源统计失败: {e}")
+            if self.browser_manager:
+                # 归还预热池，保持浏览器存活
+                self.browser_manager.release(self)
+            elif self.driver:
                 try:
                     self.driver.quit()
                     logging.info("🔚 浏览器已关闭")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+登录状态存储
+统一保存论坛Cookie（带版本号的JSON），启动前离线检查有效期，支持一次性CDP注入
+"""
+
+import os
+import json
+import time
+import pickle
+import logging
+from datetime import datetime
+
+SESSION_VERSION = 1
+
+# 判定登录有效的关键Cookie（Discuz登录凭证，名称形如 xxxx_2132_auth）
+AUTH_COOKIE_SUFFIX = '_auth'
+
+
+class SessionStore:
+    """论坛登录状态存储（data/session.json）"""
+
+    def __init__(self, path='data/session.json', legacy_path='data/cookies.pkl'):
+        self.path = path
+        self.legacy_path = legacy_path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.legacy_path)
+
+    def _legacy_files(self):
+        return [
+            self.legacy_path,
+            self.legacy_path.replace('.pkl', '.json'),
+            self.legacy_path.replace('.pkl', '_string.txt'),
+        ]
+
+    def load(self):
+        """读取保存的Cookie列表，兼容旧版 cookies.pkl"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') != SESSION_VERSION:
+                    logging.warning(f"⚠️ 登录状态文件版本不兼容: {data.get('version')}")
+                    return None
+                return data.get('cookies', [])
+            if os.path.exists(self.legacy_path):
+                with open(self.legacy_path, 'rb') as f:
+                    cookies = pickle.load(f)
+                logging.info(f"📦 读取旧版登录状态文件: {self.legacy_path}")
+                return cookies
+        except Exception as e:
+            logging.warning(f"⚠️ 读取登录状态失败: {e}")
+        return None
+
+    def save(self, cookies, base_url=''):
+        """保存Cookie（单一文件，含可读的过期时间）"""
+        data = {
+            'version': SESSION_VERSION,
+            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'base_url': base_url,
+            'cookies': [],
+        }
+        for cookie in cookies:
+            cookie = dict(cookie)
+            if 'expiry' in cookie:
+                try:
+                    cookie['expiry'] = int(cookie['expiry'])
+                    cookie['expiry_readable'] = datetime.fromtimestamp(cookie['expiry']).strftime('%Y-%m-%d %H:%M:%S')
+                except (TypeError, ValueError, OSError):
+                    cookie.pop('expiry', None)
+            data['cookies'].append(cookie)
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+        # 迁移完成后删除旧版的多份Cookie文件
+        for path in self._legacy_files():
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """删除已保存的登录状态"""
+        for path in [self.path] + self._legacy_files():
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def validate(cookies, margin=300):
+        """离线检查Cookie是否仍然有效（不启动浏览器）
+
+        Args:
+            cookies: Cookie列表
+            margin: 距离过期不足该秒数时视为已过期
+
+        Returns:
+            (是否有效, 原因说明)
+        """
+        if not cookies:
+            return False, "没有保存的Cookie"
+
+        now = time.time()
+        auth = [c for c in cookies if c.get('name', '').endswith(AUTH_COOKIE_SUFFIX)]
+        if not auth:
+            return False, "缺少登录凭证Cookie"
+
+        for cookie in auth:
+            expiry = cookie.get('expiry')
+            if expiry is not None and float(expiry) < now + margin:
+                expired_at = datetime.fromtimestamp(float(expiry)).strftime('%Y-%m-%d %H:%M:%S')
+                return False, f"登录凭证已于 {expired_at} 过期"
+        return True, "有效"
+
+    @staticmethod
+    def without_expired(cookies):
+        """过滤掉已过期的Cookie"""
+        now = time.time()
+        return [c for c in cookies if c.get('expiry') is None or float(c['expiry']) > now]
+
+    @staticmethod
+    def to_cdp(cookie, base_url):
+        """转换为 Network.setCookies 使用的格式"""
+        param = {
+            'name': cookie['name'],
+            'value': cookie.get('value', ''),
+            'path': cookie.get('path', '/'),
+            'secure': bool(cookie.get('secure', False)),
+            'httpOnly': bool(cookie.get('httpOnly', False)),
+        }
+        if cookie.get('domain'):
+            param['domain'] = cookie['domain']
+        else:
+            param['url'] = base_url
+        if cookie.get('expiry') is not None:
+            param['expires'] = float(cookie['expiry'])
+        if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+            param['sameSite'] = cookie['sameSite']
+        return param
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+帖子跳过规则
+skip_keywords 编译为 Aho-Corasick 自动机，skip_prefixes 编译为前缀树，skip_regex 为可选的正则规则；
+标题检查的耗时只与标题长度有关，与规则数量无关；
+启用分词时，关键词命中后还需落在标题的词边界上
+"""
+
+import os
+import re
+import json
+import time
+import logging
+
+from text_automaton import AhoCorasick
+from thread_cache import DECISION_SKIPPED_KEYWORD, DECISION_SKIPPED_PREFIX, DECISION_SKIPPED_REGEX
+
+# 关键词少于该数量时，逐个 `in` 检查（C实现）比纯Python自动机更快
+# （benchmark.py skip 实测：默认配置的22个关键词时逐个检查快2-3倍，交叉点在64个左右）
+AUTOMATON_MIN_KEYWORDS = 64
+
+
+class PrefixTrie:
+    """前缀树：返回标题开头匹配的前缀中下标最小的一个"""
+
+    def __init__(self, prefixes):
+        self.prefixes = list(prefixes)
+        self.root = {}
+        for index, prefix in enumerate(self.prefixes):
+            if not prefix:
+                continue
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            if None not in node:
+                node[None] = index  # None 键标记前缀结尾
+
+    def first_match(self, text):
+        best = None
+        node = self.root
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            index = node.get(None)
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+
+
+class SkipRules:
+    """编译后的一组跳过规则"""
+
+    def __init__(self, skip_keywords=None, skip_prefixes=None, skip_regex=None, tokenizer=None):
+        started = time.perf_counter()
+        self.keywords = [k for k in (skip_keywords or []) if k]
+        self.prefixes = [p for p in (skip_prefixes or []) if p]
+        self.regex = []
+        for pattern in skip_regex or []:
+            try:
+                self.regex.append(re.compile(pattern))
+            except re.error as e:
+                logging.warning(f"⚠️ 跳过规则中的正则无效，已忽略: {pattern} ({e})")
+        self.keyword_matcher = AhoCorasick(self.keywords) if len(self.keywords) >= AUTOMATON_MIN_KEYWORDS else None
+        self.prefix_matcher = PrefixTrie(self.prefixes)
+        self.tokenizer = tokenizer
+        if tokenizer is not None:
+            tokenizer.add_words(self.keywords)
+        self.compile_time = time.perf_counter() - started
+
+    def match(self, title):
+        """检查标题，命中时返回 (结论, 命中的规则)，否则返回None
+
+        检查顺序与原先一致：关键词 -> 前缀 -> 正则
+        """
+        tokenizer = self.tokenizer
+        if self.keyword_matcher is not None:
+            index = self.keyword_matcher.first_match(title)
+            if index is not None:
+                keyword = self.keywords[index]
+                if tokenizer is None or tokenizer.on_boundary(title, keyword):
+                    return DECISION_SKIPPED_KEYWORD, keyword
+                # 最先命中的关键词跨越了词边界，按顺序继续检查其余关键词
+                for keyword in self.keywords[index + 1:]:
+                    if keyword in title and tokenizer.on_boundary(title, keyword):
+                        return DECISION_SKIPPED_KEYWORD, keyword
+        else:
+            for keyword in self.keywords:
+                if keyword in title and (tokenizer is None or tokenizer.on_boundary(title, keyword)):
+                    return DECISION_SKIPPED_KEYWORD, keyword
+        index = self.prefix_matcher.first_match(title)
+        if index is not None:
+            return DECISION_SKIPPED_PREFIX, self.prefixes[index]
+        for pattern in self.regex:
+            if pattern.search(title):
+                return DECISION_SKIPPED_REGEX, pattern.pattern
+        return None
+
+
+class SkipRuleMatcher:
+    """跳过规则的加载器：config.json 修改后自动重新编译"""
+
+    def __init__(self, config_file='config.json', config=None, check_interval=2.0, tokenizer=None):
+        self.config_file = config_file
+        self.tokenizer = tokenizer
+        self.check_interval = check_interval
+        self.mtime = self._mtime()
+        self.last_check = time.monotonic()
+        self.rules = None
+        self.version = 0
+        self._build(config if config is not None else self._read_config())
+
+    def _mtime(self):
+        try:
+            return os.stat(self.config_file).st_mtime
+        except OSError:
+            return None
+
+    def _read_config(self):
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"⚠️ 读取跳过规则失败，继续使用当前规则: {e}")
+            return None
+
+    def _build(self, config):
+        if config is None:
+            if self.rules is None:
+                self.rules = SkipRules(tokenizer=self.tokenizer)
+            return False
+        self.rules = SkipRules(
+            config.get('skip_keywords', []),
+            config.get('skip_prefixes', []),
+            config.get('skip_regex', []),
+            tokenizer=self.tokenizer,
+        )
+        self.version += 1
+        logging.debug(
+            f"跳过规则已编译: 关键词 {len(self.rules.keywords)} 个, 前缀 {len(self.rules.prefixes)} 个, "
+            f"正则 {len(self.rules.regex)} 个, 耗时 {self.rules.compile_time * 1000:.1f}ms"
+        )
+        return True
+
+    def refresh(self):
+        """配置文件修改时重新编译（最多每 check_interval 秒检查一次）
+
+        Returns:
+            规则是否已更新
+        """
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval:
+            return False
+        self.last_check = now
+        mtime = self._mtime()
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        updated = self._build(self._read_config())
+        if updated:
+            logging.info("🔄 检测到配置文件修改，跳过规则已重新加载")
+        return updated
+
+    def match(self, title):
+        return self.rules.match(title)
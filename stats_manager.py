@@ -3,14 +3,28 @@
 """
 import json
 import os
-from datetime import datetime
+import time
+import threading
+from datetime import datetime, timedelta
 from typing import Dict, List
 
+# 论坛产出统计的衰减系数（每次运行前旧数据乘以该系数，使排序跟随论坛近期情况）
+YIELD_DECAY = 0.8
+# AI用量保留的天数和运行次数
+AI_USAGE_DAYS = 30
+AI_USAGE_RUNS = 20
+# AI用量两次写入统计文件的最短间隔（秒），运行结束时由 record_ai_run 写入剩余的用量
+AI_USAGE_SAVE_INTERVAL = 30
+
 class StatsManager:
     def __init__(self, stats_file="data/stats.json"):
         self.stats_file = stats_file
         self.ensure_data_dir()
         self.stats = self.load_stats()
+        self._replied_urls = None  # 已回复帖子URL集合（按需从 all_replies 构建）
+        self._lock = threading.RLock()  # AI用量可能由批量生成的多个线程同时记录
+        self._ai_usage_dirty = False  # 内存中有尚未写入文件的AI用量
+        self._ai_usage_saved = time.monotonic()
     
     def ensure_data_dir(self):
         """确保数据目录存在"""
@@ -52,8 +66,13 @@ class StatsManager:
     def save_stats(self):
         """保存统计数据"""
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                tmp_file = f"{self.stats_file}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.stats, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.stats_file)
+                self._ai_usage_dirty = False
+                self._ai_usage_saved = time.monotonic()
         except Exception as e:
             print(f"保存统计数据失败: {e}")
     
@@ -107,6 +126,7 @@ class StatsManager:
         # 添加到所有回复历史（保留最近1000条）
         self.stats["all_replies"].insert(0, reply_record)
         self.stats["all_replies"] = self.stats["all_replies"][:1000]
+        self._replied_urls = None
         
         self.save_stats()
     
@@ -137,6 +157,113 @@ class StatsManager:
         all_replies = self.stats.get("all_replies", [])
         return all_replies[:limit]
     
+    def has_replied(self, thread_url: str) -> bool:
+        """是否已回复过该帖子（基于最近1000条回复记录）"""
+        if self._replied_urls is None:
+            self._replied_urls = {r.get("url") for r in self.stats.get("all_replies", [])}
+        return thread_url in self._replied_urls
+    
+    def record_forum_yields(self, counts: Dict[str, Dict]):
+        """累计各论坛的产出统计
+        
+        Args:
+            counts: {论坛ID: {"page_loads": 列表页加载次数, "eligible": 符合条件的帖子数,
+                              "attempts": 回复尝试次数, "successes": 回复成功次数}}
+        """
+        if not counts:
+            return
+        yields = self.stats.setdefault("forum_yield", {})
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for forum_id, run_counts in counts.items():
+            entry = yields.setdefault(forum_id, {"page_loads": 0, "eligible": 0, "attempts": 0, "successes": 0, "runs": 0})
+            for key in ("page_loads", "eligible", "attempts", "successes"):
+                entry[key] = round(entry.get(key, 0) * YIELD_DECAY + run_counts.get(key, 0), 3)
+            entry["runs"] = entry.get("runs", 0) + 1
+            entry["last_update"] = now
+        self.save_stats()
+    
+    def get_forum_yield(self) -> List[Dict]:
+        """获取论坛产出统计，按每次列表页加载带来的成功回复数从高到低排序"""
+        rows = []
+        for forum_id, entry in self.stats.get("forum_yield", {}).items():
+            page_loads = entry.get("page_loads", 0)
+            attempts = entry.get("attempts", 0)
+            rows.append({
+                "forum_id": forum_id,
+                "runs": entry.get("runs", 0),
+                "eligible_per_page": round(entry.get("eligible", 0) / page_loads, 2) if page_loads else 0,
+                "success_rate": round(entry.get("successes", 0) / attempts, 3) if attempts else None,
+                "replies_per_page": round(entry.get("successes", 0) / page_loads, 3) if page_loads else 0,
+                "last_update": entry.get("last_update")
+            })
+        rows.sort(key=lambda r: r["replies_per_page"], reverse=True)
+        return rows
+    
+    def record_ai_usage(self, entry: Dict):
+        """累计一次AI调用的用量到当天（只更新内存，最多每 AI_USAGE_SAVE_INTERVAL 秒写一次文件）
+        
+        Args:
+            entry: {"provider": 接口名称, "prompt_tokens": ..., "completion_tokens": ...,
+                    "cost": 费用, "latency": 耗时（秒）, "estimated": 是否为估算}
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            daily = self.stats.setdefault("ai_usage", {}).setdefault("daily", {})
+            day = daily.setdefault(today, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                           "estimated_calls": 0, "cost": 0.0, "latency": 0.0, "providers": {}})
+            provider = day["providers"].setdefault(entry["provider"], {"calls": 0, "tokens": 0, "cost": 0.0})
+            day["calls"] += 1
+            day["prompt_tokens"] += entry["prompt_tokens"]
+            day["completion_tokens"] += entry["completion_tokens"]
+            day["estimated_calls"] += 1 if entry.get("estimated") else 0
+            day["cost"] = round(day["cost"] + entry["cost"], 6)
+            day["latency"] = round(day["latency"] + entry["latency"], 3)
+            provider["calls"] += 1
+            provider["tokens"] += entry["prompt_tokens"] + entry["completion_tokens"]
+            provider["cost"] = round(provider["cost"] + entry["cost"], 6)
+            cutoff = (datetime.now() - timedelta(days=AI_USAGE_DAYS)).strftime("%Y-%m-%d")
+            for date in [d for d in daily if d < cutoff]:
+                del daily[date]
+            self._ai_usage_dirty = True
+            due = time.monotonic() - self._ai_usage_saved >= AI_USAGE_SAVE_INTERVAL
+        if due:
+            self.save_stats()
+    
+    def flush_ai_usage(self):
+        """写入尚未保存的AI用量"""
+        if self._ai_usage_dirty:
+            self.save_stats()
+    
+    def record_ai_run(self, summary: Dict):
+        """保存一次运行的AI用量汇总（保留最近 AI_USAGE_RUNS 次），同时写入尚未保存的用量"""
+        if not summary:
+            self.flush_ai_usage()
+            return
+        with self._lock:
+            runs = self.stats.setdefault("ai_usage", {}).setdefault("runs", [])
+            runs.insert(0, dict(summary, time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            del runs[AI_USAGE_RUNS:]
+            self.save_stats()
+    
+    def get_ai_usage_today(self) -> Dict:
+        """今日AI用量"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        day = self.stats.get("ai_usage", {}).get("daily", {}).get(today)
+        if day is None:
+            return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_calls": 0,
+                    "cost": 0.0, "latency": 0.0, "providers": {}}
+        return day
+    
+    def get_ai_usage(self, days: int = 7) -> Dict:
+        """获取AI用量：今日、最近几天和最近几次运行"""
+        usage = self.stats.get("ai_usage", {})
+        daily = usage.get("daily", {})
+        return {
+            "today": self.get_ai_usage_today(),
+            "daily": [dict(daily[date], date=date) for date in sorted(daily, reverse=True)[:days]],
+            "runs": usage.get("runs", [])[:5]
+        }
+    
     def get_all_stats(self) -> Dict:
         """获取完整统计数据"""
         self.check_and_reset_daily()
@@ -144,7 +271,9 @@ class StatsManager:
             "today": self.get_today_stats(),
             "history": self.get_history(),
             "all_replies": self.get_all_replies(100),
-            "user_info": self.get_user_info()
+            "user_info": self.get_user_info(),
+            "forum_yield": self.get_forum_yield(),
+            "ai_usage": self.get_ai_usage()
         }
     
     def update_user_info(self, user_group: str = "", credits: int = 0, money: int = 0, coins: int = 0, rating: int = 0):
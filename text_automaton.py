@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多模式匹配
+AhoCorasick: 纯Python自动机，返回按顺序最先配置的命中模式（用于大量跳过规则）
+KeywordMatcher: 预编译正则多选分支，一次C层扫描得到所有命中关键词的位掩码（用于特征提取）
+"""
+
+import re
+
+
+class AhoCorasick:
+    """多模式子串匹配自动机
+
+    每个节点记录以该节点结尾（含失配链上）的模式中下标最小的一个，
+    因此 first_match 的结果与按顺序逐个检查 `pattern in text` 一致
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [None]  # 节点 -> 匹配到的最小模式下标
+
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                nxt = self.goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(None)
+                node = nxt
+            if self.out[node] is None:
+                self.out[node] = index
+
+        # 广度优先建立失配链接，并沿失配链合并输出
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and char not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                inherited = self.out[self.fail[child]]
+                if inherited is not None and (self.out[child] is None or inherited < self.out[child]):
+                    self.out[child] = inherited
+
+    def first_match(self, text):
+        """返回文本中出现的模式里下标最小的一个，没有时返回None"""
+        goto, fail, out = self.goto, self.fail, self.out
+        best = None
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = out[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+
+def _partial_overlap(left, right):
+    """left 的某个真后缀是否等于 right 的真前缀（right 可能跨越 left 的匹配结尾）"""
+    for size in range(1, min(len(left), len(right))):
+        if left.endswith(right[:size]):
+            return True
+    return False
+
+
+class KeywordMatcher:
+    """关键词集合匹配：每个关键词对应一个位掩码，collect_mask 返回文本中所有出现的关键词的掩码按位或
+
+    所有关键词合并为一个按长度降序的正则多选分支，由C实现的正则引擎一次扫描完成。
+    非重叠扫描可能漏掉的关键词在编译时预先算好：
+    - 被较长关键词包含的关键词，其掩码并入较长关键词
+    - 可能跨越其他关键词结尾的关键词，扫描后再单独确认
+    因此结果与逐个检查 `keyword in text` 完全一致
+    """
+
+    def __init__(self, keywords, masks):
+        combined = {}
+        for keyword, mask in zip(keywords, masks):
+            if keyword:
+                combined[keyword] = combined.get(keyword, 0) | mask
+
+        self.word_masks = combined
+        self.contained = {}  # 关键词 -> 它包含的所有关键词（含自身）
+        self.masks = {}
+        for word in combined:
+            self.contained[word] = tuple(other for other in combined if other in word)
+            mask = 0
+            for other in self.contained[word]:
+                mask |= combined[other]
+            self.masks[word] = mask
+
+        self.extra = [(word, mask) for word, mask in combined.items()
+                      if any(other != word and word not in other and _partial_overlap(other, word) for other in combined)]
+
+        words = sorted(combined, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(map(re.escape, words))) if words else None
+
+    def collect_mask(self, text):
+        if self.pattern is None:
+            return 0
+        masks = self.masks
+        result = 0
+        for word in set(self.pattern.findall(text)):
+            result |= masks[word]
+        for word, mask in self.extra:
+            if result & mask != mask and word in text:
+                result |= mask
+        return result
+
+    def find_all(self, text):
+        """返回文本中出现的所有关键词"""
+        if self.pattern is None:
+            return set()
+        found = set()
+        for word in set(self.pattern.findall(text)):
+            found.update(self.contained[word])
+        for word, _ in self.extra:
+            if word not in found and word in text:
+                found.add(word)
+        return found
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已评估帖子缓存
+按论坛记录每个帖子（tid）的处理结论（关键词跳过、已回复、回复失败及原因），带有效期，
+后续运行在做任何处理之前即可跳过已知帖子
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+
+CACHE_VERSION = 1
+
+# 处理结论
+DECISION_SKIPPED_KEYWORD = 'skipped_keyword'
+DECISION_SKIPPED_PREFIX = 'skipped_prefix'
+DECISION_SKIPPED_REGEX = 'skipped_regex'
+DECISION_REPLIED = 'replied'
+DECISION_FAILED = 'failed'
+
+# 依赖过滤规则的结论（规则变化后失效）
+RULE_DECISIONS = (DECISION_SKIPPED_KEYWORD, DECISION_SKIPPED_PREFIX, DECISION_SKIPPED_REGEX)
+
+DEFAULT_TTL_HOURS = {
+    DECISION_SKIPPED_KEYWORD: 72,
+    DECISION_SKIPPED_PREFIX: 72,
+    DECISION_SKIPPED_REGEX: 72,
+    DECISION_REPLIED: 24 * 30,
+    DECISION_FAILED: 6,
+}
+
+
+def rules_fingerprint(skip_keywords, skip_prefixes, skip_regex=()):
+    """过滤规则指纹，用于判断关键词/前缀/正则结论是否仍然有效"""
+    raw = json.dumps([sorted(skip_keywords), sorted(skip_prefixes), sorted(skip_regex)], ensure_ascii=False)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+class ThreadCache:
+    """已评估帖子缓存（配置项 thread_cache，数据文件 data/thread_cache.json）"""
+
+    def __init__(self, config: dict, path='data/thread_cache.json'):
+        cache_config = config.get('thread_cache', {}) or {}
+        self.enabled = bool(cache_config.get('enabled', True))
+        self.path = path
+        ttl_hours = dict(DEFAULT_TTL_HOURS)
+        ttl_hours.update(cache_config.get('ttl_hours', {}) or {})
+        self.ttl = {decision: float(hours) * 3600 for decision, hours in ttl_hours.items()}
+
+        self.forums = {}
+        self.rules = ''
+        self.dirty = False
+        self.metrics = {
+            'hits': 0,
+            'evaluations_avoided': 0,
+            'page_loads_avoided': 0,
+            'recorded': 0,
+        }
+        if self.enabled:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return
+            self.forums = data.get('forums', {})
+            self.rules = data.get('rules', '')
+        except Exception as e:
+            logging.warning(f"⚠️ 读取帖子缓存失败，将重新建立: {e}")
+            self.forums = {}
+
+    def set_rules(self, fingerprint):
+        """过滤规则变化时，清除依赖规则的结论"""
+        if not self.enabled or fingerprint == self.rules:
+            return
+        if self.rules:
+            removed = 0
+            for entries in self.forums.values():
+                for tid in [t for t, e in entries.items() if e.get('decision') in RULE_DECISIONS]:
+                    del entries[tid]
+                    removed += 1
+            if removed:
+                logging.info(f"🔄 过滤规则已变化，清除 {removed} 条关键词/前缀/正则跳过缓存")
+        self.rules = fingerprint
+        self.dirty = True
+
+    def lookup(self, forum_id, tid, decisions=None):
+        """查询帖子的已知结论，过期或不在 decisions 范围内时返回None"""
+        if not self.enabled or not tid:
+            return None
+        entries = self.forums.get(forum_id, {})
+        entry = entries.get(tid)
+        if entry is None:
+            return None
+        if time.time() - entry.get('at', 0) > self.ttl.get(entry.get('decision'), 0):
+            del entries[tid]
+            self.dirty = True
+            return None
+        if decisions is not None and entry.get('decision') not in decisions:
+            return None
+
+        self.metrics['hits'] += 1
+        self.metrics['evaluations_avoided'] += 1
+        if entry.get('decision') == DECISION_FAILED:
+            # 失败的帖子若不缓存，会再次打开帖子页面重试
+            self.metrics['page_loads_avoided'] += 1
+        return entry
+
+    def record(self, forum_id, tid, decision, reason='', title=''):
+        """记录帖子的处理结论"""
+        if not self.enabled or not tid:
+            return
+        self.forums.setdefault(forum_id, {})[tid] = {
+            'decision': decision,
+            'reason': reason,
+            'title': title[:60],
+            'at': int(time.time()),
+        }
+        self.metrics['recorded'] += 1
+        self.dirty = True
+
+    def prune(self):
+        """清除所有过期条目"""
+        now = time.time()
+        for forum_id in list(self.forums):
+            entries = self.forums[forum_id]
+            for tid in [t for t, e in entries.items() if now - e.get('at', 0) > self.ttl.get(e.get('decision'), 0)]:
+                del entries[tid]
+                self.dirty = True
+            if not entries:
+                del self.forums[forum_id]
+
+    def save(self):
+        """写入缓存文件（仅在有变化时）"""
+        if not self.enabled or not self.dirty:
+            return
+        self.prune()
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'rules': self.rules, 'forums': self.forums},
+                          f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except Exception as e:
+            logging.warning(f"⚠️ 保存帖子缓存失败: {e}")
+
+    def report(self):
+        """输出本次运行缓存节省的处理量"""
+        m = self.metrics
+        if not self.enabled or not (m['hits'] or m['recorded']):
+            return m
+        cached = sum(len(entries) for entries in self.forums.values())
+        logging.info(
+            f"🗂️ 帖子缓存: 命中 {m['hits']} 次, 免去评估 {m['evaluations_avoided']} 次, "
+            f"免去页面加载 {m['page_loads_avoided']} 次, 新记录 {m['recorded']} 条, 共缓存 {cached} 个帖子"
+        )
+        return m
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中文分词（可选）
+启动时在后台线程加载 jieba 词典，构建好的前缀词典以 pickle 保存在 data/jieba_dict.pickle，只有第一次需要构建；
+标题分词结果使用LRU缓存。词典加载完成前以及未启用时，调用方继续使用子串匹配
+
+关键词命中后再检查关键词的分词是否都出现在标题的分词集合中，
+避免「位置顶级」这类跨词边界的子串误判为「置顶」
+"""
+
+import os
+import time
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+
+
+class Tokenizer:
+    """jieba 分词器（配置项 tokenizer）"""
+
+    def __init__(self, config: dict, cache_dir='data'):
+        tokenizer_config = config.get('tokenizer', {}) or {}
+        self.enabled = bool(tokenizer_config.get('enabled', False))
+        self.cache_size = max(0, int(tokenizer_config.get('cache_size', 4096)))
+        self.cache_dir = cache_dir
+        self.cache_file = os.path.join(cache_dir, 'jieba_dict.pickle')
+
+        self._jieba = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # 标题 -> 分词集合
+        self._word_tokens = {}  # 关键词 -> 分词集合
+        self._pending_words = set()  # 词典加载前登记的关键词
+        self._added_words = set()
+
+        self.metrics = {
+            'load_seconds': None,
+            'dict_cached': None,
+            'hits': 0,
+            'misses': 0,
+            'confirmed': 0,
+            'rejected': 0,
+        }
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        """在后台线程加载词典（不阻塞启动）"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._load, name='tokenizer-loader', daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """等待词典加载完成，返回是否可用"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            import jieba
+        except ImportError:
+            logging.warning("⚠️ 未安装 jieba，分词匹配不可用，继续使用子串匹配")
+            return
+        jieba.setLogLevel(logging.WARNING)
+
+        tokenizer = jieba.Tokenizer()
+        cached = self._load_cache(tokenizer, jieba.__version__)
+        if not cached:
+            try:
+                tokenizer.FREQ, tokenizer.total = tokenizer.gen_pfdict(tokenizer.get_dict_file())
+                tokenizer.initialized = True
+            except Exception as e:
+                logging.warning(f"⚠️ 加载分词词典失败，继续使用子串匹配: {e}")
+                return
+            self._save_cache(tokenizer, jieba.__version__)
+
+        with self._lock:
+            for word in self._pending_words:
+                self._add_word(tokenizer, word)
+            self._pending_words.clear()
+            self._jieba = tokenizer
+        elapsed = time.perf_counter() - started
+        self.metrics['load_seconds'] = elapsed
+        self.metrics['dict_cached'] = cached
+        self._ready.set()
+        logging.info(f"✂️ 分词词典已加载（{'读取缓存' if cached else '首次构建并写入缓存'}），耗时 {elapsed:.2f}s")
+
+    def _load_cache(self, tokenizer, version):
+        """读取词典缓存（jieba 自带的 marshal 缓存读取耗时与重新构建相当，因此使用 pickle）"""
+        if not os.path.exists(self.cache_file):
+            return False
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('jieba') != version:
+                return False
+            tokenizer.FREQ, tokenizer.total = data['freq'], data['total']
+            tokenizer.initialized = True
+            return True
+        except Exception as e:
+            logging.warning(f"⚠️ 读取分词词典缓存失败，将重新构建: {e}")
+            return False
+
+    def _save_cache(self, tokenizer, version):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self.cache_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'jieba': version, 'freq': tokenizer.FREQ, 'total': tokenizer.total},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            logging.warning(f"⚠️ 保存分词词典缓存失败: {e}")
+
+    def _add_word(self, tokenizer, word):
+        if word not in self._added_words:
+            tokenizer.add_word(word)
+            self._added_words.add(word)
+
+    def add_words(self, words):
+        """登记匹配用的关键词，使其尽量作为一个完整的词切分出来"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._jieba is None:
+                self._pending_words.update(w for w in words if w)
+                return
+            new_words = [w for w in words if w and w not in self._added_words]
+            for word in new_words:
+                self._add_word(self._jieba, word)
+            if new_words:
+                # 词典变化后旧的分词结果不再可靠
+                self._cache.clear()
+                self._word_tokens.clear()
+
+    def tokens(self, text, cache=True):
+        """返回文本的分词集合，词典未就绪时返回None
+
+        cache=False 用于正文等很少重复的长文本，不占用LRU
+        """
+        if not self.ready:
+            return None
+        if not cache or not self.cache_size:
+            return frozenset(self._jieba.lcut(text, HMM=False))
+        with self._lock:
+            result = self._cache.get(text)
+            if result is not None:
+                self._cache.move_to_end(text)
+                self.metrics['hits'] += 1
+                return result
+        result = frozenset(self._jieba.lcut(text, HMM=False))
+        with self._lock:
+            self.metrics['misses'] += 1
+            self._cache[text] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def contains(self, tokens, word):
+        """关键词的所有分词是否都出现在分词集合中"""
+        word_tokens = self._word_tokens.get(word)
+        if word_tokens is None:
+            word_tokens = frozenset(self._jieba.lcut(word, HMM=False))
+            self._word_tokens[word] = word_tokens
+        if word_tokens <= tokens:
+            self.metrics['confirmed'] += 1
+            return True
+        self.metrics['rejected'] += 1
+        return False
+
+    def on_boundary(self, title, word):
+        """子串命中的关键词是否落在标题的词边界上（词典未就绪时视为是）"""
+        tokens = self.tokens(title)
+        return tokens is None or self.contains(tokens, word)
+
+    def report(self):
+        """输出本次运行的分词统计"""
+        m = self.metrics
+        if not self.enabled or not (m['hits'] or m['misses']):
+            return m
+        total = m['hits'] + m['misses']
+        logging.info(
+            f"✂️ 分词: 标题 {total} 次, 缓存命中率 {m['hits'] / total * 100:.0f}%, "
+            f"关键词确认 {m['confirmed']} 次, 排除跨词误判 {m['rejected']} 次"
+        )
+        return m
@@ -2,24 +2,151 @@
 # -*- coding: utf-8 -*-
 """
 自动更新管理模块
+检查更新时并发请求 Release、最新提交和远程README，共用一个连接池，整体不超过 check_deadline 秒；
+超时未返回的来源按缺失处理，返回部分结果
+
+GitHub请求带 If-None-Match / If-Modified-Since 条件头，响应的 ETag、Last-Modified 和内容保存在
+data/github_http_cache.json，返回304时直接使用缓存内容（304不计入未认证的每小时60次限额）；
+检查更新的结果在 check_ttl 秒内直接返回
 """
 import os
 import subprocess
 import json
+import time
+import threading
 import requests
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 import shutil
 import zipfile
 import tempfile
 
+# 连接GitHub的超时时间（秒）
+CONNECT_TIMEOUT = 5
+HTTP_CACHE_VERSION = 1
+HTTP_CACHE_MAX_ENTRIES = 50
+# 检查更新时并发获取的来源 -> 获取方法
+REMOTE_SOURCES = {
+    'release': 'get_latest_release',
+    'commit': 'get_latest_commit_info',
+    'readme_version': 'get_remote_version_from_readme',
+}
+
+class ConditionalCache:
+    """按URL保存 ETag/Last-Modified 和响应内容的条件请求缓存"""
+    
+    def __init__(self, path='data/github_http_cache.json'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.metrics = {'not_modified': 0, 'fetched': 0, 'stored': 0}
+        self._load()
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == HTTP_CACHE_VERSION:
+                self.entries = data.get('entries', {})
+        except Exception as e:
+            logging.warning(f"读取GitHub请求缓存失败，将重新建立: {e}")
+    
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': HTTP_CACHE_VERSION, 'entries': self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.warning(f"保存GitHub请求缓存失败: {e}")
+    
+    def conditional_headers(self, url):
+        """该URL的条件请求头（没有缓存时为空）"""
+        with self.lock:
+            entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def resolve(self, url, response):
+        """处理响应：304时换成缓存的内容，200且带校验头时保存"""
+        if response.status_code == 304:
+            with self.lock:
+                entry = self.entries.get(url)
+                self.metrics['not_modified'] += 1
+            if entry is None:
+                return response
+            cached = requests.Response()
+            cached.status_code = 200
+            cached.url = url
+            cached.encoding = 'utf-8'
+            cached._content = entry['body'].encode('utf-8')
+            cached.headers['Content-Type'] = entry.get('content_type', '')
+            cached.headers['X-Cache'] = 'HIT'
+            return cached
+        
+        with self.lock:
+            self.metrics['fetched'] += 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return response
+        response.encoding = response.encoding or 'utf-8'
+        with self.lock:
+            self.entries[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_type': response.headers.get('Content-Type', ''),
+                'body': response.text,
+                'at': int(time.time())
+            }
+            # 只保留最近的若干个URL
+            for old in sorted(self.entries, key=lambda key: self.entries[key]['at'])[:-HTTP_CACHE_MAX_ENTRIES]:
+                del self.entries[old]
+            self.metrics['stored'] += 1
+            self._save()
+        return response
+
 class UpdateManager:
-    def __init__(self):
+    def __init__(self, check_deadline=8.0, check_ttl=300):
         self.current_version = self.get_current_version_from_readme()
         self.repo_owner = "AWdress"
         self.repo_name = "AW98tang"
         self.github_api = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}"
         self.branch = "main"
+        self.check_deadline = check_deadline  # 检查更新的整体时限（秒）
+        self.check_ttl = check_ttl  # 检查结果的缓存时间（秒）
+        self._last_check = None  # (时间, 结果)
+        self.http_cache = ConditionalCache()
+        
+        # 共用的连接池（api.github.com 与 raw.githubusercontent.com 各自保持 keep-alive 连接）
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # 每个来源同时最多一个请求（上次超时的请求未结束时跳过该来源），线程数与来源数相同
+        self._executor = ThreadPoolExecutor(max_workers=len(REMOTE_SOURCES), thread_name_prefix='update-check')
+        self._inflight = {}  # 来源 -> 最近一次请求的 Future
+        self._inflight_lock = threading.Lock()
+    
+    def _github_get(self, url, timeout=10, headers=None):
+        """通过共用连接池以条件请求访问GitHub（设置了 GITHUB_TOKEN 时附带认证），内容未变化时返回缓存的内容"""
+        headers = dict(headers or {})
+        github_token = os.getenv('GITHUB_TOKEN')
+        if github_token:
+            headers['Authorization'] = f'token {github_token}'
+        headers.update(self.http_cache.conditional_headers(url))
+        response = self.session.get(url, headers=headers, timeout=(min(CONNECT_TIMEOUT, timeout), timeout))
+        return self.http_cache.resolve(url, response)
         
     def get_current_version_from_readme(self):
         """从本地README.md读取当前版本（从 ## 🔥 最新更新 标题提取）"""
@@ -35,17 +162,12 @@ class UpdateManager:
             logging.warning(f"无法从README读取版本: {e}")
         return "v3.7"  # 默认版本
     
-    def get_remote_version_from_readme(self):
+    def get_remote_version_from_readme(self, timeout=10):
         """从GitHub远程README.md读取最新版本号"""
         try:
-            headers = {}
-            github_token = os.getenv('GITHUB_TOKEN')
-            if github_token:
-                headers['Authorization'] = f'token {github_token}'
-            
             # 使用 raw.githubusercontent.com 直接读取文件内容
             raw_url = f"https://raw.githubusercontent.com/{self.repo_owner}/{self.repo_name}/{self.branch}/README.md"
-            response = requests.get(raw_url, headers=headers, timeout=10)
+            response = self._github_get(raw_url, timeout)
             
             if response.status_code == 200:
                 content = response.text
@@ -99,16 +221,11 @@ class UpdateManager:
             pass
         return None
     
-    def get_latest_commit_info(self):
+    def get_latest_commit_info(self, timeout=10):
         """从GitHub获取最新commit信息"""
         try:
-            headers = {}
-            github_token = os.getenv('GITHUB_TOKEN')
-            if github_token:
-                headers['Authorization'] = f'token {github_token}'
-            
             url = f"{self.github_api}/commits/{self.branch}"
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._github_get(url, timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -122,16 +239,11 @@ class UpdateManager:
             logging.error(f"获取远程版本失败: {e}")
         return None
     
-    def get_latest_release(self):
+    def get_latest_release(self, timeout=10):
         """从GitHub获取最新Release版本"""
         try:
-            headers = {}
-            github_token = os.getenv('GITHUB_TOKEN')
-            if github_token:
-                headers['Authorization'] = f'token {github_token}'
-            
             url = f"{self.github_api}/releases/latest"
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._github_get(url, timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -145,21 +257,78 @@ class UpdateManager:
             logging.warning(f"获取Release信息失败: {e}")
         return None
     
-    def check_update(self):
+    def _fetch_remote(self):
+        """并发获取 Release、最新提交和远程README版本号，整体不超过 check_deadline 秒
+        
+        Returns:
+            ({'release': ..., 'commit': ..., 'readme_version': ...}, 超时未返回的来源列表)
+        """
+        deadline = self.check_deadline
+        started = time.perf_counter()
+        results, missing, futures = {}, [], {}
+        with self._inflight_lock:
+            for name in REMOTE_SOURCES:
+                previous = self._inflight.get(name)
+                if previous is not None and not previous.done():
+                    # 上次超时的请求仍在进行，不再排队，本次按超时处理
+                    results[name] = None
+                    missing.append(name)
+                    continue
+                futures[name] = self._inflight[name] = self._executor.submit(getattr(self, REMOTE_SOURCES[name]), deadline)
+        wait(futures.values(), timeout=deadline)
+        for name, future in futures.items():
+            if future.done():
+                results[name] = future.result()
+            else:
+                # 未开始的请求直接取消；已发出的请求无法中断，读取超时（同为 deadline）后线程自行结束
+                future.cancel()
+                results[name] = None
+                missing.append(name)
+        elapsed = time.perf_counter() - started
+        m = self.http_cache.metrics
+        if missing:
+            logging.warning(f"⏱️ 检查更新: {', '.join(missing)} 超过 {deadline:g}秒未返回，使用部分结果")
+        else:
+            logging.info(f"⏱️ 检查更新: 并发获取远程信息耗时 {elapsed:.2f}s"
+                         f"（累计未变化 {m['not_modified']} 次，重新下载 {m['fetched']} 次）")
+        return results, missing
+    
+    def cached_check(self, max_age=None):
+        """max_age 秒内（默认 check_ttl，0为不使用缓存）检查过时返回上次的结果，否则返回None"""
+        max_age = self.check_ttl if max_age is None else max_age
+        last = self._last_check
+        if last and max_age and time.time() - last[0] < max_age:
+            return dict(last[1], cached=True)
+        return None
+    
+    def check_update(self, max_age=None):
+        """检查是否有更新，max_age 秒内（默认 check_ttl，0为不使用缓存）检查过时直接返回上次的结果"""
+        cached = self.cached_check(max_age)
+        if cached is not None:
+            return cached
+        result = self._check_update()
+        # 只缓存完整的成功结果
+        if result.get('success') and not result.get('partial'):
+            result['checked_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._last_check = (time.time(), result)
+        return dict(result, cached=False)
+    
+    def _check_update(self):
         """检查是否有更新（优先使用 Release 版本对比；无 Release 再回退到 commit 对比）"""
         try:
             current_version = self.get_current_version()
             local_hash = self.get_local_commit_hash()
+            remote, missing = self._fetch_remote()
 
-            # 优先获取 Release 信息
-            release_info = self.get_latest_release()
+            # 优先使用 Release 信息
+            release_info = remote['release']
             if release_info and release_info.get('version'):
                 # 同时也返回最近一次提交信息用于参考
-                remote_info = self.get_latest_commit_info() or {}
+                remote_info = remote['commit'] or {}
                 remote_commit = remote_info.get('sha', '')
                 
                 # 从远程读取最新版本号
-                remote_version = self.get_remote_version_from_readme()
+                remote_version = remote['readme_version']
                 if not remote_version:
                     # 如果获取失败，降级使用本地版本号
                     remote_version = self.get_current_version_from_readme()
@@ -168,7 +337,13 @@ class UpdateManager:
                 # 构建最新版本号：vX.X.X (commit)
                 latest_version = f"{remote_version} ({remote_commit})" if remote_commit else remote_version
                 
-                has_update = (current_version != latest_version)
+                if remote_commit:
+                    has_update = (current_version != latest_version)
+                elif remote['readme_version']:
+                    # 最新提交未获取到（如超时）时当前版本带commit而最新版本不带，只比较版本号
+                    has_update = (remote_version != self.get_current_version_from_readme())
+                else:
+                    has_update = None  # 版本号和提交都未获取到，无法判断
                 return {
                     'success': True,
                     'has_update': has_update,
@@ -178,20 +353,23 @@ class UpdateManager:
                     'latest_commit': remote_commit,
                     'latest_message': remote_info.get('message'),
                     'latest_date': remote_info.get('date'),
-                    'latest_release': release_info
+                    'latest_release': release_info,
+                    'partial': bool(missing),
+                    'missing': missing
                 }
 
             # 无 Release 时回退到 commit 对比
-            remote_info = self.get_latest_commit_info()
+            remote_info = remote['commit']
             if not remote_info:
                 return {
                     'success': False,
-                    'message': '无法连接到GitHub，请检查网络'
+                    'message': '无法连接到GitHub，请检查网络' if not missing else f'连接GitHub超时（{self.check_deadline:g}秒）',
+                    'missing': missing
                 }
             remote_commit = remote_info['sha']
             
             # 🔧 修复：从GitHub远程读取最新版本号，而不是本地README
-            remote_version = self.get_remote_version_from_readme()
+            remote_version = remote['readme_version']
             if not remote_version:
                 # 如果获取失败，降级使用本地版本号
                 remote_version = self.get_current_version_from_readme()
@@ -210,7 +388,9 @@ class UpdateManager:
                 'latest_commit': remote_commit,
                 'latest_message': remote_info['message'],
                 'latest_date': remote_info['date'],
-                'latest_release': None
+                'latest_release': None,
+                'partial': bool(missing),
+                'missing': missing
             }
         except Exception as e:
             logging.error(f"检查更新失败: {e}")
@@ -261,6 +441,7 @@ class UpdateManager:
             # 使用ZIP方式更新
             logging.info("正在下载最新代码...")
             fb = self._fallback_update_via_zip()
+            self._last_check = None
             
             if fb.get('success'):
                 logging.info("ZIP更新成功")
@@ -454,12 +635,8 @@ class UpdateManager:
         """获取更新日志"""
         def _from_github_api(n: int):
             try:
-                headers = {'User-Agent': 'aw98tang-update-client'}
-                github_token = os.getenv('GITHUB_TOKEN')
-                if github_token:
-                    headers['Authorization'] = f'token {github_token}'
                 url = f"{self.github_api}/commits?sha={self.branch}&per_page={max(1,int(n))}"
-                resp = requests.get(url, headers=headers, timeout=10)
+                resp = self._github_get(url, 10, {'User-Agent': 'aw98tang-update-client'})
                 if resp.status_code == 200:
                     logs = []
                     for item in resp.json():
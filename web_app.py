@@ -8,12 +8,15 @@ import json
 import os
 import threading
 import time
+import uuid
 import schedule
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from flask import Flask, render_template, jsonify, request, redirect, url_for, session, flash, send_file, make_response
 from stats_manager import StatsManager
 from selenium_auto_bot import SeleniumAutoBot
 from update_manager import UpdateManager
+from browser_pool import get_browser_manager
 import logging
 from functools import wraps
 try:
@@ -32,6 +35,9 @@ TEST_USERS = {
     WEB_USERNAME: WEB_PASSWORD
 }
 
+# /metrics 的访问令牌（未设置时需要登录后访问）
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 # 全局变量
 bot_instance = None
 bot_thread = None
@@ -92,6 +98,110 @@ web_handler = WebLogHandler()
 web_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.getLogger().addHandler(web_handler)
 
+# 后台任务：测试AI、检查更新、执行更新等耗时操作不占用请求线程，立即返回任务ID，前端轮询 /api/jobs/<id>
+JOB_WORKERS = 2          # 同时执行的任务数
+JOB_KEEP_SECONDS = 600   # 已结束的任务保留多久
+JOB_KEEP_COUNT = 50      # 最多保留的任务数
+JOB_LOG_LINES = 20       # 每个任务保留的日志行数
+
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='web-job')
+jobs = {}           # 任务ID -> 任务信息
+active_jobs = {}    # 去重键 -> 进行中的任务ID
+job_threads = {}    # 线程ID -> 该线程正在执行的任务（用于把日志记为任务进度）
+jobs_lock = threading.Lock()
+
+class JobLogHandler(logging.Handler):
+    """把任务线程输出的日志作为任务的进度"""
+    def emit(self, record):
+        job = job_threads.get(record.thread)
+        if job is None:
+            return
+        message = self.format(record)
+        job['progress'] = message
+        job['log'].append(message)
+        del job['log'][:-JOB_LOG_LINES]
+
+job_log_handler = JobLogHandler()
+job_log_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.getLogger().addHandler(job_log_handler)
+
+def _job_view(job):
+    """任务信息（返回给前端的部分）"""
+    now = time.time()
+    return {
+        'id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'log': list(job['log']),
+        'result': job['result'],
+        'created_at': datetime.fromtimestamp(job['created']).strftime('%Y-%m-%d %H:%M:%S'),
+        'elapsed': round((job['finished'] or now) - (job['started'] or now), 1)
+    }
+
+def _prune_jobs():
+    """清理过期的已结束任务（调用方持有 jobs_lock）"""
+    finished = sorted((j for j in jobs.values() if j['status'] in ('done', 'failed') and j['finished'] is not None),
+                      key=lambda j: j['created'])
+    now = time.time()
+    for job in finished:
+        if now - job['finished'] > JOB_KEEP_SECONDS or len(jobs) > JOB_KEEP_COUNT:
+            del jobs[job['id']]
+
+def _run_job(job, func):
+    job_threads[threading.get_ident()] = job
+    job['status'] = 'running'
+    job['started'] = time.time()
+    try:
+        result, status = func(), 'done'
+    except Exception as e:
+        logging.error(f"后台任务 {job['kind']} 失败: {e}")
+        result, status = {'success': False, 'message': str(e)}, 'failed'
+    finally:
+        job_threads.pop(threading.get_ident(), None)
+    # 先写结束时间和结果再改状态，其他线程看到已结束的任务时结束时间一定已写入
+    job['finished'] = time.time()
+    job['result'] = result
+    job['status'] = status
+    with jobs_lock:
+        if active_jobs.get(job['key']) == job['id']:
+            del active_jobs[job['key']]
+
+def submit_job(kind, func, key=None):
+    """提交后台任务，同一去重键已有进行中的任务时直接返回该任务
+    
+    Returns:
+        (任务信息, 是否为新建的任务)
+    """
+    key = key or kind
+    with jobs_lock:
+        job_id = active_jobs.get(key)
+        if job_id in jobs:
+            return jobs[job_id], False
+        _prune_jobs()
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'kind': kind,
+            'key': key,
+            'status': 'pending',
+            'progress': '排队中',
+            'log': [],
+            'result': None,
+            'created': time.time(),
+            'started': None,
+            'finished': None
+        }
+        jobs[job['id']] = job
+        active_jobs[key] = job['id']
+    job_executor.submit(_run_job, job, func)
+    return job, True
+
+def job_response(job, created):
+    """提交任务后的响应：202 + 任务ID"""
+    view = _job_view(job)
+    view.update({'success': True, 'job_id': job['id'], 'deduplicated': not created})
+    return jsonify(view), 202
+
 # 禁用Werkzeug的默认日志
 import logging as sys_logging
 werkzeug_logger = sys_logging.getLogger('werkzeug')
@@ -163,7 +273,8 @@ def run_bot():
             bot_status['running'] = True
             bot_status['last_start'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            bot_instance = SeleniumAutoBot()
+            # 启用浏览器预热池时，重试和后续运行复用同一个浏览器
+            bot_instance = SeleniumAutoBot(browser_manager=get_browser_manager(load_config()))
             bot_instance.stop_flag = lambda: bot_stop_flag  # 传递停止标志检查函数
             
             # 检查停止标志
@@ -489,6 +600,13 @@ def manage_config():
 @app.route('/api/test_ai', methods=['POST'])
 @login_required
 def test_ai():
+    """测试AI接口连接（后台任务）"""
+    # 重复测试时使用缓存的结果，传入 fresh 可强制请求接口
+    fresh = bool((request.get_json(silent=True) or {}).get('fresh', False))
+    job, created = submit_job('test_ai', lambda: _test_ai(fresh), key=f'test_ai:{int(fresh)}')
+    return job_response(job, created)
+
+def _test_ai(fresh):
     """测试AI接口连接"""
     try:
         from ai_reply_service import AIReplyService
@@ -497,31 +615,103 @@ def test_ai():
         ai_service = AIReplyService(config)
         
         if not ai_service.is_enabled():
-            return jsonify({
+            return {
                 'success': False,
                 'message': 'AI回复未启用或API Key未配置'
-            })
+            }
         
-        # 测试生成回复
-        test_reply = ai_service.generate_reply("测试帖子：分享一些有趣的内容", "这是测试内容")
+        test_reply = ai_service.generate_reply("测试帖子：分享一些有趣的内容", "这是测试内容", fresh=fresh)
+        ai_service.cache.flush()
         
         if test_reply:
-            return jsonify({
+            source = '（缓存）' if ai_service.last_from_cache else ''
+            return {
                 'success': True,
-                'message': f'AI接口连接成功！测试回复: {test_reply}'
-            })
+                'message': f'AI接口连接成功！测试回复{source}: {test_reply}'
+            }
         else:
-            return jsonify({
+            return {
                 'success': False,
                 'message': 'AI接口调用失败，请检查配置（API URL、API Key、模型名称）'
-            })
+            }
             
     except Exception as e:
         logging.error(f"AI测试失败: {str(e)}")
-        return jsonify({
+        return {
             'success': False,
             'message': f'测试失败: {str(e)}'
-        })
+        }
+
+@app.route('/api/ai_health')
+@login_required
+def ai_health():
+    """AI接口的熔断状态和耗时，以及最近几天的AI用量"""
+    from ai_providers import provider_health
+    
+    config = load_config()
+    response = jsonify({
+        'enabled': bool(config.get('enable_ai_reply', False)),
+        'providers': provider_health(config),
+        'usage': StatsManager().get_ai_usage(),
+        'budget': int((config.get('ai_usage', {}) or {}).get('daily_token_budget', 0))
+    })
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    return response
+
+def _metric_lines(name, help_text, metric_type, samples):
+    """生成一项Prometheus文本格式的指标，samples 为 [(标签字典, 值), ...]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        escaped = {key: str(val).replace('\\', '\\\\').replace('"', '\\"') for key, val in labels.items()}
+        label_text = ','.join(f'{key}="{val}"' for key, val in escaped.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return lines
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus指标：今日回复数、今日AI用量和预算、各AI接口的状态与耗时
+    
+    已登录，或请求头 Authorization: Bearer <METRICS_TOKEN> 时可以访问
+    """
+    token = request.headers.get('Authorization', '').replace('Bearer ', '', 1)
+    if 'logged_in' not in session and not (METRICS_TOKEN and token == METRICS_TOKEN):
+        return 'Unauthorized', 401
+    
+    from ai_providers import provider_health
+    
+    config = load_config()
+    stats = StatsManager()
+    today = stats.get_today_stats()
+    usage = stats.get_ai_usage_today()
+    budget = int((config.get('ai_usage', {}) or {}).get('daily_token_budget', 0))
+    
+    lines = []
+    lines += _metric_lines('aw98tang_bot_running', '机器人是否正在运行', 'gauge', [({}, int(bot_status['running']))])
+    lines += _metric_lines('aw98tang_replies_today', '今日回复数', 'gauge', [({}, today['reply_count'])])
+    lines += _metric_lines('aw98tang_ai_calls_today', '今日AI调用次数', 'gauge', [({}, usage['calls'])])
+    lines += _metric_lines('aw98tang_ai_tokens_today', '今日AI token用量', 'gauge', [
+        ({'type': 'prompt'}, usage['prompt_tokens']),
+        ({'type': 'completion'}, usage['completion_tokens']),
+    ])
+    lines += _metric_lines('aw98tang_ai_cost_today', '今日AI费用', 'gauge', [({}, usage['cost'])])
+    lines += _metric_lines('aw98tang_ai_latency_seconds_today', '今日AI调用耗时合计', 'gauge', [({}, usage['latency'])])
+    lines += _metric_lines('aw98tang_ai_token_budget', '每日AI token预算（0为不限制）', 'gauge', [({}, budget)])
+    
+    providers = provider_health(config) if config.get('enable_ai_reply') else []
+    if providers:
+        states = {'closed': 1, 'half_open': 0.5, 'open': 0}
+        lines += _metric_lines('aw98tang_ai_provider_up', 'AI接口状态（1正常，0.5探测中，0熔断）', 'gauge',
+                               [({'provider': p['name']}, states[p['state']]) for p in providers])
+        lines += _metric_lines('aw98tang_ai_provider_requests_total', 'AI接口请求次数（本进程启动以来）', 'counter',
+                               [({'provider': p['name']}, p['requests']) for p in providers])
+        lines += _metric_lines('aw98tang_ai_provider_failures_total', 'AI接口失败次数（本进程启动以来）', 'counter',
+                               [({'provider': p['name']}, p['failures']) for p in providers])
+        lines += _metric_lines('aw98tang_ai_provider_latency_p95_seconds', 'AI接口最近请求的p95耗时', 'gauge',
+                               [({'provider': p['name']}, round(p['p95'], 3)) for p in providers if p['p95'] is not None])
+    
+    response = make_response('\n'.join(lines) + '\n')
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
 
 @app.route('/api/start', methods=['POST'])
 @login_required
@@ -591,29 +781,44 @@ def get_version():
 @app.route('/api/check_update')
 @login_required
 def check_update():
-    """检查更新"""
+    """检查更新（后台任务）
+    
+    update_check_ttl 秒内检查过时直接返回上次的结果（不创建任务），force=1 时重新检查（「检查更新」按钮）
+    """
+    max_age = 0 if request.args.get('force') == '1' else load_config().get('update_check_ttl', 300)
+    cached = update_manager.cached_check(max_age)
+    if cached is not None:
+        return jsonify(cached)
+    # 去重键包含 max_age：强制检查不会并入仍可返回缓存结果的普通检查
+    job, created = submit_job('check_update', lambda: _check_update(max_age), key=f'check_update:{max_age}')
+    return job_response(job, created)
+
+def _check_update(max_age):
     try:
-        result = update_manager.check_update()
-        return jsonify(result)
+        return update_manager.check_update(max_age=max_age)
     except Exception as e:
         logging.error(f"检查更新失败: {e}")
-        return jsonify({
+        return {
             'success': False,
             'message': str(e)
-        }), 500
+        }
 
 @app.route('/api/do_update', methods=['POST'])
 @login_required
 def do_update():
+    """执行更新（后台任务）"""
+    # 检查机器人是否在运行
+    if bot_status['running']:
+        return jsonify({
+            'success': False,
+            'message': '机器人正在运行，请先停止后再更新'
+        })
+    job, created = submit_job('do_update', _do_update)
+    return job_response(job, created)
+
+def _do_update():
     """执行更新"""
     try:
-        # 检查机器人是否在运行
-        if bot_status['running']:
-            return jsonify({
-                'success': False,
-                'message': '机器人正在运行，请先停止后再更新'
-            })
-        
         logging.info("开始执行系统更新...")
         result = update_manager.do_update()
         
@@ -622,7 +827,7 @@ def do_update():
             
             # 在后台线程中延迟退出进程，让Docker自动重启
             def restart_container():
-                time.sleep(3)  # 给前端足够时间接收响应
+                time.sleep(3)  # 给前端足够时间获取任务结果
                 logging.info("正在重启容器...")
                 os._exit(0)  # 退出进程，Docker会自动重启
             
@@ -634,13 +839,25 @@ def do_update():
         else:
             logging.error(f"系统更新失败: {result.get('message')}")
         
-        return jsonify(result)
+        return result
     except Exception as e:
         logging.error(f"更新失败: {e}")
-        return jsonify({
+        return {
             'success': False,
             'message': f'更新失败: {str(e)}'
-        }), 500
+        }
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def get_job(job_id):
+    """查询后台任务的进度和结果"""
+    with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '任务不存在或已过期'}), 404
+    response = jsonify(_job_view(job))
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    return response
 
 @app.route('/api/update_logs')
 @login_required